@@ -0,0 +1,158 @@
+'''
+Valutazione vettoriale delle policy con NumPy.
+
+Invece di valutare le azioni una alla volta (Player.get_action), costruisce
+in un colpo solo le chiavi di tutti gli stati successori come array:
+    successori = chiave_corrente XOR delta_mossa
+dove i delta di ogni disposizione sono precalcolati una volta sola.
+Tutte le chiavi sono poi cercate nella policy con un'unica searchsorted e
+per ogni riga si sceglie il massimo, con pareggi risolti a caso.
+
+Con 3-12 azioni per mossa il costo fisso di NumPy supera il ciclo Python,
+quindi la valutazione è pensata per molte partite giocate in parallelo
+(vedi play_games e simulate.py --vectorized).
+Richiede numpy, che non è una dipendenza del gioco e va installato a parte
+(pip install numpy).
+'''
+
+from __future__ import annotations
+import functools
+
+import numpy
+
+from engine import BearGameManche
+from policy import BEAR_SHIFT, PackedPolicy
+
+# Numero massimo di azioni per turno: 4 per l'orso, 3 cacciatori x 4 per i cacciatori
+MAX_BEAR_ACTIONS = 4
+MAX_HUNTER_ACTIONS = 12
+
+
+class ActionTables:
+    '''
+    Tabelle precalcolate per tutte le disposizioni, ordinate per chiave:
+    - keys: chiavi di stato (uint32)
+    - bear_deltas / hunter_deltas: delta XOR delle azioni possibili,
+      completati con 0 (nessuna azione)
+    - trapped: True se l'orso non ha mosse (partita finita)
+    '''
+
+    def __init__(self) -> None:
+        adjacent = BearGameManche.ADJACENT_POSITIONS
+        bear_deltas, hunter_deltas = BearGameManche.MOVE_DELTAS[False], BearGameManche.MOVE_DELTAS[True]
+        rows = []
+        for bear, hunters in BearGameManche.placements():
+            occupied = hunters | (1 << bear)
+            bear_actions = [bear_deltas[bear][p] for p in adjacent[bear]
+                            if not occupied >> p & 1]
+            hunter_actions = [hunter_deltas[h][q]
+                              for h in range(BearGameManche.BOARD_POSITIONS) if hunters >> h & 1
+                              for q in adjacent[h] if not occupied >> q & 1]
+            rows.append(((bear << BEAR_SHIFT) | hunters, bear_actions, hunter_actions))
+        rows.sort()
+        count = len(rows)
+        self.keys = numpy.array([key for key, _, _ in rows], dtype=numpy.uint32)
+        self.bear_deltas = numpy.zeros((count, MAX_BEAR_ACTIONS), dtype=numpy.uint32)
+        self.hunter_deltas = numpy.zeros((count, MAX_HUNTER_ACTIONS), dtype=numpy.uint32)
+        for i, (_, bear_actions, hunter_actions) in enumerate(rows):
+            self.bear_deltas[i, :len(bear_actions)] = bear_actions
+            self.hunter_deltas[i, :len(hunter_actions)] = hunter_actions
+        self.trapped = ~self.bear_deltas.any(axis=1)
+        self._canonical_keys = None
+
+    def index(self, state_keys: numpy.ndarray) -> numpy.ndarray:
+        '''Indice nelle tabelle delle chiavi di stato indicate.'''
+        return numpy.searchsorted(self.keys, state_keys)
+
+    def canonical(self, state_keys: numpy.ndarray) -> numpy.ndarray:
+        '''Chiavi canoniche (vedi symmetry.py) delle chiavi di stato indicate.'''
+        if self._canonical_keys is None:
+            from symmetry import canonical_key
+            self._canonical_keys = numpy.array(
+                [canonical_key(int(key)) for key in self.keys], dtype=numpy.uint32)
+        return self._canonical_keys[self.index(state_keys)]
+
+
+@functools.lru_cache(maxsize=None)
+def action_tables() -> ActionTables:
+    '''Tabelle delle azioni, calcolate una volta per processo.'''
+    return ActionTables()
+
+
+def lookup(policy: PackedPolicy, state_keys: numpy.ndarray, default=0) -> numpy.ndarray:
+    '''
+    Valori della policy per un array di chiavi (di qualsiasi forma),
+    con un'unica searchsorted; le chiavi assenti valgono `default`.
+    '''
+    if policy.canonical:
+        state_keys = action_tables().canonical(state_keys)
+    keys, values = policy.arrays()
+    index = numpy.searchsorted(keys, state_keys)
+    numpy.minimum(index, len(keys) - 1, out=index)
+    found = keys[index] == state_keys
+    return numpy.where(found, values[index], default)
+
+
+def choose(policy: PackedPolicy,
+           state_keys: numpy.ndarray,
+           deltas: numpy.ndarray,
+           rng: numpy.random.Generator) -> numpy.ndarray:
+    '''
+    Sceglie per ogni riga l'azione di valore massimo secondo la policy,
+    come Player.get_action, e restituisce le chiavi degli stati raggiunti.
+
+    Args:
+        state_keys: chiavi degli stati correnti, forma (n,)
+        deltas: delta XOR delle azioni, forma (n, azioni), 0 = nessuna azione
+    '''
+    successors = state_keys[:, None] ^ deltas
+    values = lookup(policy, successors).astype(numpy.float64)
+    values[deltas == 0] = -numpy.inf
+    best = values == values.max(axis=1, keepdims=True)
+    # Pareggi risolti a caso: punteggio casuale solo sulle azioni migliori
+    scores = rng.random(best.shape)
+    scores[~best] = -1.0
+    column = scores.argmax(axis=1)
+    return successors[numpy.arange(len(state_keys)), column]
+
+
+def play_games(games: int,
+               classic_initial_position: bool,
+               bear_policy: PackedPolicy = None,
+               hunter_policy: PackedPolicy = None,
+               seed: int = None) -> numpy.ndarray:
+    '''
+    Gioca `games` manches AI contro AI in parallelo, un turno alla volta
+    per tutte le partite ancora in corso.
+
+    Returns:
+        Array con il numero di mosse dell'orso di ogni partita
+    '''
+    manche = BearGameManche(True, True, classic_initial_position)
+    if bear_policy is None:
+        bear_policy = manche._bear_player.states_value
+    if hunter_policy is None:
+        hunter_policy = manche._hunter_player.states_value
+    tables = action_tables()
+    rng = numpy.random.default_rng(seed)
+
+    state_keys = numpy.full(games, manche.get_state_key(), dtype=numpy.uint32)
+    bear_moves = numpy.zeros(games, dtype=numpy.int32)
+    active = numpy.arange(games)
+    hunter_turn = manche.is_hunter_turn()
+    while True:
+        # Fine partita: orso bloccato o numero massimo di mosse raggiunto
+        index = tables.index(state_keys[active])
+        over = tables.trapped[index] | (bear_moves[active] >= BearGameManche.MAX_BEAR_MOVES)
+        active, index = active[~over], index[~over]
+        if not len(active):
+            return bear_moves
+        if hunter_turn:
+            state_keys[active] = choose(hunter_policy, state_keys[active],
+                                        tables.hunter_deltas[index], rng)
+        else:
+            state_keys[active] = choose(bear_policy, state_keys[active],
+                                        tables.bear_deltas[index], rng)
+            bear_moves[active] += 1
+        hunter_turn = not hunter_turn
+
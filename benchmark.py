@@ -0,0 +1,367 @@
+'''
+Benchmark del Gioco dell'Orso.
+
+- micro: i punti caldi del motore e dell'AI (get_possible_moves, get_hash,
+  Player.get_action, load_policy, ...), misurati con timeit su un campione
+  fisso di stati presi da partite casuali; il risultato è il tempo per
+  singola operazione in microsecondi
+- macro: OrsoPyGame.manche senza finestra (SDL_VIDEODRIVER=dummy) per N
+  frame, con click simulati sulle caselle in una partita umano contro
+  umano; il risultato è la distribuzione del tempo di lavoro per frame
+  (senza le attese del FrameScheduler)
+
+I risultati possono essere salvati in JSON e confrontati con un file
+salvato in precedenza: le misure peggiorate oltre la tolleranza sono
+segnalate come regressioni e il comando termina con codice 1.
+La baseline di riferimento è in benchmarks/baseline.json (macchina e
+versione di Python sono registrate nel file): i tempi assoluti dipendono
+dalla macchina, quindi per un confronto affidabile conviene registrare
+una baseline propria prima delle modifiche.
+
+Esempi:
+    python benchmark.py --compare
+    python benchmark.py --out mia_baseline.json
+    python benchmark.py --compare mia_baseline.json --tolerance 0.15
+    python benchmark.py --only macro --frames 2000
+'''
+
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import timeit
+
+from engine import BearGameManche, Player
+from policy import BEAR_POLICY_FILE, HUNTER_POLICY_FILE, _POLICY_CACHE
+
+# Stati del campione per i micro-benchmark
+SAMPLE_BOARDS = 200
+# Stati su cui misurare la ricerca del livello esperto (più lenta)
+SEARCH_BOARDS = 10
+SEARCH_DEPTH = 4
+# Ripetizioni di ogni micro-benchmark (si riportano minimo e mediana)
+REPEAT = 5
+# Frame del macro-benchmark e ogni quanti frame simulare un click
+MACRO_FRAMES = 1000
+CLICK_EVERY = 2
+# Peggioramento relativo oltre il quale una misura è una regressione
+TOLERANCE = 0.10
+# Baseline di riferimento usata da --compare senza argomento
+BASELINE_FILE = os.path.join("benchmarks", "baseline.json")
+SEED = 1
+
+
+# ========== MICRO-BENCHMARK ==========
+
+def sample_boards(count: int = SAMPLE_BOARDS, seed: int = SEED) -> list[BearGameManche]:
+    '''
+    Stati di gioco non terminali presi da partite a mosse casuali,
+    alternando le due disposizioni iniziali.
+    '''
+    rng = random.Random(seed)
+    boards = []
+    classic = True
+    while len(boards) < count:
+        manche = BearGameManche(True, False, classic)
+        classic = not classic
+        while not manche.game_over() and len(boards) < count:
+            boards.append(manche.copy())
+            if manche.is_hunter_turn():
+                start, end = rng.choice(manche.get_hunter_actions())
+            else:
+                start, end = rng.choice(manche.get_bear_actions())
+            manche.move_player(start, end)
+    return boards
+
+
+def _actions(board: BearGameManche):
+    if board.is_hunter_turn():
+        return board.get_hunter_actions()
+    return board.get_bear_actions()
+
+
+def micro_cases(boards: list[BearGameManche]) -> dict:
+    '''
+    Casi dei micro-benchmark.
+
+    Returns:
+        Nome -> (funzione senza argomenti, operazioni per chiamata)
+    '''
+    positions = range(BearGameManche.BOARD_POSITIONS)
+    bear, hunter = Player("orso"), Player("cacciatore")
+    bear.load_policy(BEAR_POLICY_FILE)
+    hunter.load_policy(HUNTER_POLICY_FILE)
+    turns = [(board, _actions(board), hunter if board.is_hunter_turn() else bear)
+             for board in boards]
+
+    def get_possible_moves():
+        for board in boards:
+            for position in positions:
+                board.get_possible_moves(position)
+
+    def get_hash():
+        for board in boards:
+            board.get_hash()
+
+    def get_actions():
+        for board in boards:
+            _actions(board)
+
+    def move_undo():
+        for board, actions, _ in turns:
+            for start, end in actions:
+                board.move_player(start, end)
+                board.undo_move()
+
+    def player_get_action():
+        for board, actions, player in turns:
+            player.get_action(actions, board)
+
+    def load_policy_cold():
+        # Svuota la cache di processo: ogni chiamata rilegge il file
+        _POLICY_CACHE.clear()
+        Player("orso").load_policy(BEAR_POLICY_FILE)
+
+    def load_policy_warm():
+        Player("orso").load_policy(BEAR_POLICY_FILE)
+
+    cases = {
+        "engine.get_possible_moves": (get_possible_moves, len(boards) * len(positions)),
+        "engine.get_hash": (get_hash, len(boards)),
+        "engine.get_actions": (get_actions, len(boards)),
+        "engine.move_undo": (move_undo, sum(len(actions) for _, actions, _ in turns)),
+        "player.get_action": (player_get_action, len(boards)),
+        "policy.load_policy_cold": (load_policy_cold, 1),
+        "policy.load_policy_warm": (load_policy_warm, 1),
+    }
+    try:
+        from search import SearchPlayer
+    except ImportError:
+        return cases
+    searcher = SearchPlayer("cacciatore", time_budget=float("inf"), max_depth=SEARCH_DEPTH)
+
+    def search_get_action():
+        for board, actions, _ in turns[:SEARCH_BOARDS]:
+            # Tabella vuota: ogni ricerca parte da zero
+            searcher._table.clear()
+            searcher.get_action(actions, board)
+
+    cases["search.get_action_depth%d" % SEARCH_DEPTH] = (search_get_action, min(SEARCH_BOARDS, len(turns)))
+    return cases
+
+
+def run_micro(repeat: int = REPEAT, seed: int = SEED) -> dict:
+    '''
+    Esegue i micro-benchmark: il numero di chiamate per ripetizione è
+    scelto da timeit (almeno 0.2 secondi), i tempi sono per operazione.
+    '''
+    random.seed(seed)
+    results = {}
+    for name, (function, operations) in micro_cases(sample_boards(seed=seed)).items():
+        timer = timeit.Timer(function)
+        number, _ = timer.autorange()
+        times = [t / (number * operations) * 1e6 for t in timer.repeat(repeat, number)]
+        results[name] = {
+            "min_us": min(times),
+            "median_us": statistics.median(times),
+            "operations": number * operations,
+        }
+        print(f"{name:32} {results[name]['median_us']:12.3f} us/op (min {results[name]['min_us']:.3f})")
+    return results
+
+
+# ========== MACRO-BENCHMARK ==========
+
+def percentile(values, p: float) -> float:
+    '''Percentile p (0-100) con il metodo del rango più vicino.'''
+    ordered = sorted(values)
+    index = max(0, -(-len(ordered) * p // 100) - 1)
+    return ordered[int(index)]
+
+
+class ScriptedScheduler:
+    '''
+    Sostituisce il FrameScheduler di OrsoPyGame: non attende tra un frame
+    e l'altro, misura il tempo di lavoro di ogni frame e ogni CLICK_EVERY
+    frame genera il click del giocatore di turno su una mossa valida.
+    Dopo `frames` frame ferma la manche.
+    '''
+
+    def __init__(self, game, frames: int, seed: int = SEED, click_every: int = CLICK_EVERY):
+        self.game = game
+        self.frames = frames
+        self.click_every = click_every
+        self.frame_times = []
+        self.clicks = 0
+        self._rng = random.Random(seed)
+        self._pending = []
+        self._frame = 0
+        self._frame_start = None
+
+    def keep_awake(self) -> None:
+        pass
+
+    async def next_frame(self) -> list:
+        import pygame
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self.frame_times.append(now - self._frame_start)
+        if len(self.frame_times) >= self.frames:
+            self.game._running = False
+        self._frame += 1
+        if not self._frame % self.click_every:
+            position = self._next_click()
+            if position is not None:
+                pygame.mouse.set_pos(position)
+                pygame.event.post(pygame.event.Event(
+                    pygame.MOUSEBUTTONDOWN, pos=position, button=1))
+                self.clicks += 1
+        await asyncio.sleep(0)
+        events = pygame.event.get()
+        self._frame_start = time.perf_counter()
+        return events
+
+    def _next_click(self):
+        '''Centro della prossima casella da cliccare, None a manche finita'''
+        manche = self.game.una_manche
+        if not self._pending:
+            if manche.game_over():
+                return None
+            if manche.is_hunter_turn():
+                self._pending = list(self._rng.choice(manche.get_hunter_actions()))
+            else:
+                self._pending = [self._rng.choice(manche.get_bear_actions())[1]]
+        position = self._pending.pop(0)
+        for casella in self.game._lista_caselle:
+            if casella.position == position:
+                return casella.rect.center
+        return None
+
+
+async def _play_frames(frames: int, seed: int) -> dict:
+    import main
+    # Niente audio né pause: si misura solo il ciclo della manche
+    main.MUSIC = False
+    game = main.OrsoPyGame()
+    game.END_MANCHE_PAUSE = 0
+    main.load_image_assets()
+    scheduler = ScriptedScheduler(game, frames, seed)
+    game._scheduler = scheduler
+    manches = 0
+    bear_moves = []
+    first_manche_as_bear = True
+    while len(scheduler.frame_times) < frames:
+        moves = await game.manche(first_manche_as_bear, False, manches % 2 == 0)
+        if moves is not None:
+            manches += 1
+            bear_moves.append(moves)
+        first_manche_as_bear = not first_manche_as_bear
+    frame_ms = [t * 1000 for t in scheduler.frame_times]
+    return {
+        "frames": len(frame_ms),
+        "clicks": scheduler.clicks,
+        "manches": manches,
+        "bear_moves_mean": statistics.mean(bear_moves) if bear_moves else None,
+        "frame_ms": {
+            "mean": statistics.mean(frame_ms),
+            "p50": percentile(frame_ms, 50),
+            "p95": percentile(frame_ms, 95),
+            "p99": percentile(frame_ms, 99),
+            "max": max(frame_ms),
+        },
+    }
+
+
+def run_macro(frames: int = MACRO_FRAMES, seed: int = SEED) -> dict:
+    '''
+    Gioca manches umano contro umano con input simulato per `frames` frame,
+    senza finestra e senza audio.
+    '''
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    results = asyncio.run(_play_frames(frames, seed))
+    frame_ms = results["frame_ms"]
+    print(f"{results['frames']} frame, {results['manches']} manches, {results['clicks']} click: "
+          f"media {frame_ms['mean']:.3f} ms, p50 {frame_ms['p50']:.3f} ms, "
+          f"p95 {frame_ms['p95']:.3f} ms, p99 {frame_ms['p99']:.3f} ms")
+    return results
+
+
+# ========== CONFRONTO ==========
+
+def metrics(results: dict) -> dict:
+    '''Misure confrontabili (tutte "più basso è meglio"): nome -> valore'''
+    values = {}
+    for name, micro in results.get("micro", {}).items():
+        values[name] = micro["median_us"]
+    macro = results.get("macro")
+    if macro:
+        for stat in ("mean", "p50", "p95"):
+            values["macro.frame_ms." + stat] = macro["frame_ms"][stat]
+    return values
+
+
+def compare(results: dict, baseline: dict, tolerance: float = TOLERANCE) -> list[str]:
+    '''
+    Confronta le misure con quelle della baseline e stampa le differenze.
+
+    Returns:
+        Nomi delle misure peggiorate oltre la tolleranza
+    '''
+    current, reference = metrics(results), metrics(baseline)
+    regressions = []
+    print(f"\n{'misura':32} {'baseline':>12} {'attuale':>12} {'diff':>8}")
+    for name in sorted(current.keys() & reference.keys()):
+        old, new = reference[name], current[name]
+        change = (new - old) / old if old else 0.0
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  REGRESSIONE"
+        elif change < -tolerance:
+            flag = "  migliorata"
+        print(f"{name:32} {old:12.3f} {new:12.3f} {change:+8.1%}{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del motore, dell'AI e del ciclo di disegno")
+    parser.add_argument("--only", choices=("micro", "macro"),
+                        help="esegue solo i micro o solo il macro-benchmark")
+    parser.add_argument("--frames", type=int, default=MACRO_FRAMES)
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--out", help="file JSON in cui salvare i risultati")
+    parser.add_argument("--compare", metavar="BASELINE", nargs="?", const=BASELINE_FILE,
+                        help="file JSON di un'esecuzione precedente con cui confrontarsi "
+                             f"(senza argomento: {BASELINE_FILE})")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="peggioramento relativo tollerato (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    results = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+    }
+    if args.only != "macro":
+        results["micro"] = run_micro(args.repeat, args.seed)
+    if args.only != "micro":
+        results["macro"] = run_macro(args.frames, args.seed)
+    if args.out:
+        with open(args.out, "w") as file_write:
+            json.dump(results, file_write, indent=1)
+    if args.compare:
+        with open(args.compare) as file_read:
+            baseline = json.load(file_read)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regressioni oltre il {args.tolerance:.0%}")
+            sys.exit(1)
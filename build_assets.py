@@ -0,0 +1,157 @@
+'''
+Preparazione offline degli asset grafici per la risoluzione 1280x720.
+
+Le immagini originali in assets-src/img/ sono disegnate per 1536x864:
+invece di ridurle a ogni avvio con scale_img, questo script le scala una
+volta sola (con lo stesso pygame.transform.scale del gioco, quindi con
+pixel identici) e le scrive in img/scaled/, che il gioco legge al posto
+degli originali:
+- immagini con al più 256 colori (trasparenza compresa): PNG a palette, senza perdita
+- sfondi opachi: PNG a palette di 256 colori (quantizzati)
+- le altre: PNG RGBA ottimizzato
+Le 14 pedine e orme della scacchiera sono raccolte in un unico atlante
+(pedine.png) con un indice JSON (pedine.json) dei rettangoli di ogni sprite.
+
+Solo img/scaled/ è distribuito con il gioco: assets-src/ è tolta dalla
+build web (vedi .github/workflows/pygbag.yml).
+
+Per la compressione a palette serve Pillow, che non è una dipendenza del
+gioco; senza Pillow le immagini sono salvate da pygame a colori pieni.
+
+Esempio:
+    python build_assets.py
+'''
+
+from __future__ import annotations
+import argparse
+import json
+import os
+
+import pygame
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow è opzionale
+    Image = None
+
+SOURCE_DIR = os.path.join("assets-src", "img")
+SCALED_DIR = os.path.join("img", "scaled")
+# Fattore di scala da 1536x864 a 1280x720, lo stesso di main.scale_img
+SCALE_FACTOR = 0.833333
+
+# Atlante delle pedine e delle orme della scacchiera
+ATLAS_NAME = "pedine"
+ATLAS_SPRITES = (
+    "little-bear", "little-bear-idle", "little-bear-sel",
+    "little-hunter1", "little-hunter1-idle", "little-hunter1-sel",
+    "little-hunter2", "little-hunter2-idle", "little-hunter2-sel",
+    "little-hunter3", "little-hunter3-idle", "little-hunter3-sel",
+    "impronta_orso", "impronta_cacciatore",
+)
+# Sprite per riga nell'atlante
+ATLAS_COLUMNS = 7
+
+
+def scale_surface(surface: pygame.Surface, scale_factor: float = SCALE_FACTOR) -> pygame.Surface:
+    '''Stessa riduzione di main.scale_img.'''
+    new_width = int(surface.get_width() * scale_factor)
+    new_height = int(surface.get_height() * scale_factor)
+    return pygame.transform.scale(surface, (new_width, new_height))
+
+
+def _to_pil(surface: pygame.Surface):
+    surface = surface.convert_alpha() if pygame.display.get_surface() else surface
+    return Image.frombytes("RGBA", surface.get_size(), pygame.image.tobytes(surface, "RGBA"))
+
+
+def _palette_image(image):
+    '''Conversione a palette senza perdita, se l'immagine ha al più 256 colori RGBA.'''
+    colors = image.getcolors(256)
+    if colors is None:
+        return None
+    palette_index = {bytes(color): i for i, (_, color) in enumerate(colors)}
+    data = image.tobytes()
+    indices = bytes(palette_index[data[i:i + 4]] for i in range(0, len(data), 4))
+    palette_image = Image.frombytes("P", image.size, indices)
+    palette_image.putpalette([channel for _, color in colors for channel in color[:3]])
+    alpha = bytes(color[3] for _, color in colors)
+    if any(a != 255 for a in alpha):
+        palette_image.info["transparency"] = alpha
+    return palette_image
+
+
+def save_png(surface: pygame.Surface, path: str, colors: int = 256) -> None:
+    '''
+    Salva la superficie come PNG il più compatto possibile (vedi docstring
+    del modulo); `colors` = 0 disattiva la quantizzazione degli sfondi opachi.
+    '''
+    if Image is None:
+        pygame.image.save(surface, path)
+        return
+    image = _to_pil(surface)
+    optimized = _palette_image(image)
+    if optimized is None and colors and image.getchannel("A").getextrema() == (255, 255):
+        optimized = image.convert("RGB").quantize(colors)
+    if optimized is not None:
+        optimized.save(path, "PNG", optimize=True,
+                       transparency=optimized.info.get("transparency"))
+    else:
+        image.save(path, "PNG", optimize=True)
+
+
+def build_atlas(sprites: dict[str, pygame.Surface]) -> tuple[pygame.Surface, dict]:
+    '''
+    Dispone gli sprite (tutti della stessa dimensione) in una griglia.
+
+    Returns:
+        Superficie dell'atlante e indice nome -> [x, y, larghezza, altezza]
+    '''
+    width = max(s.get_width() for s in sprites.values())
+    height = max(s.get_height() for s in sprites.values())
+    rows = -(-len(sprites) // ATLAS_COLUMNS)
+    atlas = pygame.Surface((ATLAS_COLUMNS * width, rows * height), pygame.SRCALPHA)
+    index = {}
+    for i, (name, sprite) in enumerate(sprites.items()):
+        x, y = (i % ATLAS_COLUMNS) * width, (i // ATLAS_COLUMNS) * height
+        atlas.blit(sprite, (x, y))
+        index[name] = [x, y, sprite.get_width(), sprite.get_height()]
+    return atlas, index
+
+
+def build(source_dir: str = SOURCE_DIR, out_dir: str = SCALED_DIR, colors: int = 256) -> None:
+    os.makedirs(out_dir, exist_ok=True)
+    sprites = {}
+    for file_name in sorted(os.listdir(source_dir)):
+        name, ext = os.path.splitext(file_name)
+        if ext.lower() != ".png":
+            continue
+        source = os.path.join(source_dir, file_name)
+        scaled = scale_surface(pygame.image.load(source))
+        if name in ATLAS_SPRITES:
+            sprites[name] = scaled
+            continue
+        out = os.path.join(out_dir, file_name)
+        save_png(scaled, out, colors)
+        print(f"{source} -> {out}: {os.path.getsize(source)} -> {os.path.getsize(out)} byte")
+
+    missing = set(ATLAS_SPRITES) - set(sprites)
+    if missing:
+        raise FileNotFoundError(f"Sprite mancanti per l'atlante: {sorted(missing)}")
+    atlas, index = build_atlas({name: sprites[name] for name in ATLAS_SPRITES})
+    atlas_image = ATLAS_NAME + ".png"
+    save_png(atlas, os.path.join(out_dir, atlas_image), colors)
+    with open(os.path.join(out_dir, ATLAS_NAME + ".json"), "w") as file_write:
+        json.dump({"image": atlas_image, "sprites": index}, file_write, indent=1)
+    print(f"{len(index)} sprite -> {os.path.join(out_dir, atlas_image)}: "
+          f"{os.path.getsize(os.path.join(out_dir, atlas_image))} byte")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Scala gli asset per 1280x720 e crea l'atlante delle pedine")
+    parser.add_argument("--source", default=SOURCE_DIR)
+    parser.add_argument("--out", default=SCALED_DIR)
+    parser.add_argument("--colors", type=int, default=256,
+                        help="colori della palette per gli sfondi opachi (0 = nessuna quantizzazione)")
+    args = parser.parse_args()
+    build(args.source, args.out, args.colors)
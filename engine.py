@@ -0,0 +1,860 @@
+'''
+Logica del Gioco dell'Orso, indipendente da PyGame.
+Contiene la manche (BearGameManche) e i giocatori AI basati su policy (Player),
+così da poter essere usata sia dall'interfaccia grafica (main.py)
+sia dagli strumenti senza grafica (simulate.py).
+'''
+
+from __future__ import annotations
+from itertools import combinations
+from typing import List, Optional, Tuple
+import asyncio
+import copy
+import random
+import time
+
+from policy import (
+    BEAR_POLICY_FILE, BEAR_POLICY_OFFSET, BEAR_SHIFT, HUNTER_POLICY_FILE,
+    HUNTER_POLICY_OFFSET, HUNTERS_MASK, IS_WEB, get_policy, unpack_key
+)
+
+INFINITY = float('inf')
+
+# Tempo minimo, in secondi, tra l'inizio del turno del computer e la sua mossa
+# (simula il "pensiero" dell'AI, anche quando la scelta è immediata)
+AI_MIN_THINK_TIME = 1.0
+
+# ========== SIMBOLI PER LA SCACCHIERA ==========
+# Simboli usati nella rappresentazione logica della board
+BOARD_HUNTER_1 = '1'  # Primo cacciatore
+BOARD_HUNTER_2 = '8'  # Secondo cacciatore
+BOARD_HUNTER_3 = '9'  # Terzo cacciatore
+BOARD_BEAR = '2'      # Orso
+BOARD_EMPTY = '_'     # Casella vuota
+
+# Simbolo normalizzato per le policy AI (tutti i cacciatori sono uguali per l'AI)
+BOARD_HUNTER_POLICY = '1'
+# Simboli dei tre cacciatori, nell'ordine di assegnazione iniziale
+HUNTER_SYMBOLS = (BOARD_HUNTER_1, BOARD_HUNTER_2, BOARD_HUNTER_3)
+
+# ========== VISTA DELLE CASELLE ==========
+# Variante grafica di una casella: con il simbolo della pedina forma la
+# chiave dell'immagine da mostrare, ad esempio (BOARD_HUNTER_2, CELL_SELECTED)
+CELL_BASE = 'base'            # casella vuota, orso fermo, cacciatore di turno
+CELL_SELECTED = 'sel'         # orso di turno o cacciatore selezionato
+CELL_IDLE = 'idle'            # cacciatore durante il turno dell'orso
+CELL_FOOTPRINT = 'orma'       # casella vuota raggiungibile (orma dell'orso o dei cacciatori)
+
+
+def _adjacency_masks(adjacent_positions) -> list[int]:
+    '''Per ogni casella, maschera a 21 bit delle caselle adiacenti.'''
+    return [sum(1 << x for x in adj) for adj in adjacent_positions]
+
+
+def _distance_table(adjacent_positions) -> list[list[int]]:
+    '''Distanza minima, in mosse, tra ogni coppia di caselle (una visita in ampiezza per casella).'''
+    table = []
+    for start in range(len(adjacent_positions)):
+        distances = [-1] * len(adjacent_positions)
+        distances[start] = 0
+        queue = [start]
+        for position in queue:
+            for adjacent in adjacent_positions[position]:
+                if distances[adjacent] < 0:
+                    distances[adjacent] = distances[position] + 1
+                    queue.append(adjacent)
+        table.append(distances)
+    return table
+
+
+def _moves_table(adjacent_positions) -> list[dict[int, tuple[int, ...]]]:
+    '''
+    Per ogni casella, tabella (maschera delle adiacenti libere) -> destinazioni.
+    Le destinazioni mantengono l'ordine di ADJACENT_POSITIONS.
+    '''
+    table = []
+    for adj in adjacent_positions:
+        moves = {}
+        for subset in range(1 << len(adj)):
+            free = tuple(x for i, x in enumerate(adj) if subset >> i & 1)
+            moves[sum(1 << x for x in free)] = free
+        table.append(moves)
+    return table
+
+
+def iter_bits(mask: int):
+    '''Restituisce le posizioni dei bit accesi della maschera, in ordine crescente.'''
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _move_deltas(positions: int) -> tuple[list[list[int]], list[list[int]]]:
+    '''
+    Tabelle [partenza][arrivo] -> valore da mettere in XOR con la chiave di
+    stato per ottenere la chiave dopo la mossa, per orso e per cacciatori.
+    '''
+    bear = [[(s ^ e) << BEAR_SHIFT for e in range(positions)] for s in range(positions)]
+    hunter = [[(1 << s) | (1 << e) for e in range(positions)] for s in range(positions)]
+    return bear, hunter
+
+
+class BearGameManche:
+    '''
+    Gestisce la logica di una singola manche del gioco.
+    Questa classe è indipendente da PyGame e contiene solo la logica del gioco.
+    
+    La scacchiera ha 21 posizioni numerate da 0 a 20:
+    - '_' indica una casella vuota
+    - '1', '8', '9' indicano i tre cacciatori
+    - '2' indica l'orso
+
+    Internamente la scacchiera è una bitboard: una maschera a 21 bit con le
+    caselle occupate dai cacciatori più la posizione dell'orso. I simboli
+    dei cacciatori servono solo alla grafica e sono tenuti a parte.
+    '''
+    
+    # ========== CONFIGURAZIONE GIOCO ==========
+    BOARD_POSITIONS = 21           # Numero totale di posizioni sulla scacchiera
+    MAX_BEAR_MOVES = 40            # Mosse massime per la vittoria dell'orso
+    HUNTER_STARTS = False          # Se True, iniziano i cacciatori
+    
+    # Definisce quali posizioni sono adiacenti a ciascuna casella
+    # L'indice della lista corrisponde alla posizione sulla board
+    ADJACENT_POSITIONS = [
+        [1,2,3],        # Posizione 0: collegata a 1,2,3
+        [0,3,4],        # Posizione 1: collegata a 0,3,4
+        [0,3,6],        # Posizione 2: collegata a 0,3,6
+        [0,1,2,5],      # Posizione 3: nodo centrale, 4 collegamenti
+        [1,7,8],        # Posizione 4
+        [3,9,10,11],    # Posizione 5: nodo importante con 4 collegamenti
+        [2,12,13],      # Posizione 6
+        [4,8,14],       # Posizione 7
+        [7,4,14,9],     # Posizione 8: 4 collegamenti
+        [8,10,5,15],    # Posizione 9: 4 collegamenti
+        [5,9,11,15],    # Posizione 10: 4 collegamenti
+        [5,10,15,12],   # Posizione 11: 4 collegamenti
+        [11,6,16,13],   # Posizione 12: 4 collegamenti
+        [6,12,16],      # Posizione 13
+        [7,8,18],       # Posizione 14
+        [9,10,11,17],   # Posizione 15: nodo importante con 4 collegamenti
+        [12,13,19],     # Posizione 16
+        [15,18,19,20],  # Posizione 17: nodo importante con 4 collegamenti
+        [14,17,20],     # Posizione 18
+        [16,17,20],     # Posizione 19
+        [18,17,19]      # Posizione 20: posizione iniziale classica dell'orso
+    ]
+
+    # Maschere precalcolate delle adiacenze e tabella delle mosse per casella
+    ADJACENT_MASKS = _adjacency_masks(ADJACENT_POSITIONS)
+    MOVES_TABLE = _moves_table(ADJACENT_POSITIONS)
+    # Distanze minime tra le caselle: DISTANCES[da][a]
+    DISTANCES = _distance_table(ADJACENT_POSITIONS)
+    # Delta XOR della chiave di stato per ogni mossa, indicizzati per turno:
+    # MOVE_DELTAS[is_hunter_turn][partenza][arrivo]
+    MOVE_DELTAS = _move_deltas(BOARD_POSITIONS)
+
+    # Disposizioni iniziali: posizioni dei cacciatori (1, 8, 9) e dell'orso
+    CLASSIC_HUNTERS = (0, 1, 2)
+    CLASSIC_BEAR = 20
+    CENTRAL_HUNTERS = (5, 9, 11)   # Disposizione centrale "Iacazio"
+    CENTRAL_BEAR = 10
+
+    def __init__(self, 
+                 first_manche_as_bear: bool,
+                 against_computer: bool, 
+                 classic_initial_position: bool,
+                 load_ai: bool = True):
+        '''
+        Inizializza una manche e carica le policy per l'AI.
+        
+        Args:
+            first_manche_as_bear: True se il giocatore umano inizia come orso
+            against_computer: True se si gioca contro l'AI
+            classic_initial_position: True per posizione iniziale classica (cacciatori in alto, orso in basso)
+            load_ai: False per una manche senza giocatori AI (es. il self-play
+                di train.py, che sceglie le mosse da sé): nessuna policy viene
+                letta finché non si chiama set_ai_players
+        '''
+        # Imposta la configurazione iniziale della board
+        self.reset(against_computer, classic_initial_position)
+        self.first_manche_as_bear = first_manche_as_bear
+        if not load_ai:
+            self._bear_player = self._hunter_player = None
+            return
+        
+        # ========== CARICAMENTO AI ORSO ==========
+        # Carica la policy appresa tramite Reinforcement Learning
+        # (condivisa tramite la cache di processo, vedi get_policy)
+        self._bear_player = Player("orso")
+        self._bear_player.load_policy(BEAR_POLICY_FILE)
+
+        # ========== CARICAMENTO AI CACCIATORE ==========
+        # Carica la policy deterministica basata sulla distanza
+        self._hunter_player = Player("cacciatore")
+        self._hunter_player.load_policy(HUNTER_POLICY_FILE)
+        
+    def set_ai_players(self, bear_player, hunter_player) -> None:
+        '''
+        Sostituisce i giocatori AI (ad esempio con quelli a ricerca di search.py).
+        Ogni giocatore deve offrire get_action(actions, manche).
+        '''
+        self._bear_player = bear_player
+        self._hunter_player = hunter_player
+
+    def reset(self, against_computer: bool, classic_initial_position: bool) -> None:
+        '''
+        Reimposta la board e le variabili di gioco per iniziare una nuova manche.
+        
+        Ci sono due configurazioni iniziali possibili:
+        1. Classica: cacciatori in posizioni 0,1,2 - orso in posizione 20
+        2. Centrale (Iacazio): configurazione più bilanciata per partite veloci
+        '''
+        if classic_initial_position:
+            # Configurazione classica: cacciatori raggruppati in alto, orso in 20
+            hunters = self.CLASSIC_HUNTERS
+            self._bear_position = self.CLASSIC_BEAR
+        else:
+            # Configurazione centrale "Iacazio" per partite più veloci
+            hunters = self.CENTRAL_HUNTERS
+            self._bear_position = self.CENTRAL_BEAR
+        # Maschera delle caselle occupate dai cacciatori
+        self._hunters = 0
+        for position in hunters:
+            self._hunters |= 1 << position
+        # Simbolo grafico di ogni cacciatore, per posizione
+        self._hunter_symbols = dict(zip(hunters, HUNTER_SYMBOLS))
+        # Chiave di stato per le policy, aggiornata ad ogni mossa
+        self._state_key = (self._bear_position << BEAR_SHIFT) | self._hunters
+        
+        # Inizializza le variabili di stato
+        self._bear_moves = 0                    # Contatore mosse orso
+        self._hunter_starting_pos = -1          # Posizione cacciatore selezionato (-1 = nessuno)
+        self._hunter_ai_final = -1              # Destinazione AI cacciatore
+        self._ai_task = None                    # Calcolo in corso della mossa AI
+        self._ai_started = 0.0                  # Inizio del turno del computer
+        self._is_hunter_turn = self.HUNTER_STARTS  # Di chi è il turno
+        self.against_computer = against_computer
+        # Versione della vista: cresce ad ogni mossa o selezione
+        self._view_version = 0
+        self._view = None                       # (versione, chiavi delle caselle)
+        self._winner = None                     # Messaggio del vincitore
+        # Mosse effettuate (per undo), come coppie partenza, arrivo in sequenza
+        self._history = []
+
+    # ========== METODI GETTER ==========
+    
+    def get_bear_moves(self) -> int:
+        '''Restituisce il numero di mosse completate dall'orso.'''
+        return self._bear_moves
+
+    def get_max_bear_moves(self) -> int:
+        '''Restituisce il numero massimo di mosse per la vittoria dell'orso.'''
+        return self.MAX_BEAR_MOVES
+
+    def get_board_position(self, position: int) -> str:
+        '''
+        Restituisce il simbolo ('1','8','9','2','_') presente nella posizione specificata.
+        
+        Args:
+            position: Indice della posizione (0-20)
+        Returns:
+            Stringa con il simbolo della pedina o '_' per vuoto
+        '''
+        if position == self._bear_position:
+            return BOARD_BEAR
+        return self._hunter_symbols.get(position, BOARD_EMPTY)
+
+    def get_hunter_starting_pos(self) -> int:
+        '''
+        Restituisce la posizione del cacciatore attualmente selezionato.
+        Returns -1 se nessun cacciatore è selezionato.
+        '''
+        return self._hunter_starting_pos
+
+    @classmethod
+    def placements(cls):
+        '''Tutte le disposizioni possibili come (posizione orso, maschera cacciatori).'''
+        for hunters in combinations(range(cls.BOARD_POSITIONS), 3):
+            hunters_mask = sum(1 << h for h in hunters)
+            for bear in range(cls.BOARD_POSITIONS):
+                if not hunters_mask >> bear & 1:
+                    yield bear, hunters_mask
+
+    def get_hunter_positions(self) -> list[int]:
+        '''Restituisce le posizioni dei cacciatori in ordine crescente.'''
+        return list(iter_bits(self._hunters))
+    
+    def bear_mobility(self) -> int:
+        '''Numero di caselle libere in cui l'orso può muoversi.'''
+        return self._free_adjacent(self._bear_position).bit_count()
+
+    # ========== METODI DI CONTROLLO VITTORIA ==========
+
+    def is_over(self) -> bool:
+        '''Come game_over, ma senza impostare il messaggio del vincitore.'''
+        return (not self._free_adjacent(self._bear_position) or
+                self._bear_moves >= self.MAX_BEAR_MOVES)
+    
+    def is_bear_winner(self) -> bool:
+        '''
+        Verifica se l'orso ha vinto.
+        L'orso vince se raggiunge MAX_BEAR_MOVES mosse.
+        '''
+        # L'orso perde se non ha mosse disponibili
+        if not(self._free_adjacent(self._bear_position)):
+            return False
+        # L'orso vince se raggiunge il numero massimo di mosse
+        if (self._bear_moves >= self.MAX_BEAR_MOVES):
+            return True
+
+    def game_over(self) -> bool:
+        '''
+        Verifica se la manche è terminata e imposta il messaggio del vincitore.
+        
+        Returns:
+            True se la partita è finita, False altrimenti
+        '''
+        # Cacciatori vincono se l'orso non ha mosse disponibili
+        if not(self._free_adjacent(self._bear_position)):
+            self._winner = f"I cacciatori vincono; l'orso ha fatto {self.get_bear_moves()} mosse"
+            return True
+        # Orso vince se raggiunge il numero massimo di mosse
+        elif (self._bear_moves >= self.MAX_BEAR_MOVES):
+            self._winner = f"L'orso è scappato; ha fatto {self.get_bear_moves()} mosse"
+            return True
+        else:
+            return False
+
+    # ========== METODI DI UTILITÀ ==========
+    
+    def is_hunter(self, selection: str) -> bool:
+        '''Verifica se il simbolo rappresenta un cacciatore.'''
+        return selection in HUNTER_SYMBOLS
+
+    def is_hunter_at(self, position: int) -> bool:
+        '''Verifica se nella posizione c'è un cacciatore.'''
+        return bool(self._hunters >> position & 1)
+
+    def is_hunter_turn(self) -> bool:
+        '''Verifica se è il turno dei cacciatori.'''
+        return self._is_hunter_turn
+
+    def _free_adjacent(self, position: int) -> int:
+        '''Maschera delle caselle adiacenti libere.'''
+        occupied = self._hunters | (1 << self._bear_position)
+        return self.ADJACENT_MASKS[position] & ~occupied
+
+    def _place_hunter(self, start_position: int, end_position: int) -> None:
+        '''Sposta il cacciatore sulla bitboard, mantenendo il suo simbolo.'''
+        delta = (1 << start_position) | (1 << end_position)
+        self._hunters ^= delta
+        self._state_key ^= delta
+        self._hunter_symbols[end_position] = self._hunter_symbols.pop(start_position)
+        self._view_version += 1
+
+    def _place_bear(self, new_position: int) -> None:
+        '''Sposta l'orso aggiornando la chiave di stato.'''
+        self._state_key += (new_position - self._bear_position) << BEAR_SHIFT
+        self._bear_position = new_position
+        self._view_version += 1
+
+    def _select_hunter(self, position: int) -> None:
+        '''Seleziona il cacciatore da muovere (-1 = nessuno).'''
+        self._hunter_starting_pos = position
+        self._view_version += 1
+
+    # ========== GESTIONE MOSSE CACCIATORE (UMANO) ==========
+    
+    def manage_hunter_selection(self, sel: int) -> str:
+        '''
+        Gestisce la selezione e il movimento dei cacciatori da parte del giocatore umano.
+        Il processo è in due fasi: prima si seleziona un cacciatore, poi la destinazione.
+        
+        Args:
+            sel: Posizione selezionata dal giocatore
+        Returns:
+            Messaggio da visualizzare all'utente
+        '''
+        # FASE 1: Selezione del cacciatore
+        if self._hunter_starting_pos == -1:
+            if not(self.is_hunter_at(sel)):
+                return "Seleziona un cacciatore!"
+            else:
+                # Cacciatore selezionato, aspetta la destinazione
+                self._select_hunter(sel)
+                return "Cacciatore, fa' la tua mossa!"
+        
+        # FASE 2: Selezione della destinazione
+        else:
+            if self._free_adjacent(self._hunter_starting_pos) >> sel & 1:
+                # Mossa valida: sposta il cacciatore e cambia turno
+                self.move_hunter(self._hunter_starting_pos, sel)
+                self._select_hunter(-1)  # Reset selezione
+                return "Orso, scegli la tua mossa!"
+            else:
+                # Mossa non valida: torna alla fase di selezione
+                self._select_hunter(-1)
+                return "Posizione non valida!"
+    
+    # ========== GESTIONE MOSSE CACCIATORE (AI) ==========
+    
+    def manage_ai_hunter_selection(self) -> Optional[str]:
+        '''
+        Gestisce la mossa dell'AI cacciatore; va chiamato a ogni frame
+        durante il turno del computer e non blocca mai: la mossa è calcolata
+        in background (vedi start_ai_action).
+        Simula il comportamento umano in due fasi: selezione e movimento.
+        
+        Returns:
+            Messaggio da visualizzare, None se non è cambiato nulla
+        '''
+        action = self._poll_ai_action()
+        if action is None:
+            return None
+        # FASE 1: Selezione del cacciatore da muovere
+        if (self._hunter_starting_pos == -1):
+            self._select_hunter(action[0])         # Cacciatore scelto
+            self._hunter_ai_final = action[1]      # Destinazione scelta
+            return "Cacciatore selezionato"
+        
+        # FASE 2: Esecuzione della mossa, trascorso il tempo minimo di "pensiero"
+        if not self._ai_min_time_elapsed():
+            return None
+        self._ai_task = None
+        self.move_hunter(self._hunter_starting_pos, self._hunter_ai_final)
+        self._select_hunter(-1)
+        self._hunter_ai_final = -1
+        return "Orso, scegli la tua mossa!"
+
+    def get_hunter_actions(self) -> List[Tuple[int, int]]:
+        '''
+        Restituisce tutte le azioni possibili per i cacciatori.
+        
+        Returns:
+            Lista di tuple (posizione_cacciatore, destinazione_possibile)
+        '''
+        hunter_actions = []
+        for x in iter_bits(self._hunters):
+            for move in self.get_possible_moves(x):
+                hunter_actions.append((x, move))
+        return hunter_actions
+
+    def choose_ai_action(self) -> Tuple[int, int]:
+        '''
+        Sceglie, con la policy del giocatore di turno, l'azione da eseguire.
+        Non modifica la board e non attende: è usato dalla simulazione
+        senza grafica e, su una copia della manche, da think_ai_action.
+        '''
+        if self._is_hunter_turn:
+            return self._hunter_player.get_action(self.get_hunter_actions(), self)
+        else:
+            return self._bear_player.get_action(self.get_bear_actions(), self)
+
+    # ========== CALCOLO IN BACKGROUND DELLE MOSSE AI ==========
+
+    async def think_ai_action(self) -> Tuple[int, int]:
+        '''
+        Calcola l'azione AI del giocatore di turno senza bloccare il ciclo
+        dei frame. Il calcolo lavora su una copia della manche, così la
+        ricerca può muovere e annullare mosse mentre la board viene disegnata:
+        - desktop: in un thread dell'executor di asyncio
+        - web (pygbag, senza thread): con get_action_async del giocatore,
+          che cede il controllo al ciclo dei frame tra un blocco e l'altro
+        '''
+        board = self.copy()
+        if board.is_hunter_turn():
+            player, actions = board._hunter_player, board.get_hunter_actions()
+        else:
+            player, actions = board._bear_player, board.get_bear_actions()
+        # Ogni richiesta usa una copia del giocatore: un calcolo annullato
+        # (undo, nuova manche) non può più modificare il giocatore della
+        # manche, che riprende i risultati solo a calcolo concluso
+        worker = player.fork()
+        try:
+            if IS_WEB:
+                action = await worker.get_action_async(actions, board)
+            else:
+                loop = asyncio.get_running_loop()
+                action = await loop.run_in_executor(None, worker.get_action, actions, board)
+        except asyncio.CancelledError:
+            worker.stop()
+            raise
+        player.join(worker)
+        return action
+
+    def start_ai_action(self) -> None:
+        '''Avvia in background il calcolo della mossa AI (richiede un event loop attivo).'''
+        self._ai_started = time.perf_counter()
+        self._ai_task = asyncio.ensure_future(self.think_ai_action())
+
+    def cancel_ai_action(self) -> None:
+        '''Interrompe l'eventuale calcolo in corso, ad esempio uscendo dalla manche.'''
+        if self._ai_task is not None:
+            self._ai_task.cancel()
+            self._ai_task = None
+
+    def _poll_ai_action(self) -> Optional[Tuple[int, int]]:
+        '''
+        Avvia il calcolo al primo frame del turno del computer e restituisce
+        l'azione scelta quando è pronta (None nel frattempo).
+        Eventuali errori del calcolo sono rilanciati qui.
+        '''
+        if self._ai_task is None:
+            self.start_ai_action()
+        if not self._ai_task.done():
+            return None
+        return self._ai_task.result()
+
+    def _ai_min_time_elapsed(self) -> bool:
+        return time.perf_counter() - self._ai_started >= AI_MIN_THINK_TIME
+
+    # ========== GESTIONE MOSSE ORSO ==========
+    
+    def get_bear_actions(self) -> List[Tuple[int, int]]:
+        '''
+        Restituisce tutte le azioni possibili per l'orso.
+        
+        Returns:
+            Lista di tuple (posizione_corrente, destinazione_possibile)
+        '''
+        bear = self._bear_position
+        return [(bear, adj) for adj in self.get_possible_moves(bear)]
+
+    def move_bear(self, new_position: int) -> None:
+        '''
+        Muove l'orso in una nuova posizione.
+        Questo metodo è usato dalle mosse della manche (umane e AI) e dal
+        metodo move_player, quindi ogni mossa può essere annullata da undo_move.
+        
+        Args:
+            new_position: Posizione di destinazione
+        Raises:
+            ValueError: Se la mossa non è valida
+        '''
+        if self._free_adjacent(self._bear_position) >> new_position & 1:
+            self._history.append(self._bear_position)
+            self._history.append(new_position)
+            self._place_bear(new_position)
+            self._bear_moves += 1  # Incrementa il contatore
+            self._is_hunter_turn = not self._is_hunter_turn
+        else:
+            print((self._bear_position, new_position))
+            raise ValueError("Orso non può muoversi qui!")
+
+    def move_hunter(self, start_position: int, end_position: int) -> None:
+        '''
+        Muove un cacciatore da una posizione a un'altra.
+        Usato dal metodo move_player per l'AI e dalle mosse della manche.
+        '''
+        self._history.append(start_position)
+        self._history.append(end_position)
+        self._place_hunter(start_position, end_position)
+        self._is_hunter_turn = not self._is_hunter_turn
+
+    def move_player(self, start_pos, end_pos) -> None:
+        '''
+        Interfaccia generica per muovere un giocatore.
+        Chiama move_hunter o move_bear in base al turno.
+        Usato dall'AI per simulare mosse durante la ricerca.
+        '''
+        if self._is_hunter_turn:
+            return self.move_hunter(start_pos, end_pos)
+        else:
+            return self.move_bear(end_pos)
+
+    def manage_ai_smart_bear_selection(self) -> Optional[str]:
+        '''
+        Gestisce la mossa dell'AI orso usando la policy di Reinforcement Learning.
+        Va chiamato a ogni frame durante il turno del computer: la mossa è
+        calcolata in background e applicata quando è pronta e il tempo minimo
+        di "pensiero" è trascorso.
+        
+        Returns:
+            Messaggio da visualizzare, None se non è cambiato nulla
+        '''
+        action = self._poll_ai_action()
+        if action is None or not self._ai_min_time_elapsed():
+            return None
+        self._ai_task = None
+        
+        # Esegue la mossa
+        self.move_bear(action[1])
+        
+        return "L'orso intelligente ha mosso!"
+    
+    def manage_bear_selection(self, sel: int) -> str:
+        '''
+        Gestisce la mossa dell'orso controllato da un giocatore umano.
+        
+        Args:
+            sel: Posizione selezionata dal giocatore
+        Returns:
+            Messaggio da visualizzare
+        '''
+        if self._free_adjacent(self._bear_position) >> sel & 1:
+            # Mossa valida: sposta l'orso
+            self.move_bear(sel)
+            return "Seleziona uno dei cacciatori!"
+        else:
+            return "Posizione non valida..."
+    
+    # ========== METODI PER LA VISUALIZZAZIONE ==========
+    
+    def is_footprint_and_type(self, sel: int) -> tuple[bool, str]:
+        '''
+        Verifica se una posizione è una destinazione valida (orma).
+        Le orme vengono visualizzate per indicare dove può muoversi il giocatore.
+        
+        Args:
+            sel: Posizione da controllare
+        Returns:
+            Tupla (è_orma, tipo_orma) dove tipo_orma è "HUNTER" o "BEAR" o None
+        '''
+        if self._is_hunter_turn:
+            # Se è il turno dei cacciatori e uno è selezionato
+            if self._hunter_starting_pos == -1:
+                return (False, None)
+            else:
+                if self._free_adjacent(self._hunter_starting_pos) >> sel & 1:
+                    return (True, "HUNTER")
+                else:
+                    return (False, None)
+        else:
+            # Se è il turno dell'orso
+            if self._free_adjacent(self._bear_position) >> sel & 1:
+                return (True, "BEAR")
+            else:
+                return (False, None)
+
+    def get_view(self) -> tuple[int, tuple[tuple[str, str], ...]]:
+        '''
+        Vista della manche per l'interfaccia grafica: per ognuna delle 21
+        caselle la chiave (simbolo, variante) dell'immagine da mostrare.
+        È ricalcolata una sola volta per ogni cambiamento di stato.
+        
+        Returns:
+            Tupla (versione, chiavi): a versione uguale le chiavi non sono cambiate
+        '''
+        version = self._view_version
+        if self._view is None or self._view[0] != version:
+            self._view = (version, self._cell_keys())
+        return self._view
+
+    def _cell_keys(self) -> tuple[tuple[str, str], ...]:
+        '''Chiavi delle immagini delle caselle, con la stessa logica di is_footprint_and_type.'''
+        hunter_turn = self._is_hunter_turn
+        keys = [(BOARD_EMPTY, CELL_BASE)] * self.BOARD_POSITIONS
+        for position, symbol in self._hunter_symbols.items():
+            if position == self._hunter_starting_pos:
+                keys[position] = (symbol, CELL_SELECTED)
+            else:
+                keys[position] = (symbol, CELL_BASE if hunter_turn else CELL_IDLE)
+        keys[self._bear_position] = (BOARD_BEAR, CELL_BASE if hunter_turn else CELL_SELECTED)
+        # Orme: destinazioni del cacciatore selezionato o dell'orso
+        if not hunter_turn:
+            footprints, symbol = self._free_adjacent(self._bear_position), BOARD_BEAR
+        elif self._hunter_starting_pos != -1:
+            footprints, symbol = self._free_adjacent(self._hunter_starting_pos), BOARD_HUNTER_POLICY
+        else:
+            footprints, symbol = 0, None
+        for position in iter_bits(footprints):
+            keys[position] = (symbol, CELL_FOOTPRINT)
+        return tuple(keys)
+
+    def get_possible_moves(self, position: int) -> tuple[int, ...]:
+        '''
+        Restituisce tutte le posizioni libere adiacenti a una posizione data.
+        
+        Args:
+            position: Posizione di partenza
+        Returns:
+            Tupla (precalcolata, da non modificare) di posizioni libere raggiungibili
+        '''
+        return self.MOVES_TABLE[position][self._free_adjacent(position)]
+
+    # ========== METODI PER L'AI ==========
+    
+    def get_hash(self) -> str:
+        '''
+        Genera un hash univoco dello stato della board per l'AI.
+        Normalizza i cacciatori (1,8,9 -> tutti '1') perché per l'AI
+        sono indistinguibili.
+        
+        Returns:
+            Stringa che rappresenta lo stato della board
+        '''
+        return unpack_key(self.get_state_key(), self.BOARD_POSITIONS)
+
+    def get_state_key(self) -> int:
+        '''
+        Restituisce la chiave intera compatta dello stato usata dalle policy:
+        bit 0-20 = caselle dei cacciatori, bit 21-25 = posizione dell'orso.
+        La chiave è mantenuta in modo incrementale dalle mosse e da undo_move.
+        '''
+        return self._state_key
+
+    def copy(self) -> BearGameManche:
+        '''
+        Copia indipendente della manche (board, turno e storia delle mosse),
+        con gli stessi giocatori AI: usata per calcolare le mosse AI in
+        background senza toccare la manche visualizzata.
+        '''
+        clone = copy.copy(self)
+        clone._hunter_symbols = dict(self._hunter_symbols)
+        clone._history = list(self._history)
+        clone._ai_task = None
+        return clone
+
+    def undo_move(self) -> None:
+        '''
+        Annulla l'ultima mossa effettuata (con move_player o nella manche).
+        Le mosse sono tenute in una pila, quindi si possono annullare
+        più mosse di fila: usato dall'AI per esplorare le possibilità
+        durante la ricerca.
+        '''
+        self._is_hunter_turn = not self._is_hunter_turn
+        end_position = self._history.pop()
+        start_position = self._history.pop()
+        
+        if self._is_hunter_turn:
+            # Era una mossa dei cacciatori, ripristina il cacciatore
+            self._place_hunter(end_position, start_position)
+        else:
+            # Era una mossa dell'orso, ripristina l'orso
+            self._bear_moves -= 1
+            self._place_bear(start_position)
+
+    def get_ai_fallbacks(self) -> int:
+        '''
+        Numero di stati valutati con la stima euristica (assenti dalle
+        policy) dai giocatori AI della manche, sia Player sia SearchPlayer.
+        I giocatori sono creati a ogni manche: il totale della partita è
+        accumulato in main.GamePlayer.ai_fallbacks.
+        '''
+        return (getattr(self._bear_player, 'fallbacks', 0) +
+                getattr(self._hunter_player, 'fallbacks', 0))
+
+
+# ========== STIMA PER GLI STATI ASSENTI DALLE POLICY ==========
+# Pesi della stima delle mosse residue dell'orso, per turno dello stato
+# (False = orso al tratto, True = cacciatori al tratto), sulle grandezze:
+# costante, mobilità dell'orso, caselle libere entro due passi, caselle
+# raggiungibili dall'orso (recinto), somma e minimo delle distanze dei
+# cacciatori. Regressione lineare sui valori esatti di solver.py.
+FALLBACK_WEIGHTS = {
+    False: (2.07, -0.42, 1.17, 0.48, 0.29, -1.10),
+    True: (0.52, -0.76, 1.90, 0.23, 0.41, -1.51),
+}
+ALL_POSITIONS = (1 << BearGameManche.BOARD_POSITIONS) - 1
+
+
+def estimate_bear_moves(key: int, hunter_turn: bool) -> float:
+    '''
+    Stima delle mosse che l'orso farà ancora dallo stato indicato, per gli
+    stati assenti dalle policy: conta solo distanze e maschere precalcolate.
+    '''
+    adjacent = BearGameManche.ADJACENT_MASKS
+    bear = key >> BEAR_SHIFT
+    hunters = key & HUNTERS_MASK
+    empty = ALL_POSITIONS & ~hunters & ~(1 << bear)
+    near = adjacent[bear] & empty
+    if not near and not hunter_turn:
+        # Orso catturato
+        return 0.0
+    # Caselle libere a due passi e area raggiungibile dall'orso
+    second = 0
+    for position in iter_bits(near):
+        second |= adjacent[position]
+    second &= empty
+    seen = frontier = second | (1 << bear)
+    while frontier:
+        reached = 0
+        for position in iter_bits(frontier):
+            reached |= adjacent[position]
+        frontier = reached & empty & ~seen
+        seen |= frontier
+    distances = [BearGameManche.DISTANCES[bear][h] for h in iter_bits(hunters)]
+    w = FALLBACK_WEIGHTS[hunter_turn]
+    estimate = (w[0] + w[1] * near.bit_count() + w[2] * second.bit_count() +
+                w[3] * (seen.bit_count() - 1) + w[4] * sum(distances) + w[5] * min(distances))
+    return min(max(estimate, 0.0), BearGameManche.MAX_BEAR_MOVES)
+
+
+def fallback_value(key: int, hunter_turn: bool) -> float:
+    '''
+    Valore sulla scala delle policy dello stato raggiunto con una mossa
+    del giocatore di turno (hunter_turn), stimato con estimate_bear_moves.
+    '''
+    # Dopo la mossa tocca all'avversario
+    remaining = estimate_bear_moves(key, not hunter_turn)
+    if hunter_turn:
+        return HUNTER_POLICY_OFFSET - 2 * remaining
+    return BEAR_POLICY_OFFSET + 2 * remaining
+
+
+class Player:
+    def __init__(self, name):
+        self.name = name
+        self.states_value = {}  # state key -> value
+        # Stati assenti dalla policy, valutati con fallback_value
+        self.fallbacks = 0
+
+    def get_action(self, actions, current_board: BearGameManche) -> tuple[int, int]:
+        '''Return the action to take as tuple (startpos, endpos)
+        Now the ai player can choose randomically from all best moves
+        '''
+        value_max = -INFINITY
+        best_actions = []
+        # La chiave dopo ogni azione si ottiene dalla chiave corrente con i
+        # delta precalcolati: la board non viene modificata
+        lookup = self.states_value.get
+        key = current_board.get_state_key()
+        hunter_turn = current_board.is_hunter_turn()
+        deltas = BearGameManche.MOVE_DELTAS[hunter_turn]
+        for act in actions:
+            next_key = key ^ deltas[act[0]][act[1]]
+            state_value = lookup(next_key)
+            if (state_value is None):
+                # Stato mai visto dalla policy: stima euristica
+                self.fallbacks += 1
+                value = fallback_value(next_key, hunter_turn)
+            else:
+                value = state_value
+
+            if value > value_max:
+                value_max = value
+                best_actions = [act]
+            elif value == value_max:
+                best_actions.append(act)                
+        return random.choice(best_actions)
+
+    async def get_action_async(self, actions, current_board: BearGameManche) -> tuple[int, int]:
+        '''Same as get_action: a table lookup is quick enough to run in one frame'''
+        return self.get_action(actions, current_board)
+
+    def fork(self) -> Player:
+        '''Copy used for a single move computation (see think_ai_action)'''
+        worker = Player(self.name)
+        worker.states_value = self.states_value
+        return worker
+
+    def join(self, worker: Player) -> None:
+        '''Take back the statistics of a completed computation'''
+        self.fallbacks += worker.fallbacks
+
+    def stop(self) -> None:
+        '''Nothing to interrupt: get_action is a single table lookup'''
+
+    def print_value(self, board) -> None:
+        print(
+            f"{self.name}: {board.get_hash()} -> "
+            f"{self.states_value.get(board.get_state_key())}"
+        )
+
+    def load_policy(self, file) -> None:
+        '''Load file with policy for reinforcement learning
+        The table is shared read-only through the process-wide policy cache
+        '''
+        self.states_value = get_policy(file)
@@ -13,35 +13,30 @@ e maggiore orientamento OOP
 '''
 
 from __future__ import annotations
-from typing import List, Tuple
 import asyncio
-import os
 import pygame
 import sys
+import collections
 import functools
-import random
-import pickle
+import io
+import json
+import os
+import time
+
+from engine import (
+    BOARD_BEAR, BOARD_HUNTER_1, BOARD_HUNTER_2, BOARD_HUNTER_3,
+    BOARD_HUNTER_POLICY, CELL_BASE, CELL_FOOTPRINT, CELL_IDLE, CELL_SELECTED,
+    BearGameManche
+)
+from policy import preload_policies
 
 # Rileva se l'esecuzione avviene in ambiente WebASM (browser)
 IS_WEB = sys.platform == "emscripten"
 
-INFINITY = float('inf')
-
 # ========== CONFIGURAZIONE COLORI ==========
 BLACK = (0, 0, 0)
 RED = (255, 0, 0)
 
-# ========== SIMBOLI PER LA SCACCHIERA ==========
-# Simboli usati nella rappresentazione logica della board
-BOARD_HUNTER_1 = '1'  # Primo cacciatore
-BOARD_HUNTER_2 = '8'  # Secondo cacciatore
-BOARD_HUNTER_3 = '9'  # Terzo cacciatore
-BOARD_BEAR = '2'      # Orso
-BOARD_EMPTY = '_'     # Casella vuota
-
-# Simbolo normalizzato per le policy AI (tutti i cacciatori sono uguali per l'AI)
-BOARD_HUNTER_POLICY = '1'
-
 # Flag per abilitare/disabilitare la musica
 MUSIC = True
 
@@ -56,486 +51,690 @@ class GamePlayer:
         self.is_human = is_human      # True se giocatore umano, False se AI
         self.bear_moves = 0           # Mosse completate quando gioca come orso
         self.is_hunter = is_hunter    # True se in questo turno è cacciatore
+        self.ai_fallbacks = 0         # Stati stimati dall'AI (assenti dalle policy) nelle due manches
+
 
+# ========== LAYOUT ==========
+# Risoluzione logica: tutte le coordinate del gioco sono espresse in 1280x720
+LOGICAL_SIZE = (1280, 720)
 
-class BearGameManche:
+class Layout:
     '''
-    Gestisce la logica di una singola manche del gioco.
-    Questa classe è indipendente da PyGame e contiene solo la logica del gioco.
-    
-    La scacchiera ha 21 posizioni numerate da 0 a 20:
-    - '_' indica una casella vuota
-    - '1', '8', '9' indicano i tre cacciatori
-    - '2' indica l'orso
+    Trasformazione dalle coordinate logiche (1280x720) alla tela reale.
+    La scala è uniforme, quindi le proporzioni non cambiano: l'eventuale
+    spazio in più resta nero ai lati o sopra e sotto.
+    Disegno e rettangoli per i click passano dalla stessa trasformazione.
     '''
-    
-    # ========== CONFIGURAZIONE GIOCO ==========
-    BOARD_POSITIONS = 21           # Numero totale di posizioni sulla scacchiera
-    MAX_BEAR_MOVES = 40            # Mosse massime per la vittoria dell'orso
-    HUNTER_STARTS = False          # Se True, iniziano i cacciatori
-    
-    # Definisce quali posizioni sono adiacenti a ciascuna casella
-    # L'indice della lista corrisponde alla posizione sulla board
-    ADJACENT_POSITIONS = [
-        [1,2,3],        # Posizione 0: collegata a 1,2,3
-        [0,3,4],        # Posizione 1: collegata a 0,3,4
-        [0,3,6],        # Posizione 2: collegata a 0,3,6
-        [0,1,2,5],      # Posizione 3: nodo centrale, 4 collegamenti
-        [1,7,8],        # Posizione 4
-        [3,9,10,11],    # Posizione 5: nodo importante con 4 collegamenti
-        [2,12,13],      # Posizione 6
-        [4,8,14],       # Posizione 7
-        [7,4,14,9],     # Posizione 8: 4 collegamenti
-        [8,10,5,15],    # Posizione 9: 4 collegamenti
-        [5,9,11,15],    # Posizione 10: 4 collegamenti
-        [5,10,15,12],   # Posizione 11: 4 collegamenti
-        [11,6,16,13],   # Posizione 12: 4 collegamenti
-        [6,12,16],      # Posizione 13
-        [7,8,18],       # Posizione 14
-        [9,10,11,17],   # Posizione 15: nodo importante con 4 collegamenti
-        [12,13,19],     # Posizione 16
-        [15,18,19,20],  # Posizione 17: nodo importante con 4 collegamenti
-        [14,17,20],     # Posizione 18
-        [16,17,20],     # Posizione 19
-        [18,17,19]      # Posizione 20: posizione iniziale classica dell'orso
-    ]
-
-    def __init__(self, 
-                 first_manche_as_bear: bool,
-                 against_computer: bool, 
-                 classic_initial_position: bool):
-        '''
-        Inizializza una manche e carica le policy per l'AI.
-        
-        Args:
-            first_manche_as_bear: True se il giocatore umano inizia come orso
-            against_computer: True se si gioca contro l'AI
-            classic_initial_position: True per posizione iniziale classica (cacciatori in alto, orso in basso)
-        '''
-        base_path = "."
-        
-        # Imposta la configurazione iniziale della board
-        self.reset(against_computer, classic_initial_position)
-        self.first_manche_as_bear = first_manche_as_bear
-        
-        # ========== CARICAMENTO AI ORSO ==========
-        # Carica la policy appresa tramite Reinforcement Learning
-        self._bear_player = Player("orso")
-        self._bear_player.load_policy(
-            os.path.join(base_path, "bear.policy")
-        )
+    def __init__(self, size=LOGICAL_SIZE):
+        self.scale = None
+        self.resize(size)
+
+    def resize(self, size) -> bool:
+        '''Adatta la trasformazione alla tela; True se la scala è cambiata.'''
+        scale = min(size[0] / LOGICAL_SIZE[0], size[1] / LOGICAL_SIZE[1])
+        changed = scale != self.scale
+        self.size = tuple(size)
+        self.scale = scale
+        self.offset = ((size[0] - round(LOGICAL_SIZE[0] * scale)) // 2,
+                       (size[1] - round(LOGICAL_SIZE[1] * scale)) // 2)
+        return changed
+
+    def length(self, value) -> int:
+        '''Lunghezza logica in pixel della tela'''
+        return round(value * self.scale)
+
+    def point(self, position) -> tuple[int, int]:
+        '''Posizione logica in pixel della tela'''
+        return (self.offset[0] + self.length(position[0]),
+                self.offset[1] + self.length(position[1]))
+
+    def rect(self, rect) -> pygame.Rect:
+        '''Rettangolo logico sulla tela (i bordi di rettangoli adiacenti restano adiacenti)'''
+        rect = pygame.Rect(rect)
+        left, top = self.point(rect.topleft)
+        right, bottom = self.point(rect.bottomright)
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def scale_image(self, surface: pygame.Surface) -> pygame.Surface:
+        '''Immagine a risoluzione logica portata alla scala della tela'''
+        if self.scale == 1:
+            return surface
+        size = (max(1, self.length(surface.get_width())),
+                max(1, self.length(surface.get_height())))
+        return pygame.transform.smoothscale(surface, size)
+
+# Trasformazione condivisa da disegno, font e immagini
+LAYOUT = Layout()
+
+def native_canvas_size() -> tuple[int, int]:
+    '''
+    Dimensione della tela sul web: i pixel reali della pagina, nelle
+    proporzioni 16:9 del gioco e mai oltre 1280x720, così sui telefoni
+    non si disegnano frame più grandi dello schermo.
+    '''
+    try:
+        # Il modulo platform di pygbag espone la finestra del browser
+        import platform
+        window = platform.window
+        ratio = window.devicePixelRatio or 1
+        size = (window.innerWidth * ratio, window.innerHeight * ratio)
+    except (ImportError, AttributeError):
+        info = pygame.display.Info()
+        size = (info.current_w, info.current_h)
+    if min(size) <= 0:
+        return LOGICAL_SIZE
+    scale = min(size[0] / LOGICAL_SIZE[0], size[1] / LOGICAL_SIZE[1], 1)
+    return round(LOGICAL_SIZE[0] * scale), round(LOGICAL_SIZE[1] * scale)
+
+# ========== FONT ==========
+FONT_FILE = 'LobsterTwo-Regular.otf'
+# Dimensioni usate da menu e HUD (già scalate a 1280x720)
+FONT_SIZES = (21, 25, 37, 75)
+
+# (file, dimensione in pixel della tela) -> font
+_FONT_CACHE = {}
+
+def get_font(size: int, path: str = FONT_FILE) -> pygame.font.Font:
+    '''
+    Restituisce il font richiesto dal registro condiviso:
+    ogni coppia (file, dimensione) viene letta dal disco una sola volta.
+    La dimensione è logica e viene portata alla scala di LAYOUT.
+    Richiede pygame.init().
+    '''
+    key = (path, max(1, LAYOUT.length(size)))
+    font = _FONT_CACHE.get(key)
+    if font is None:
+        font = _FONT_CACHE[key] = pygame.font.Font(*key)
+    return font
+
+def preload_fonts(sizes=FONT_SIZES, path: str = FONT_FILE) -> None:
+    '''Carica in anticipo nel registro i font usati da menu e HUD.'''
+    for size in sizes:
+        get_font(size, path)
+
+# Numero massimo di testi renderizzati tenuti in cache
+TEXT_CACHE_SIZE = 256
+
+@functools.lru_cache(maxsize=TEXT_CACHE_SIZE)
+def render_text(font: pygame.font.Font, text: str, antialias, color) -> pygame.Surface:
+    '''
+    Rende un testo usando la cache LRU: la chiave è (font, testo, antialias, colore),
+    quindi le scritte che non cambiano non vengono rasterizzate a ogni frame.
+    La superficie restituita è condivisa: va solo disegnata, non modificata.
+    '''
+    return font.render(text, antialias, color)
 
-        # ========== CARICAMENTO AI CACCIATORE ==========
-        # Carica la policy deterministica basata sulla distanza
-        self._hunter_player = Player("cacciatore")
-        self._hunter_player.load_policy(
-            os.path.join(base_path, "hunter.policy")
-        )
-        
-    def reset(self, against_computer: bool, classic_initial_position: bool) -> None:
-        '''
-        Reimposta la board e le variabili di gioco per iniziare una nuova manche.
-        
-        Ci sono due configurazioni iniziali possibili:
-        1. Classica: cacciatori in posizioni 0,1,2 - orso in posizione 20
-        2. Centrale (Iacazio): configurazione più bilanciata per partite veloci
-        '''
-        if classic_initial_position:
-            # Configurazione classica: cacciatori raggruppati in alto
-            self._board = [
-                BOARD_HUNTER_1, BOARD_HUNTER_2, BOARD_HUNTER_3,  # Pos 0,1,2: cacciatori
-                BOARD_EMPTY, BOARD_EMPTY, BOARD_EMPTY, BOARD_EMPTY,
-                BOARD_EMPTY, BOARD_EMPTY, BOARD_EMPTY, BOARD_EMPTY, 
-                BOARD_EMPTY, BOARD_EMPTY, BOARD_EMPTY,
-                BOARD_EMPTY, BOARD_EMPTY, BOARD_EMPTY, BOARD_EMPTY, 
-                BOARD_EMPTY, BOARD_EMPTY, 
-                BOARD_BEAR  # Pos 20: orso
-            ]
-            self._bear_position = 20            
-        else:
-            # Configurazione centrale "Iacazio" per partite più veloci
-            self._board = [
-                BOARD_EMPTY, BOARD_EMPTY, BOARD_EMPTY, BOARD_EMPTY, BOARD_EMPTY, 
-                BOARD_HUNTER_1,  # Pos 5
-                BOARD_EMPTY,
-                BOARD_EMPTY, BOARD_EMPTY, 
-                BOARD_HUNTER_2,  # Pos 9
-                BOARD_BEAR,      # Pos 10: orso al centro
-                BOARD_HUNTER_3,  # Pos 11
-                BOARD_EMPTY, BOARD_EMPTY,
-                BOARD_EMPTY, BOARD_EMPTY, BOARD_EMPTY, BOARD_EMPTY, 
-                BOARD_EMPTY, BOARD_EMPTY, BOARD_EMPTY
-            ]
-            self._bear_position = 10            
-        
-        # Inizializza le variabili di stato
-        self._bear_moves = 0                    # Contatore mosse orso
-        self._hunter_starting_pos = -1          # Posizione cacciatore selezionato (-1 = nessuno)
-        self._hunter_ai_final = -1              # Destinazione AI cacciatore
-        self._is_hunter_turn = self.HUNTER_STARTS  # Di chi è il turno
-        self.against_computer = against_computer
-        self._winner = None                     # Messaggio del vincitore
-        self._last_move = None                  # Ultima mossa effettuata (per undo)
-
-    # ========== METODI GETTER ==========
+def compose_layers(layers) -> tuple[pygame.Surface, pygame.Rect]:
+    '''
+    Compone più immagini in un'unica superficie trasparente, per disegnare
+    un pannello HUD (sfondo, etichetta, valore) come un solo sprite.
     
-    def get_bear_moves(self) -> int:
-        '''Restituisce il numero di mosse completate dall'orso.'''
-        return self._bear_moves
-
-    def get_max_bear_moves(self) -> int:
-        '''Restituisce il numero massimo di mosse per la vittoria dell'orso.'''
-        return self.MAX_BEAR_MOVES
+    Args:
+        layers: lista di coppie (superficie, posizione logica), dal basso verso l'alto
+    Returns:
+        Superficie composta e rettangolo che la contiene sullo schermo
+    '''
+    rects = [layer.get_rect(topleft=LAYOUT.point(position)) for layer, position in layers]
+    rect = rects[0].unionall(rects[1:])
+    image = pygame.Surface(rect.size, pygame.SRCALPHA)
+    for (layer, _), layer_rect in zip(layers, rects):
+        image.blit(layer, layer_rect.move(-rect.x, -rect.y))
+    return image, rect
 
-    def get_board_position(self, position: int) -> str:
-        '''
-        Restituisce il simbolo ('1','8','9','2','_') presente nella posizione specificata.
-        
-        Args:
-            position: Indice della posizione (0-20)
-        Returns:
-            Stringa con il simbolo della pedina o '_' per vuoto
-        '''
-        return self._board[position]
+# ========== IMMAGINI ==========
 
-    def get_hunter_starting_pos(self) -> int:
-        '''
-        Restituisce la posizione del cacciatore attualmente selezionato.
-        Returns -1 se nessun cacciatore è selezionato.
-        '''
-        return self._hunter_starting_pos
-    
-    # ========== METODI DI CONTROLLO VITTORIA ==========
+def scale_img(img, scale_factor=0.833333):
+    '''
+    Ridimensiona un'immagine secondo un fattore di scala.
+    Il fattore 0.833333 = 1280/1536 converte dalla risoluzione originale a 1280x720.
     
-    def is_bear_winner(self) -> bool:
-        '''
-        Verifica se l'orso ha vinto.
-        L'orso vince se raggiunge MAX_BEAR_MOVES mosse.
-        '''
-        # L'orso perde se non ha mosse disponibili
-        if not(self.get_possible_moves(self._bear_position)):
-            return False
-        # L'orso vince se raggiunge il numero massimo di mosse
-        if (self._bear_moves >= self.MAX_BEAR_MOVES):
-            return True
-
-    def game_over(self) -> bool:
-        '''
-        Verifica se la manche è terminata e imposta il messaggio del vincitore.
-        
-        Returns:
-            True se la partita è finita, False altrimenti
-        '''
-        # Cacciatori vincono se l'orso non ha mosse disponibili
-        if not(self.get_possible_moves(self._bear_position)):
-            self._winner = f"I cacciatori vincono; l'orso ha fatto {self.get_bear_moves()} mosse"
-            return True
-        # Orso vince se raggiunge il numero massimo di mosse
-        elif (self._bear_moves >= self.MAX_BEAR_MOVES):
-            self._winner = f"L'orso è scappato; ha fatto {self.get_bear_moves()} mosse"
-            return True
-        else:
-            return False
+    Args:
+        img: Immagine PyGame da scalare
+        scale_factor: Fattore di scala (default 0.833333)
+    Returns:
+        Immagine scalata
+    '''
+    new_width = int(img.get_width() * scale_factor)
+    new_height = int(img.get_height() * scale_factor)
+    return pygame.transform.scale(img, (new_width, new_height))
 
-    # ========== METODI DI UTILITÀ ==========
-    
-    def is_hunter(self, selection: str) -> bool:
-        '''Verifica se il simbolo rappresenta un cacciatore.'''
-        return selection in [BOARD_HUNTER_1, BOARD_HUNTER_2, BOARD_HUNTER_3]
+# Asset pre-scalati generati da build_assets.py
+SCALED_IMG_DIR = os.path.join('img', 'scaled')
+# Originali a 1536x864 (ingresso di build_assets.py, assenti nella build web)
+SOURCE_IMG_DIR = os.path.join('assets-src', 'img')
+ATLAS_INDEX = os.path.join(SCALED_IMG_DIR, 'pedine.json')
 
-    def is_hunter_turn(self) -> bool:
-        '''Verifica se è il turno dei cacciatori.'''
-        return self._is_hunter_turn
+# Percorso (e alpha) -> immagine nel formato dello schermo
+_DISPLAY_IMAGES = {}
 
-    # ========== GESTIONE MOSSE CACCIATORE (UMANO) ==========
-    
-    def manage_hunter_selection(self, sel: int) -> str:
-        '''
-        Gestisce la selezione e il movimento dei cacciatori da parte del giocatore umano.
-        Il processo è in due fasi: prima si seleziona un cacciatore, poi la destinazione.
-        
-        Args:
-            sel: Posizione selezionata dal giocatore
-        Returns:
-            Messaggio da visualizzare all'utente
-        '''
-        # FASE 1: Selezione del cacciatore
-        if self._hunter_starting_pos == -1:
-            if not(self.is_hunter(self._board[sel])):
-                return "Seleziona un cacciatore!"
-            else:
-                # Cacciatore selezionato, aspetta la destinazione
-                self._hunter_starting_pos = sel
-                return "Cacciatore, fa' la tua mossa!"
-        
-        # FASE 2: Selezione della destinazione
-        else:
-            if sel in self.get_possible_moves(self._hunter_starting_pos):
-                # Mossa valida: sposta il cacciatore
-                selected_hunter = self._board[self._hunter_starting_pos]
-                self._board[self._hunter_starting_pos] = BOARD_EMPTY
-                self._board[sel] = selected_hunter
-                self._hunter_starting_pos = -1  # Reset selezione
-                self._is_hunter_turn = not(self._is_hunter_turn)  # Cambia turno
-                return "Orso, scegli la tua mossa!"
-            else:
-                # Mossa non valida: torna alla fase di selezione
-                self._hunter_starting_pos = -1
-                return "Posizione non valida!"
-    
-    # ========== GESTIONE MOSSE CACCIATORE (AI) ==========
-    
-    async def manage_ai_hunter_selection(self) -> str:
-        '''
-        Gestisce la mossa dell'AI cacciatore usando la policy precalcolata.
-        Simula il comportamento umano in due fasi: selezione e movimento.
-        '''
-        # FASE 1: Selezione del cacciatore da muovere
-        if (self._hunter_starting_pos == -1):
-            # Trova tutte le posizioni dei cacciatori
-            hunter_positions = []
-            for x in range(self.BOARD_POSITIONS):
-                if self._board[x] in [BOARD_HUNTER_1, BOARD_HUNTER_2, BOARD_HUNTER_3]:
-                    hunter_positions.append(x)
-
-            # Genera tutte le possibili azioni (cacciatore, destinazione)
-            hunter_actions = []
-            for x in hunter_positions:
-                moves = self.get_possible_moves(x)
-                for move in moves:
-                    hunter_actions.append((x, move))                    
-
-            # Usa la policy AI per scegliere la migliore azione
-            action = self._hunter_player.get_action(hunter_actions, self)
-            self._hunter_starting_pos = action[0]  # Cacciatore scelto
-            self._hunter_ai_final = action[1]      # Destinazione scelta
-            return "Cacciatore selezionato"
-        
-        # FASE 2: Esecuzione della mossa
-        else:
-            self._board[self._hunter_ai_final] = self._board[self._hunter_starting_pos]            
-            self._board[self._hunter_starting_pos] = BOARD_EMPTY
-            self._hunter_starting_pos = -1
-            self._hunter_ai_final = -1
-            self._is_hunter_turn = not self._is_hunter_turn
-            # Pausa per simulare il "pensiero" dell'AI
-            await asyncio.sleep(1)
-            return "Orso, scegli la tua mossa!"
-
-    # ========== GESTIONE MOSSE ORSO ==========
-    
-    def get_bear_actions(self) -> List[Tuple[int, int]]:
-        '''
-        Restituisce tutte le azioni possibili per l'orso.
-        
-        Returns:
-            Lista di tuple (posizione_corrente, destinazione_possibile)
-        '''
-        actions = []
-        for adj in BearGameManche.ADJACENT_POSITIONS[self._bear_position]:
-            if self._board[adj] == BOARD_EMPTY:
-                actions.append((self._bear_position, adj))
-        return actions
+def to_display_format(surface, alpha=None):
+    '''
+    Copia della superficie nel formato dello schermo, così i blit non devono
+    convertire i pixel ogni volta. Con alpha=None il canale alpha è mantenuto
+    solo se la superficie ne ha uno. Richiede che set_mode sia già stato chiamato.
+    '''
+    if alpha is None:
+        alpha = bool(surface.get_flags() & pygame.SRCALPHA)
+    return surface.convert_alpha() if alpha else surface.convert()
 
-    def move_bear(self, new_position: int) -> None:
-        '''
-        Muove l'orso in una nuova posizione.
-        Questo metodo è usato sia dall'AI che dal metodo move_player.
-        
-        Args:
-            new_position: Posizione di destinazione
-        Raises:
-            ValueError: Se la mossa non è valida
-        '''
-        self._last_move = (self._bear_position, new_position)
-        
-        if new_position in self.get_possible_moves(self._bear_position):
-            self._board[self._bear_position] = BOARD_EMPTY
-            self._board[new_position] = BOARD_BEAR
-            self._bear_position = new_position
-            self._bear_moves += 1  # Incrementa il contatore
-            self._is_hunter_turn = not self._is_hunter_turn
-        else:
-            print(self._last_move)
-            raise ValueError("Orso non può muoversi qui!")
+def _load_logical_img(path, alpha=None):
+    '''
+    Immagine alla risoluzione logica 1280x720 nel formato dello schermo:
+    la versione pre-scalata in img/scaled se presente, altrimenti
+    l'originale in assets-src/img ridotto con scale_img.
+    '''
+    built = os.path.join(SCALED_IMG_DIR, os.path.basename(path))
+    if os.path.exists(built):
+        return to_display_format(pygame.image.load(built), alpha)
+    source = os.path.join(SOURCE_IMG_DIR, os.path.basename(path))
+    return scale_img(to_display_format(pygame.image.load(source), alpha))
 
-    def move_hunter(self, start_position: int, end_position: int) -> None:
-        '''
-        Muove un cacciatore da una posizione a un'altra.
-        Usato dal metodo move_player per l'AI.
-        '''
-        self._last_move = (start_position, end_position)
-        start_symbol = self._board[start_position]
-        self._board[start_position] = BOARD_EMPTY
-        self._board[end_position] = start_symbol
-        self._is_hunter_turn = not self._is_hunter_turn
+def get_scaled_img(path, alpha=None):
+    '''
+    Restituisce un'immagine alla scala della tela (vedi LAYOUT) nel formato
+    dello schermo. Ogni immagine è caricata, convertita e scalata una sola
+    volta per ogni scala (vedi reset_images).
+    '''
+    key = (path, alpha)
+    image = _DISPLAY_IMAGES.get(key)
+    if image is None:
+        image = _DISPLAY_IMAGES[key] = LAYOUT.scale_image(_load_logical_img(path, alpha))
+    return image
 
-    def move_player(self, start_pos, end_pos) -> None:
-        '''
-        Interfaccia generica per muovere un giocatore.
-        Chiama move_hunter o move_bear in base al turno.
-        Usato dall'AI per simulare mosse durante la ricerca.
-        '''
-        if self._is_hunter_turn:
-            return self.move_hunter(start_pos, end_pos)
-        else:
-            return self.move_bear(end_pos)
+@functools.lru_cache()
+def get_atlas() -> dict:
+    '''
+    Sprite di pedine e orme ritagliati (subsurface) dall'atlante unico,
+    secondo l'indice JSON; dizionario vuoto se l'atlante non è stato generato.
+    Le subsurface condividono il formato (già convertito) del foglio; a una
+    scala diversa da 1 ogni sprite è scalato a parte, senza sbavature dai vicini.
+    '''
+    if not os.path.exists(ATLAS_INDEX):
+        return {}
+    with open(ATLAS_INDEX) as file_read:
+        index = json.load(file_read)
+    sheet = _load_logical_img(os.path.join(SCALED_IMG_DIR, index['image']), alpha=True)
+    return {name: LAYOUT.scale_image(sheet.subsurface(rect))
+            for name, rect in index['sprites'].items()}
+
+def get_sprite(path):
+    '''Pedina o orma alla scala della tela, dall'atlante se disponibile.'''
+    name = os.path.splitext(os.path.basename(path))[0]
+    sprite = get_atlas().get(name)
+    if sprite is None:
+        sprite = get_scaled_img(path, alpha=True)
+    return sprite
+
+# ========== GESTIONE ASSET ==========
+# Flag per stampare all'avvio la diagnostica delle immagini caricate
+ASSET_DEBUG = False
+
+# Gruppi di immagini: quelle del menu servono per il primo frame, quelle
+# della manche sono caricate in background mentre il menu è visibile
+ASSETS_MENU = 'menu'
+ASSETS_GAME = 'game'
+
+# Gruppo -> immagini dichiarate come attributi di classe
+_IMAGE_ASSETS = {ASSETS_MENU: [], ASSETS_GAME: []}
+
+class ImageAsset:
+    '''
+    Immagine usata come attributo di classe (es. CasellaGiocoOrso.ORSO_IMG).
+    L'import del modulo non carica nulla (e non c'è ancora una finestra):
+    l'immagine è caricata al primo accesso oppure in anticipo da
+    load_image_assets / prefetch_image_assets, già nel formato dello schermo.
+    '''
+    def __init__(self, path, alpha=None, sprite=False, group=ASSETS_GAME):
+        self.path = path
+        self.alpha = alpha
+        self.sprite = sprite
+        self._surface = None
+        _IMAGE_ASSETS[group].append(self)
+
+    def get(self) -> pygame.Surface:
+        if self._surface is None:
+            self._surface = (get_sprite(self.path) if self.sprite else
+                             get_scaled_img(self.path, self.alpha))
+        return self._surface
+
+    def __get__(self, obj, owner=None) -> pygame.Surface:
+        return self.get()
+
+class BlankAsset(ImageAsset):
+    '''
+    Superficie trasparente di dimensione logica data (es. una casella
+    vuota), creata alla scala della tela come le altre immagini.
+    '''
+    def __init__(self, size, group=ASSETS_GAME):
+        super().__init__(None, alpha=True, group=group)
+        self.size = size
+
+    def get(self) -> pygame.Surface:
+        if self._surface is None:
+            size = (max(1, LAYOUT.length(self.size[0])), max(1, LAYOUT.length(self.size[1])))
+            self._surface = to_display_format(pygame.Surface(size, pygame.SRCALPHA), alpha=True)
+        return self._surface
+
+def _image_assets(group=None) -> list[ImageAsset]:
+    if group is None:
+        return [asset for assets in _IMAGE_ASSETS.values() for asset in assets]
+    return _IMAGE_ASSETS[group]
+
+def load_image_assets(group=None) -> None:
+    '''Carica le immagini del gruppo indicato (tutte se None), dopo set_mode.'''
+    for asset in _image_assets(group):
+        asset.get()
+
+async def prefetch_image_assets(group=ASSETS_GAME) -> None:
+    '''
+    Carica in anticipo le immagini del gruppo indicato.
+    Pensata per essere lanciata come task mentre il menu è visibile:
+    cede il controllo prima di ogni immagine per non bloccare i frame.
+    '''
+    for asset in _image_assets(group):
+        await asyncio.sleep(0)
+        asset.get()
+
+def reset_images() -> None:
+    '''Dopo un cambio di scala: ogni immagine sarà riscalata al prossimo uso.'''
+    _DISPLAY_IMAGES.clear()
+    get_atlas.cache_clear()
+    for asset in _image_assets():
+        asset._surface = None
+
+def count_unconverted() -> tuple[int, int]:
+    '''
+    Diagnostica: quante immagini caricate non sono nel formato dello schermo
+    (o nel formato con alpha di convert_alpha) e vanno quindi convertite a
+    ogni blit.
 
-    async def manage_ai_smart_bear_selection(self) -> str:
-        '''
-        Gestisce la mossa dell'AI orso usando la policy di Reinforcement Learning.
-        '''
-        # Pausa per simulare il "pensiero"
-        await asyncio.sleep(1)
-        
-        # Ottiene tutte le azioni possibili
-        bear_actions = self.get_bear_actions()
-        
-        # Usa la policy AI per scegliere la migliore
-        action = self._bear_player.get_action(bear_actions, self)
-        
-        # Esegue la mossa
-        self.move_bear(action[1])
-        
-        return "L'orso intelligente ha mosso!"
-    
-    def manage_bear_selection(self, sel: int) -> str:
-        '''
-        Gestisce la mossa dell'orso controllato da un giocatore umano.
-        
-        Args:
-            sel: Posizione selezionata dal giocatore
-        Returns:
-            Messaggio da visualizzare
-        '''
-        if sel in self.get_possible_moves(self._bear_position):
-            # Mossa valida: sposta l'orso
-            self._board[self._bear_position] = BOARD_EMPTY
-            self._board[sel] = BOARD_BEAR
-            self._bear_moves += 1
-            self._bear_position = sel
-            self._is_hunter_turn = not(self._is_hunter_turn)
-            return "Seleziona uno dei cacciatori!"
-        else:
-            return "Posizione non valida..."
-    
-    # ========== METODI PER LA VISUALIZZAZIONE ==========
-    
-    def is_footprint_and_type(self, sel: int) -> tuple[bool, str]:
+    Returns:
+        (immagini caricate, immagini non convertite)
+    '''
+    screen = pygame.display.get_surface()
+    formats = {
+        (surface.get_bitsize(), surface.get_masks())
+        for surface in (screen, pygame.Surface((1, 1)).convert_alpha())
+    }
+    surfaces = list(_DISPLAY_IMAGES.values()) + list(get_atlas().values())
+    surfaces += [asset._surface for asset in _image_assets() if asset._surface is not None]
+    surfaces = list({id(surface): surface for surface in surfaces}.values())
+    unconverted = sum((surface.get_bitsize(), surface.get_masks()) not in formats
+                      for surface in surfaces)
+    return len(surfaces), unconverted
+
+
+# ========== RITMO DEI FRAME ==========
+# Frame al secondo quando c'è qualcosa da animare o da calcolare
+TARGET_FPS = 60
+# Attesa massima di un input a schermata ferma, in secondi
+IDLE_TIMEOUT = 0.5
+# Sul web il ciclo non può bloccarsi: intervallo di controllo degli input a schermata ferma
+WEB_IDLE_POLL = 1 / 30
+
+class FrameScheduler:
+    '''
+    Ritmo dei cicli di menu e manche, guidato dagli eventi.
+    Finché c'è lavoro (input appena gestito, schermo cambiato, mossa AI
+    in corso) i frame sono cadenzati a `fps`; quando tutto è fermo il ciclo
+    si sospende fino al prossimo input, o al più per `idle_timeout` secondi:
+    - desktop: pygame.event.wait, che non consuma CPU
+    - web: brevi asyncio.sleep, perché il browser non va mai bloccato
+    Anche i caricamenti lanciati con run_in_background tengono i frame a
+    ritmo pieno finché non sono conclusi.
+    '''
+    def __init__(self, fps: int = TARGET_FPS, idle_timeout: float = IDLE_TIMEOUT):
+        self.fps = fps
+        self.idle_timeout = idle_timeout
+        self._awake = True
+        self._last_frame = time.perf_counter()
+        self._background = set()            # Task di caricamento non ancora conclusi
+
+    def keep_awake(self) -> None:
+        '''Richiede il prossimo frame a ritmo pieno (animazione o calcolo in corso).'''
+        self._awake = True
+
+    def run_in_background(self, coro, name: str) -> asyncio.Task:
         '''
-        Verifica se una posizione è una destinazione valida (orma).
-        Le orme vengono visualizzate per indicare dove può muoversi il giocatore.
-        
-        Args:
-            sel: Posizione da controllare
-        Returns:
-            Tupla (è_orma, tipo_orma) dove tipo_orma è "HUNTER" o "BEAR" o None
+        Lancia un caricamento in background (policy, immagini, audio).
+        Ogni frame gli cede il controllo: finché è in corso il ciclo non si
+        sospende in attesa di input, che lo farebbe avanzare di un passo
+        ogni idle_timeout. Un errore del task è segnalato appena si conclude.
         '''
-        if self._is_hunter_turn:
-            # Se è il turno dei cacciatori e uno è selezionato
-            if self._hunter_starting_pos == -1:
-                return (False, None)
-            else:
-                if sel in self.get_possible_moves(self._hunter_starting_pos):
-                    return (True, "HUNTER")
-                else:
-                    return (False, None)
-        else:
-            # Se è il turno dell'orso
-            if sel in self.get_possible_moves(self._bear_position):
-                return (True, "BEAR")
-            else:
-                return (False, None)
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(functools.partial(self._background_done, name))
+        return task
 
-    def get_possible_moves(self, position: int) -> list[int]:
-        '''
-        Restituisce tutte le posizioni libere adiacenti a una posizione data.
-        
-        Args:
-            position: Posizione di partenza
-        Returns:
-            Lista di posizioni libere raggiungibili
-        '''
-        moves = []
-        # Controlla tutte le posizioni adiacenti
-        for x in BearGameManche.ADJACENT_POSITIONS[position]:
-            if self._board[x] == BOARD_EMPTY:
-                moves.append(x)
-        return moves
-
-    # ========== METODI PER L'AI ==========
-    
-    def get_hash(self) -> str:
-        '''
-        Genera un hash univoco dello stato della board per l'AI.
-        Normalizza i cacciatori (1,8,9 -> tutti '1') perché per l'AI
-        sono indistinguibili.
-        
-        Returns:
-            Stringa che rappresenta lo stato della board
-        '''
-        board = self._board.copy()
-        
-        # Normalizza gli ID dei cacciatori per il modello di RL
-        for i in range(len(board)):
-            if board[i] in [BOARD_HUNTER_3, BOARD_HUNTER_2, BOARD_HUNTER_1]:
-                board[i] = BOARD_HUNTER_POLICY
-        
-        return ''.join(board)
+    def _background_done(self, name: str, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Caricamento in background '{name}' fallito:", repr(task.exception()))
 
-    def undo_move(self) -> None:
+    async def next_frame(self) -> list:
         '''
-        Annulla l'ultima mossa effettuata.
-        Usato dall'AI per esplorare diverse possibilità durante la ricerca.
+        Attende il prossimo frame e restituisce gli eventi arrivati nel frattempo.
+        Un frame con eventi tiene sveglio anche il successivo.
         '''
-        self._is_hunter_turn = not self._is_hunter_turn
-        target_position, starting_position = self._last_move  # Invertiti!
-        start_symbol = self._board[starting_position]
-        self._board[starting_position] = BOARD_EMPTY
-        
-        if self._is_hunter_turn:
-            # Era una mossa dell'orso, ripristina il cacciatore
-            self._board[target_position] = start_symbol
+        if self._awake or self._background:
+            self._awake = False
+            # Cadenza reale: attende il resto del frame cedendo il controllo
+            # all'event loop (calcolo AI, caricamenti in background)
+            await asyncio.sleep(max(0, self._last_frame + 1 / self.fps - time.perf_counter()))
+            events = pygame.event.get()
         else:
-            # Era una mossa dei cacciatori, ripristina l'orso
-            self._bear_moves -= 1
-            self._bear_position = target_position
-            self._board[target_position] = start_symbol
-        
-        self._last_move = None
-
-
-# ========== FUNZIONI DI UTILITÀ PER ASSET ==========
-
-@functools.lru_cache()
-def get_img(path):
+            events = await self._wait_input()
+        self._last_frame = time.perf_counter()
+        if events:
+            self._awake = True
+        return events
+
+    async def _wait_input(self) -> list:
+        '''Attende senza consumare CPU il primo input, o la fine di idle_timeout.'''
+        if IS_WEB:
+            deadline = time.perf_counter() + self.idle_timeout
+            while True:
+                await asyncio.sleep(WEB_IDLE_POLL)
+                events = pygame.event.get()
+                if events or time.perf_counter() >= deadline:
+                    return events
+        # Lascia avanzare i task in background prima di bloccarsi
+        await asyncio.sleep(0)
+        event = pygame.event.wait(int(self.idle_timeout * 1000))
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+
+
+# ========== PROFILER DEI FRAME ==========
+# Misura dei tempi delle fasi dei cicli di menu e manche: attiva solo con
+# PROFILE_FRAMES = True, il tasto PROFILE_OVERLAY_KEY mostra/nasconde i
+# percentili a video e all'uscita vengono salvati in PROFILE_FILE
+PROFILE_FRAMES = False
+PROFILE_OVERLAY_KEY = pygame.K_F3
+PROFILE_FILE = 'profilo_frame.json'
+# Frame su cui sono calcolati i percentili (finestra mobile)
+PROFILE_WINDOW = 600
+# Intervallo di aggiornamento del pannello dei percentili, in secondi
+PROFILE_OVERLAY_REFRESH = 0.5
+PROFILE_FONT_SIZE = 22
+
+class FrameProfiler:
     '''
-    Carica un'immagine con cache LRU per ottimizzare le prestazioni.
-    Il decorator lru_cache salva le immagini in memoria per recuperi rapidi.
+    Tempi delle fasi di ogni frame, misurati con perf_counter:
+    start all'inizio del lavoro del frame (dopo l'attesa del FrameScheduler),
+    mark alla fine di ogni fase, end alla fine del frame.
+    Per ogni fase tiene gli ultimi PROFILE_WINDOW campioni, da cui calcola
+    p50/p95/p99, più conteggio, media e massimo su tutta l'esecuzione.
+    Da disattivato ogni metodo ritorna subito.
     '''
-    return pygame.image.load(path)
-
-@functools.lru_cache()
-def get_img_alpha(path):
+    PERCENTILI = (50, 95, 99)
+
+    def __init__(self, enabled: bool = PROFILE_FRAMES, window: int = PROFILE_WINDOW):
+        self.enabled = enabled
+        self.window = window
+        self.overlay = ProfilerOverlay(self) if enabled else None
+        self._samples = {}
+        self._totals = {}
+        self._scene = None
+        self._start = self._last = 0.0
+
+    def start(self, scene: str) -> None:
+        '''Inizio del lavoro del frame della scena indicata'''
+        if not self.enabled:
+            return
+        self._scene = scene
+        self._start = self._last = time.perf_counter()
+
+    def mark(self, phase: str) -> None:
+        '''Fine di una fase: il tempo dall'ultimo mark (o da start) va alla fase'''
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._add(phase, now - self._last)
+        self._last = now
+
+    def section(self, scene: str, phase: str, start: float) -> None:
+        '''Fase misurata a parte, fuori dalla sequenza dei mark (es. un ridisegno completo)'''
+        if not self.enabled:
+            return
+        self._add(phase, time.perf_counter() - start, scene)
+
+    def end(self) -> None:
+        '''Fine del frame: il tempo totale da start va alla fase "frame"'''
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._add('frame', now - self._start)
+        self._last = now
+
+    def _add(self, phase: str, seconds: float, scene: str = None) -> None:
+        key = (scene or self._scene, phase)
+        samples = self._samples.get(key)
+        if samples is None:
+            samples = self._samples[key] = collections.deque(maxlen=self.window)
+            self._totals[key] = [0, 0.0, 0.0]
+        samples.append(seconds)
+        totals = self._totals[key]
+        totals[0] += 1
+        totals[1] += seconds
+        totals[2] = max(totals[2], seconds)
+
+    def stats(self, scene: str = None) -> dict:
+        '''
+        Statistiche in millisecondi per "scena.fase" (solo della scena
+        indicata, se data): percentili della finestra, media e massimo totali
+        '''
+        stats = {}
+        for (key_scene, phase), samples in self._samples.items():
+            if scene is not None and key_scene != scene:
+                continue
+            ordered = sorted(samples)
+            count, total, peak = self._totals[(key_scene, phase)]
+            entry = {'p%d' % p: 1000 * ordered[(len(ordered) - 1) * p // 100]
+                     for p in self.PERCENTILI}
+            entry.update(n=count, media=1000 * total / count, max=1000 * peak)
+            stats[f"{key_scene}.{phase}"] = entry
+        return stats
+
+    def toggle_overlay(self) -> bool:
+        '''Mostra/nasconde il pannello; restituisce True se ora è visibile'''
+        return self.overlay.toggle()
+
+    def update_overlay(self) -> bool:
+        '''Aggiorna il pannello se visibile; True se l'immagine è cambiata'''
+        if not self.enabled:
+            return False
+        return self.overlay.refresh(self._scene)
+
+    def dump(self, path: str = PROFILE_FILE) -> None:
+        '''Salva le statistiche in JSON (e le stampa, utile sul web)'''
+        if not self.enabled or not self._samples:
+            return
+        stats = self.stats()
+        for name, entry in stats.items():
+            print("%-20s p50 %7.3f  p95 %7.3f  p99 %7.3f  max %7.3f ms (%d frame)" % (
+                name, entry['p50'], entry['p95'], entry['p99'], entry['max'], entry['n']))
+        try:
+            with open(path, 'w') as file_write:
+                json.dump({'finestra': self.window, 'fasi_ms': stats}, file_write, indent=1)
+        except OSError as error:
+            print("Profilo non salvato:", error)
+
+
+class ProfilerOverlay(pygame.sprite.DirtySprite):
     '''
-    Carica un'immagine con trasparenza (canale alpha) usando la cache.
+    Pannello dei percentili della scena corrente, in alto a sinistra sopra
+    a tutto il resto; l'immagine è rigenerata al più ogni
+    PROFILE_OVERLAY_REFRESH secondi. Nella manche sta nel gruppo dei
+    rettangoli sporchi, nel menu è disegnato dal ciclo del menu.
     '''
-    return pygame.image.load(path).convert_alpha()
+    LAYER = 100
 
-def scale_img(img, scale_factor=0.833333):
+    def __init__(self, profiler: FrameProfiler):
+        super().__init__()
+        self.profiler = profiler
+        self._layer = ProfilerOverlay.LAYER
+        self.visible = 0
+        self.image = pygame.Surface((1, 1))
+        self.rect = self.image.get_rect()
+        self._font = None
+        self._font_size = None
+        self._refreshed = 0.0
+
+    def toggle(self) -> bool:
+        self.visible = 0 if self.visible else 1
+        self._refreshed = 0.0
+        self.dirty = 1
+        return bool(self.visible)
+
+    def refresh(self, scene: str) -> bool:
+        now = time.perf_counter()
+        if not self.visible or now - self._refreshed < PROFILE_OVERLAY_REFRESH:
+            return False
+        self._refreshed = now
+        size = LAYOUT.length(PROFILE_FONT_SIZE)
+        if size != self._font_size:
+            # Font di default di pygame: disponibile anche sul web
+            self._font = pygame.font.Font(None, size)
+            self._font_size = size
+        righe = [("ms",) + tuple("p%d" % p for p in FrameProfiler.PERCENTILI)]
+        for name, entry in self.profiler.stats(scene).items():
+            righe.append((name.split('.', 1)[1],) + tuple(
+                "%.2f" % entry['p%d' % p] for p in FrameProfiler.PERCENTILI))
+        # Tabella: prima colonna allineata a sinistra, numeri a destra
+        celle = [[self._font.render(testo, True, (255, 255, 255)) for testo in riga] for riga in righe]
+        larghezze = [max(riga[c].get_width() for riga in celle) for c in range(len(celle[0]))]
+        margine = LAYOUT.length(6)
+        altezza = self._font.get_linesize()
+        self.image = pygame.Surface((sum(larghezze) + margine * (len(larghezze) + 1),
+                                     altezza * len(celle) + 2 * margine))
+        self.image.fill(BLACK)
+        for r, riga in enumerate(celle):
+            x = margine
+            for c, cella in enumerate(riga):
+                dx = 0 if c == 0 else larghezze[c] - cella.get_width()
+                self.image.blit(cella, (x + dx, margine + r * altezza))
+                x += larghezze[c] + margine
+        self.rect = self.image.get_rect(topleft=LAYOUT.point((0, 0)))
+        self.dirty = 1
+        return True
+
+
+# ========== AUDIO ==========
+MUSIC_MENU = 'sfx/intro.ogg'
+MUSIC_MANCHE = 'sfx/orso_music.ogg'
+SFX_BEAR_WINS = 'sfx/orso_ride.ogg'
+SFX_HUNTERS_WIN = 'sfx/success.ogg'
+SOUND_EFFECTS = (SFX_BEAR_WINS, SFX_HUNTERS_WIN)
+# Canale riservato agli effetti sonori
+SFX_CHANNEL = 1
+
+class AudioManager:
     '''
-    Ridimensiona un'immagine secondo un fattore di scala.
-    Il fattore 0.833333 = 1280/1536 converte dalla risoluzione originale a 1280x720.
-    
-    Args:
-        img: Immagine PyGame da scalare
-        scale_factor: Fattore di scala (default 0.833333)
-    Returns:
-        Immagine scalata
+    Musiche ed effetti sonori del gioco.
+    - le musiche sono lette da disco una sola volta e restano in memoria;
+      la traccia già caricata non viene ricaricata, solo fatta ripartire
+    - gli effetti sono decodificati una sola volta in oggetti Sound
+      (in anticipo con preload, così la fine manche non attende il disco)
+    - se l'audio non è disponibile viene disattivato esplicitamente:
+      music_disabled / sfx_disabled contengono il motivo
     '''
-    new_width = int(img.get_width() * scale_factor)
-    new_height = int(img.get_height() * scale_factor)
-    return pygame.transform.scale(img, (new_width, new_height))
+    def __init__(self, enabled: bool):
+        self.music_disabled = None
+        self.sfx_disabled = None
+        if not enabled:
+            self.music_disabled = self.sfx_disabled = "audio disattivato (MUSIC = False)"
+        elif not pygame.mixer.get_init():
+            self.music_disabled = self.sfx_disabled = "mixer non disponibile"
+        elif IS_WEB:
+            # Gli effetti sui Channel non funzionano con webasm
+            self.sfx_disabled = "effetti sonori non supportati sul web"
+        # Percorso -> contenuto del file musicale
+        self._music_data = {}
+        # Percorso -> Sound decodificato (None se non caricabile)
+        self._sounds = {}
+        self._current_music = None
+
+    def _music_source(self, path):
+        if IS_WEB:
+            # Il file system del browser è già in memoria
+            return path
+        data = self._music_data.get(path)
+        if data is None:
+            with open(path, 'rb') as file_read:
+                data = self._music_data[path] = file_read.read()
+        return io.BytesIO(data)
+
+    def play_music(self, path, loops: int = -1) -> None:
+        '''Avvia la musica indicata, dall'inizio.'''
+        if self.music_disabled:
+            return
+        try:
+            if path != self._current_music:
+                pygame.mixer.music.load(self._music_source(path), 'ogg')
+                self._current_music = path
+            pygame.mixer.music.play(loops)
+        except (pygame.error, OSError) as error:
+            self.music_disabled = f"{path}: {error}"
+            print("Musica disattivata:", self.music_disabled)
+
+    def fadeout_music(self, ms: int) -> None:
+        if not self.music_disabled:
+            pygame.mixer.music.fadeout(ms)
+
+    def pause_music(self) -> None:
+        if not self.music_disabled:
+            pygame.mixer.music.pause()
+
+    def stop_music(self) -> None:
+        if not self.music_disabled:
+            pygame.mixer.music.stop()
+
+    def _sound(self, path):
+        if path not in self._sounds:
+            try:
+                self._sounds[path] = pygame.mixer.Sound(path)
+            except (pygame.error, OSError) as error:
+                self._sounds[path] = None
+                print("Effetto sonoro non disponibile:", path, error)
+        return self._sounds[path]
+
+    def play_sound(self, path) -> None:
+        '''Riproduce un effetto sonoro sul canale degli effetti.'''
+        if self.sfx_disabled:
+            return
+        sound = self._sound(path)
+        if sound is not None:
+            pygame.mixer.Channel(SFX_CHANNEL).play(sound)
+
+    async def preload(self, sounds=SOUND_EFFECTS, music=(MUSIC_MANCHE,)) -> None:
+        '''
+        Decodifica gli effetti e legge le musiche in anticipo.
+        Pensata per essere lanciata come task mentre il menu è visibile:
+        cede il controllo prima di ogni file.
+        '''
+        if not self.sfx_disabled:
+            for path in sounds:
+                await asyncio.sleep(0)
+                self._sound(path)
+        if not self.music_disabled and not IS_WEB:
+            for path in music:
+                await asyncio.sleep(0)
+                try:
+                    self._music_source(path)
+                except OSError as error:
+                    print("Musica non disponibile:", path, error)
+
+
+# ========== SCENE ==========
+# Ogni scena restituisce il nome della successiva a main(), che le esegue
+# una dopo l'altra in un unico ciclo: nessuna scena ne richiama un'altra
+SCENE_MENU = 'menu'
+SCENE_INTRO = 'intro'          # giocatori e punteggi prima di ogni manche
+SCENE_MANCHE = 'manche'
+SCENE_RESULTS = 'risultati'    # vincitore dopo la seconda manche
+SCENE_QUIT = 'uscita'
 
 
 # ========== CLASSE PRINCIPALE PYGAME ==========
@@ -550,7 +749,25 @@ class OrsoPyGame:
     FINESTRA_Y = 720
     DIM_CASELLA = 80
 
-    def __init__(self):
+    # Menu: caricate prima del primo frame
+    # grafica titolo creata con https://textcraft.net/
+    ORSO_IDLE_IMG = ImageAsset('img/little-bear-idle.png', sprite=True, group=ASSETS_MENU)
+    TRE_CACCIATORI_IMG = ImageAsset('img/TreCacciatoriTurno.png', group=ASSETS_MENU)
+    TITOLO = ImageAsset("img/Gioco-dellorso.png", alpha=True, group=ASSETS_MENU)
+    L_ORSO = ImageAsset("img/Lorso.png", alpha=True, group=ASSETS_MENU)
+    I_CACCIATORI = ImageAsset("img/I-cacciatori.png", alpha=True, group=ASSETS_MENU)
+    MENU_BACKGROUND = ImageAsset("img/3d_board.png", group=ASSETS_MENU)
+    PBG_LOGO = ImageAsset("img/pbg-small-empty.png", group=ASSETS_MENU)
+    # Manche: caricate in background mentre il menu è visibile
+    USCITA_IMG = ImageAsset('img/back.png')
+    LABEL = ImageAsset('img/buttonLong.png')
+    BOARD_IMG = ImageAsset('img/board.png')
+    # Posizione del pannello di uscita dalla manche
+    USCITA_CENTER = (1129, 562)
+    # Secondi di pausa sul messaggio di fine manche
+    END_MANCHE_PAUSE = 5
+
+    def __init__(self, fps: int = TARGET_FPS):
         '''
         Game init
         '''
@@ -559,8 +776,9 @@ class OrsoPyGame:
         # Initialize pygame
         pygame.init()
         if IS_WEB:
-            # Non può essere SCALED per webasm
-            self.screen = pygame.display.set_mode((OrsoPyGame.FINESTRA_X, OrsoPyGame.FINESTRA_Y))
+            # Non può essere SCALED per webasm: la tela ha la risoluzione
+            # nativa della pagina e il gioco è disegnato alla sua scala
+            self.screen = pygame.display.set_mode(native_canvas_size())
         else:
             # flags to manage full screen and rescaling, working for Pygame > 2.0
             display_flags = pygame.SCALED | pygame.FULLSCREEN
@@ -569,8 +787,21 @@ class OrsoPyGame:
         pygame.display.set_caption("Gioco dell'orso")
         # set game clock
         self.clock = pygame.time.Clock()
-        self._load_assets_menu()
-        self._load_assets_game()
+        # Ritmo dei frame: target FPS quando serve, attesa degli input da fermi
+        self._scheduler = FrameScheduler(fps)
+        # Tempi delle fasi dei frame (solo con PROFILE_FRAMES)
+        self.profiler = FrameProfiler(PROFILE_FRAMES)
+        # Musiche ed effetti sonori
+        self.audio = AudioManager(MUSIC)
+        # Coordinate logiche 1280x720 -> tela
+        LAYOUT.resize(self.screen.get_size())
+        # Font condivisi da tutti gli sprite di menu e HUD
+        preload_fonts()
+        # Solo le immagini del menu: quelle della manche arrivano con
+        # prefetch_image_assets (o al primo utilizzo)
+        load_image_assets(ASSETS_MENU)
+        if ASSET_DEBUG:
+            print("Immagini caricate: %d, non convertite: %d" % count_unconverted())
         # Gestione caselle: posizione e gruppo sprite - SCALATE
         self._caselle = [(608,0), (471,4), (750,4), #0,1,2
                     (608,112), (292,188), (608,188), #3,4,5
@@ -584,47 +815,125 @@ class OrsoPyGame:
         for i,p in enumerate(self._caselle):
             #print(i,p)
             pos = CasellaGiocoOrso(i, self)
-            # Definisco rect ma non image
-            pos.rect = pygame.Rect(p[0],p[1], OrsoPyGame.DIM_CASELLA, OrsoPyGame.DIM_CASELLA)
             self._lista_caselle.add(pos)
+        self._layout_caselle()
+
+    def _layout_caselle(self) -> None:
+        '''Rettangoli delle caselle sulla tela (image è decisa dalla vista)'''
+        for pos in self._lista_caselle:
+            p = self._caselle[pos.position]
+            pos.rect = LAYOUT.rect((p[0], p[1], OrsoPyGame.DIM_CASELLA, OrsoPyGame.DIM_CASELLA))
 
-    def _load_assets_game(self) -> None:
-        '''Loading game assets'''
-        self.USCITA_IMG = scale_img(get_img('img/back.png'))
-        self.USCITA_RECT = self.USCITA_IMG.get_rect()
-        self.LABEL = scale_img(get_img('img/buttonLong.png'))
-        self.USCITA_RECT.center = (1129,562)
-        # Scacchiera
-        self.BOARD_IMG = scale_img(get_img('img/board.png'))
-
-    def _load_assets_menu(self) -> None:
-        '''Loading menu assets'''
-        # grafica titolo creata con https://textcraft.net/
-        self.ORSO_IDLE_IMG = scale_img(get_img('img/little-bear-idle.png'))
-        self.TRE_CACCIATORI_IMG = scale_img(get_img('img/TreCacciatoriTurno.png'))
-        self.TITOLO = scale_img(get_img_alpha("img/Gioco-dellorso.png"))
-        self.L_ORSO = scale_img(get_img_alpha("img/Lorso.png"))
-        self.I_CACCIATORI = scale_img(get_img_alpha("img/I-cacciatori.png"))
-        # Utilizzo casuale delle immagini di sfondo
-        self.MENU_BACKGROUND = scale_img(get_img(f"img/3d_board.png"))
-        self.PBG_LOGO = scale_img(get_img("img/pbg-small-empty.png"))
-
-    async def menu(self) -> None:
+    def _resize_screen(self) -> bool:
         '''
-        Display main menu with PyGame
+        Adatta il gioco alla nuova dimensione della finestra.
+        Se la scala cambia, immagini e font saranno riscalati (una volta)
+        al prossimo uso; restituisce True se la scena va ridisegnata.
         '''
-        if MUSIC:
-            pygame.mixer.music.load('sfx/intro.ogg')
-            pygame.mixer.music.play(-1)
+        if IS_WEB:
+            self.screen = pygame.display.set_mode(native_canvas_size())
+        if not LAYOUT.resize(self.screen.get_size()):
+            return False
+        reset_images()
+        self._layout_caselle()
+        self.screen.fill(BLACK)
+        return True
+
+    async def play_scene(self, scene: str) -> str:
+        '''Esegue la scena indicata e restituisce il nome della successiva'''
+        scenes = {
+            SCENE_MENU: self.menu,
+            SCENE_INTRO: self.intro,
+            SCENE_MANCHE: self.play_manche,
+            SCENE_RESULTS: self.results,
+        }
+        return await scenes[scene]()
 
+    async def menu(self) -> str:
+        '''
+        Display main menu with PyGame
+        '''
+        self.audio.play_music(MUSIC_MENU)
+        self._draw_menu()
+        self._pos_call = (0, 0)
+        self._running = True
+        # Scena successiva, decisa dalle voci di menu
+        self._next_scene = SCENE_QUIT
+        ridisegna = True
+        stato = self._menu_state()
+        self._scheduler.keep_awake()
+        # Menu loop: il menu si ridisegna solo quando cambia la voce sotto
+        # il mouse o una scelta, non per ogni evento (es. MOUSEMOTION)
+        while self._running:
+            events = await self._scheduler.next_frame()
+            self.profiler.start(SCENE_MENU)
+            self._pos_call = pygame.mouse.get_pos()
+            for event in events:
+                if event.type == pygame.QUIT:
+                    self._running = False
+                    self._next_scene = SCENE_QUIT
+                elif event.type == pygame.VIDEORESIZE and self._resize_screen():
+                    # Stesso menu alla nuova scala, con le scelte già fatte
+                    self._draw_menu(self._menu_values())
+                    ridisegna = True
+                elif (event.type == pygame.KEYDOWN and event.key == PROFILE_OVERLAY_KEY
+                      and self.profiler.enabled):
+                    if not self.profiler.toggle_overlay():
+                        # Pannello nascosto: ridisegna lo sfondo sotto
+                        self._draw_menu(self._menu_values())
+                        ridisegna = True
+                elif event.type == pygame.MOUSEBUTTONDOWN:                
+                    self._pos_call = pygame.mouse.get_pos()
+                    for m_item in self._menu_items:
+                        if m_item.rect.collidepoint(self._pos_call):
+                            await m_item.action()
+            if self._running and self._menu_state() != stato:
+                stato = self._menu_state()
+                ridisegna = True
+            self.profiler.mark('input')
+            if ridisegna:
+                ridisegna = False
+                # Aggiorna gli items di menu
+                self._menu_items.update()
+                self._menu_items.draw(self.screen)
+                self.profiler.mark('voci')
+                # Aggiorna lo screen
+                pygame.display.update()
+                self.profiler.mark('display')
+            if self.profiler.update_overlay():
+                overlay = self.profiler.overlay
+                pygame.display.update(self.screen.blit(overlay.image, overlay.rect))
+            self.profiler.end()
+        return self._next_scene
+
+    def _menu_values(self) -> tuple:
+        '''Scelte correnti delle voci del menu'''
+        return (self._m_pl_mode.value, self._m_first_manche.value,
+                self._m_pos_iniziali.value, self._m_difficolta.value)
+
+    def _menu_state(self) -> tuple:
+        '''Scelte correnti e indice della voce sotto il mouse (None se nessuna)'''
+        sotto_mouse = None
+        for indice, m_item in enumerate(self._menu_items):
+            if m_item.rect.collidepoint(self._pos_call):
+                sotto_mouse = indice
+                break
+        return self._menu_values(), sotto_mouse
+
+    def _draw_menu(self, valori=(True, False, True, False)) -> None:
+        '''
+        Disegna lo sfondo del menu e ne crea le voci
+        (valori: contro computer, prima manche da orso, posizione classica, livello esperto)
+        '''
+        contro_computer, prima_manche_orso, posizione_classica, esperto = valori
         # Elementi di sfondo - SCALATI
-        self.screen.blit(self.MENU_BACKGROUND, (0, 0))
-        self.screen.blit(self.PBG_LOGO, (0, 0))
-        self.screen.blit(self.TITOLO, (417,17))
-        self.screen.blit(self.L_ORSO, (192, 292))
-        self.screen.blit(self.ORSO_IDLE_IMG, (208, 350))
-        self.screen.blit(self.I_CACCIATORI, (967, 292))
-        self.screen.blit(self.TRE_CACCIATORI_IMG, (1000, 350))
+        self.screen.blit(self.MENU_BACKGROUND, LAYOUT.point((0, 0)))
+        self.screen.blit(self.PBG_LOGO, LAYOUT.point((0, 0)))
+        self.screen.blit(self.TITOLO, LAYOUT.point((417,17)))
+        self.screen.blit(self.L_ORSO, LAYOUT.point((192, 292)))
+        self.screen.blit(self.ORSO_IDLE_IMG, LAYOUT.point((208, 350)))
+        self.screen.blit(self.I_CACCIATORI, LAYOUT.point((967, 292)))
+        self.screen.blit(self.TRE_CACCIATORI_IMG, LAYOUT.point((1000, 350)))
         
         # Creo gruppo sprite per menu
         self._menu_items = pygame.sprite.Group()
@@ -639,7 +948,7 @@ class OrsoPyGame:
             True:"Gioca contro il computer              ",
             False:'Gioca contro un amico                 '
         }
-        self._m_pl_mode = OpzioneMenuAgainstComputer(self.OPZIONI_PLAYER_MODE, True, self, (483,292))
+        self._m_pl_mode = OpzioneMenuAgainstComputer(self.OPZIONI_PLAYER_MODE, contro_computer, self, (483,292))
         self._menu_items.add(self._m_pl_mode)
         
         # Opzione menu Mosse
@@ -647,7 +956,7 @@ class OrsoPyGame:
             True:'Prima manche come orso                  ',
             False:'Prima manche come cacciatore           '
         }
-        self._m_first_manche = OpzioneMenuFirstMancheAsBear(self.OPZIONI_PRIMA_MANCHE, False, self, (483,367))
+        self._m_first_manche = OpzioneMenuFirstMancheAsBear(self.OPZIONI_PRIMA_MANCHE, prima_manche_orso, self, (483,367))
         self._menu_items.add(self._m_first_manche)
         
         # Opzione disposizione iniziale
@@ -655,56 +964,53 @@ class OrsoPyGame:
             True: 'Posizione iniziale classica        ',
             False:"Posizione iniziale centrale        "
             }
-        self._m_pos_iniziali = OpzioneMenuInizio(self.OPZIONI_INIZIO, True, self, (483,442)) 
+        self._m_pos_iniziali = OpzioneMenuInizio(self.OPZIONI_INIZIO, posizione_classica, self, (483,442)) 
         self._menu_items.add(self._m_pos_iniziali)
 
-        self._pos_call = (0, 0)
-        self._running = True
-        # Menu loop
-        while self._running:
-            self._pos_call = pygame.mouse.get_pos()
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self._running = False
-                    await self.quit()
-                elif event.type == pygame.MOUSEBUTTONDOWN:                
-                    self._pos_call = pygame.mouse.get_pos()
-                    for m_item in self._menu_items:
-                        if m_item.rect.collidepoint(self._pos_call):
-                            await m_item.action()
-            # Aggiorna gli items di menu
-            self._menu_items.update()
-            self._menu_items.draw(self.screen)
-            # Aggiorna lo screen
-            pygame.display.update()
-            await asyncio.sleep(0)
+        # Opzione livello del computer
+        self.OPZIONI_DIFFICOLTA = {
+            False: 'Computer: livello normale          ',
+            True: 'Computer: livello esperto           '
+            }
+        self._m_difficolta = OpzioneMenuDifficolta(self.OPZIONI_DIFFICOLTA, esperto, self, (483,517))
+        self._menu_items.add(self._m_difficolta)
+
+    def run_in_background(self, coro, name: str) -> asyncio.Task:
+        '''Caricamento in background che tiene svegli i frame (vedi FrameScheduler)'''
+        return self._scheduler.run_in_background(coro, name)
 
     async def quit(self):
         '''Exit from game'''
         await asyncio.sleep(0.5)
-        if MUSIC:
-            pygame.mixer.music.fadeout(500)
-            pygame.mixer.music.stop()
+        self.audio.fadeout_music(500)
+        self.audio.stop_music()
+        self.profiler.dump()
         pygame.quit()
         sys.exit(0)
 
     async def _menu_call(self):
-        '''Menu call'''
+        '''Uscita dalla manche verso il menu'''
         await asyncio.sleep(0.5)
-        if MUSIC:
-            pygame.mixer.music.fadeout(500)
-        await self.menu()
+        self.audio.fadeout_music(500)
 
     async def manche(self,
                    first_manche_as_bear: bool,
                    against_computer: bool, 
-                   posizioni_iniziali_classiche: bool):
-        '''Manche loop logic with PyGame'''
-        if MUSIC:
-            pygame.mixer.music.load('sfx/orso_music.ogg')
-            pygame.mixer.music.play(-1)
+                   posizioni_iniziali_classiche: bool,
+                   livello_esperto: bool = False):
+        '''
+        Manche loop logic with PyGame.
+        Restituisce le mosse fatte dall'orso, o None se il giocatore
+        abbandona la manche
+        '''
+        self.audio.play_music(MUSIC_MANCHE)
         # Inizializza la scacchiera e il gioco
         self.una_manche = BearGameManche(first_manche_as_bear, against_computer, posizioni_iniziali_classiche)
+        if against_computer and livello_esperto:
+            # Livello esperto: ricerca alfa-beta al posto della sola policy
+            # (importata qui per non allungare l'avvio)
+            from search import SearchPlayer
+            self.una_manche.set_ai_players(SearchPlayer("orso"), SearchPlayer("cacciatore"))
         # Ruolo computer
         self._computer = None
         if against_computer:
@@ -713,55 +1019,54 @@ class OrsoPyGame:
             else:
                 self._computer = "BEAR"
         self._msg = "L'orso scappa facendo "+str(self.una_manche.get_max_bear_moves())+" mosse"
-        # Creazione gruppo elementi di HUD
-        self._hud = pygame.sprite.Group()
-        self._h_turno = HudTurno(self)
-        self._h_mosse = HudMosseOrso(self)
-        self._h_msg = HudMessaggi(self)    
-        self._hud.add(self._h_turno)
-        self._hud.add(self._h_mosse)
-        self._hud.add(self._h_msg)       
+        self._draw_manche()
         # Inizializzazioni
         self._running = True
         self._pos_call = (0, 0)
         self._selezione = None
-        pygame.display.update()
-        await asyncio.sleep(0)        
-        # Manche loop
+        self._scheduler.keep_awake()
+        # Manche loop: a ritmo pieno durante le mosse AI e dopo ogni
+        # cambiamento, altrimenti in attesa dell'input del giocatore
         while self._running:
-            self.clock.tick(60)
-            # Disegna la scacchiera
-            self.screen.blit(self.BOARD_IMG, (0, 0))
-            # Pannello uscita
-            self.screen.blit(self.USCITA_IMG, (1042, 483))
-            # Aggiorna le caselle
-            self._lista_caselle.update()
-            self._lista_caselle.draw(self.screen)
-            # Aggiorna HUD
-            self._hud.update()
-            self._hud.draw(self.screen)
-            # Se è turno AI deve procedere senza verificare click utente
+            events = await self._scheduler.next_frame()
+            self.profiler.start(SCENE_MANCHE)
+            # Se è turno AI deve procedere senza verificare click utente:
+            # la mossa è calcolata in background e applicata quando è pronta,
+            # intanto il ciclo continua a disegnare e a leggere gli eventi
+            msg_ai = None
             if ((self.una_manche.against_computer) and 
                 (not self.una_manche.is_hunter_turn()) and 
                 (self._computer == "BEAR")):
-                self._msg = await self.una_manche.manage_ai_smart_bear_selection()
-            if ((self.una_manche.against_computer) and 
+                self._scheduler.keep_awake()
+                msg_ai = self.una_manche.manage_ai_smart_bear_selection()
+            elif ((self.una_manche.against_computer) and 
                 (self.una_manche.is_hunter_turn()) and 
                 (self._computer == "HUNTER"))                :
-                self._msg = await self.una_manche.manage_ai_hunter_selection()                          
-            pygame.display.update()
-            await asyncio.sleep(0)
+                self._scheduler.keep_awake()
+                msg_ai = self.una_manche.manage_ai_hunter_selection()
+            if msg_ai is not None:
+                self._msg = msg_ai
+            self.profiler.mark('ai')
             # Check eventi
-            for event in pygame.event.get():
+            for event in events:
                 if event.type == pygame.QUIT:
                     self._running = False
+                    self.una_manche.cancel_ai_action()
                     await self._menu_call()
+                    return None
+                elif event.type == pygame.VIDEORESIZE and self._resize_screen():
+                    self._draw_manche()
+                elif (event.type == pygame.KEYDOWN and event.key == PROFILE_OVERLAY_KEY
+                      and self.profiler.enabled):
+                    self.profiler.toggle_overlay()
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     self._pos_call = pygame.mouse.get_pos()
                     # Verifica se click su freccia per uscita
                     if self.USCITA_RECT.collidepoint(self._pos_call):
                         self._running = False
+                        self.una_manche.cancel_ai_action()
                         await self._menu_call()
+                        return None
                     # Controlla click nelle caselle
                     for casella_cliccata in self._lista_caselle:
                         if casella_cliccata.rect.collidepoint(self._pos_call):
@@ -782,152 +1087,168 @@ class OrsoPyGame:
                                   (self.una_manche.against_computer) and 
                                   (self._computer == "HUNTER")):                                    
                                     self._msg = self.una_manche.manage_bear_selection(self._selezione)            
-                            pygame.display.update()
-                            await asyncio.sleep(0)
-            # Aggiornamento screen
-            # Aggiorna le caselle
-            self._lista_caselle.update()
-            self._lista_caselle.draw(self.screen)
-            # Aggiorna HUD
+            # Aggiornamento screen: caselle e HUD segnano come sporco solo
+            # ciò che è cambiato, a video vanno solo quei rettangoli.
+            # Le caselle si aggiornano solo quando cambia la versione della vista
+            self.profiler.mark('input')
+            versione = self.una_manche.get_view()[0]
+            if versione != self._versione_vista:
+                self._versione_vista = versione
+                self._lista_caselle.update()
+            self.profiler.mark('caselle')
             self._hud.update()
-            self._hud.draw(self.screen)
+            self.profiler.mark('hud')
+            self.profiler.update_overlay()
+            rects = self._dirty.draw(self.screen)
+            self.profiler.mark('disegno')
+            if rects:
+                pygame.display.update(rects)
+                self._scheduler.keep_awake()
+            self.profiler.mark('display')
+            self.profiler.end()
             # Check fine della manche
             if self.una_manche.game_over():
-                if MUSIC:
-                    pygame.mixer.music.pause()
+                self.audio.pause_music()
                 self._msg = "Fine manche"
-                self.screen.blit(self.LABEL, (483, 317))
-                self.LOBSTER_25 = pygame.font.Font('LobsterTwo-Regular.otf',21)
+                self.screen.blit(self.LABEL, LAYOUT.point((483, 317)))
+                self.LOBSTER_25 = get_font(21)
                 text = ""
                 if self.una_manche.is_bear_winner():
-                    try:
-                        #Non funziona con webasm
-                        if MUSIC:
-                            pygame.mixer.Channel(1).play(pygame.mixer.Sound('sfx/orso_ride.ogg'))
-                    except:
-                        pass
+                    self.audio.play_sound(SFX_BEAR_WINS)
                     text = self.LOBSTER_25.render(f"   L'orso raggiunge {self.una_manche.get_max_bear_moves()} mosse e scappa!", 1, BLACK)
                 else:
-                    try:
-                        #Non funziona con webasm
-                        if MUSIC:
-                            pygame.mixer.Channel(1).play(pygame.mixer.Sound('sfx/success.ogg')) 
-                    except:
-                        pass
+                    self.audio.play_sound(SFX_HUNTERS_WIN)
                     text = self.LOBSTER_25.render(f"  I cacciatori lasciano all'orso {self.una_manche.get_bear_moves()} mosse", 1, BLACK)
-                self.screen.blit(text, (492,333))
+                self.screen.blit(text, LAYOUT.point((492,333)))
                 pygame.display.update()
-                await asyncio.sleep(5)                    
+                await asyncio.sleep(self.END_MANCHE_PAUSE)
                 return self.una_manche.get_bear_moves()
-            pygame.display.update()
-            await asyncio.sleep(0)
                 
 
-    async def game(self,
-                   first_manche_as_bear: bool,
-                   against_computer: bool, 
-                   posizioni_iniziali_classiche: bool):
-        '''Game logic with double manche'''
+    def _draw_manche(self) -> None:
+        '''Disegna scacchiera e HUD della manche e prepara i rettangoli sporchi'''
+        inizio = time.perf_counter()
+        # Creazione gruppo elementi di HUD
+        self._hud = pygame.sprite.Group()
+        self._h_turno = HudTurno(self)
+        self._h_mosse = HudMosseOrso(self)
+        self._h_msg = HudMessaggi(self)    
+        self._hud.add(self._h_turno)
+        self._hud.add(self._h_mosse)
+        self._hud.add(self._h_msg)       
+        # Rendering a rettangoli sporchi: lo sfondo (scacchiera e pannello
+        # uscita) è disegnato una sola volta, poi ad ogni frame vengono
+        # ridisegnate solo caselle e pannelli HUD cambiati
+        if getattr(self, '_dirty', None) is not None:
+            # Le caselle sono condivise: le stacca dal gruppo della manche precedente
+            self._dirty.empty()
+        # Sfondo grande quanto la tela, nel formato dello schermo
+        self._sfondo = pygame.Surface(self.screen.get_size()).convert()
+        self._sfondo.fill(BLACK)
+        self._sfondo.blit(self.BOARD_IMG, LAYOUT.point((0, 0)))
+        self._sfondo.blit(self.USCITA_IMG, LAYOUT.point((1042, 483)))
+        self.USCITA_RECT = self.USCITA_IMG.get_rect(center=LAYOUT.point(OrsoPyGame.USCITA_CENTER))
+        self._dirty = pygame.sprite.LayeredDirty(self._lista_caselle.sprites(), self._hud.sprites())
+        if self.profiler.enabled:
+            # Pannello del profiler sopra a tutto (se visibile)
+            self._dirty.add(self.profiler.overlay)
+        self._dirty.clear(self.screen, self._sfondo)
+        # Sempre aggiornamento per rettangoli, mai ridisegno completo
+        self._dirty.set_timing_threshold(float('inf'))
+        for sprite in self._dirty:
+            sprite.dirty = 1
+        # Le caselle ricaricano l'immagine (anche dopo un cambio di scala)
+        for casella in self._lista_caselle:
+            casella._chiave = None
+        self._versione_vista = None
+        self.screen.blit(self._sfondo, (0, 0))
+        pygame.display.update()
+        self.profiler.section(SCENE_MANCHE, 'sfondo', inizio)
+
+    def new_game(self,
+                 first_manche_as_bear: bool,
+                 against_computer: bool,
+                 posizioni_iniziali_classiche: bool,
+                 livello_esperto: bool = False) -> None:
+        '''Prepara una nuova partita a due manches con i parametri scelti nel menu'''
         self.player_A = GamePlayer("      Tu       ", True, not first_manche_as_bear)
         self.player_B = GamePlayer("    Amico    ", against_computer, first_manche_as_bear)
         if against_computer:
             self.player_B.name = " Computer "
-        if first_manche_as_bear:
-            self.player_B.is_hunter = True
-            self.player_A.is_hunter = False
-        else:            
-            self.player_B.is_hunter = False
-            self.player_A.is_hunter = True
-        # Inizializzazioni
-        self._running = True
-        self._pos_call = (0, 0)
-        # Game loop
+        self._against_computer = against_computer
+        self._posizioni_iniziali_classiche = posizioni_iniziali_classiche
+        self._livello_esperto = livello_esperto
+        # Manches concluse nella partita
+        self._manches_giocate = 0
+
+    def _draw_scoreboard(self, titolo: str) -> None:
+        '''Schermata con titolo, ruoli e mosse da orso dei due giocatori'''
         # Disegna la scacchiera
-        self.screen.blit(self.BOARD_IMG, (0, 0))
-        self.screen.blit(self.PBG_LOGO, (0, 0))
+        self.screen.blit(self.BOARD_IMG, LAYOUT.point((0, 0)))
+        self.screen.blit(self.PBG_LOGO, LAYOUT.point((0, 0)))
         # HUD situazione turni e punteggi
         self._hud = pygame.sprite.Group()
-        self._h_msg = HudGioco(self.screen, "      Prima manche      ")
+        self._h_msg = HudGioco(self.screen, titolo)
         self._h_m_pA = HudTurnoMancheGiocatore(417,250,self.screen, self.player_A)
         self._h_t_pA = HudMosseOrsoMancheGiocatore(417,417,self.screen, self.player_A)
-        self._h_m_pB = HudTurnoMancheGiocatore(708,250,self.screen, self.player_B)        
-        self._h_t_pB = HudMosseOrsoMancheGiocatore(708,417,self.screen, self.player_B)       
+        self._h_m_pB = HudTurnoMancheGiocatore(708,250,self.screen, self.player_B)
+        self._h_t_pB = HudMosseOrsoMancheGiocatore(708,417,self.screen, self.player_B)
         self._hud.add(self._h_msg)
         self._hud.add(self._h_t_pA)
         self._hud.add(self._h_t_pB)
         self._hud.add(self._h_m_pA)
         self._hud.add(self._h_m_pB)
-        self.clock.tick(60)
         # Aggiorna pannello messaggi
         self._hud.update()
         self._hud.draw(self.screen)
         pygame.display.update()
-        await asyncio.sleep(5)            
-        # Logica due manches
-        bear_moves = await self.manche(
-                first_manche_as_bear,
-                against_computer, 
-                posizioni_iniziali_classiche)
-        if first_manche_as_bear:
-            self.player_A.bear_moves = bear_moves
+
+    async def intro(self) -> str:
+        '''Presentazione della prossima manche'''
+        if self._manches_giocate == 0:
+            self._draw_scoreboard("      Prima manche      ")
         else:
-            self.player_B.bear_moves = bear_moves
-        self.player_B.is_hunter = not self.player_B.is_hunter
-        self.player_A.is_hunter = not self.player_A.is_hunter
-        # Disegna la scacchiera
-        self.screen.blit(self.BOARD_IMG, (0, 0))
-        self.screen.blit(self.PBG_LOGO, (0, 0))
-        # HUD situazione turni e punteggi
-        self._hud = pygame.sprite.Group()
-        self._h_msg = HudGioco(self.screen, "    Seconda manche    ")
-        self._h_m_pA = HudTurnoMancheGiocatore(417,250,self.screen, self.player_A)
-        self._h_t_pA = HudMosseOrsoMancheGiocatore(417,417,self.screen, self.player_A)
-        self._h_m_pB = HudTurnoMancheGiocatore(708,250,self.screen, self.player_B)        
-        self._h_t_pB = HudMosseOrsoMancheGiocatore(708,417,self.screen, self.player_B)       
-        self._hud.add(self._h_msg)
-        self._hud.add(self._h_t_pA)
-        self._hud.add(self._h_t_pB)
-        self._hud.add(self._h_m_pA)
-        self._hud.add(self._h_m_pB)
-        # Aggiorna pannello messaggi
-        self._hud.update()
-        self._hud.draw(self.screen)
-        pygame.display.update()
+            self._draw_scoreboard("    Seconda manche    ")
         await asyncio.sleep(5)
+        return SCENE_MANCHE
+
+    async def play_manche(self) -> str:
+        '''Gioca una manche della partita e registra le mosse dell'orso'''
         bear_moves = await self.manche(
-                not first_manche_as_bear,
-                against_computer, 
-                posizioni_iniziali_classiche)            
-        if not first_manche_as_bear:
-            self.player_A.bear_moves = bear_moves
-        else:
-            self.player_B.bear_moves = bear_moves
+                not self.player_A.is_hunter,
+                self._against_computer,
+                self._posizioni_iniziali_classiche,
+                self._livello_esperto)
+        if bear_moves is None:
+            # Manche abbandonata
+            return SCENE_MENU
+        orso = self.player_B if self.player_A.is_hunter else self.player_A
+        orso.bear_moves = bear_moves
+        # I giocatori AI sono creati a ogni manche: il conteggio della
+        # partita si accumula sul computer
+        self.player_B.ai_fallbacks += self.una_manche.get_ai_fallbacks()
+        self._manches_giocate += 1
+        if self._manches_giocate == 1:
+            # Scambio dei ruoli per la seconda manche
+            self.player_B.is_hunter = not self.player_B.is_hunter
+            self.player_A.is_hunter = not self.player_A.is_hunter
+            return SCENE_INTRO
+        return SCENE_RESULTS
+
+    async def results(self) -> str:
+        '''Esito della partita dopo la seconda manche'''
         if self.player_A.bear_moves > self.player_B.bear_moves:
             self.winner = "  Bravo! Hai vinto!  "
         elif self.player_B.bear_moves > self.player_A.bear_moves:
             self.winner = " Hai perso... Riprova "
         else:
             self.winner = "E' un pareggio! Bravi!"
-        self.screen.blit(self.BOARD_IMG, (0, 0))
-        self.screen.blit(self.PBG_LOGO, (0, 0))
-        self._hud = pygame.sprite.Group()
-        self._h_msg = HudGioco(self.screen, "Fine seconda manche")
-        self._h_m_pA = HudTurnoMancheGiocatore(417,250,self.screen, self.player_A)
-        self._h_t_pA = HudMosseOrsoMancheGiocatore(417,417,self.screen, self.player_A)
-        self._h_m_pB = HudTurnoMancheGiocatore(708,250,self.screen, self.player_B)        
-        self._h_t_pB = HudMosseOrsoMancheGiocatore(708,417,self.screen, self.player_B)       
-        self._hud.add(self._h_msg)
-        self._hud.add(self._h_t_pA)
-        self._hud.add(self._h_t_pB)
-        self._hud.add(self._h_m_pA)
-        self._hud.add(self._h_m_pB)
-        self._h_msg.msg = self.winner
-        # Aggiorna pannello messaggi
-        self._hud.update()
-        self._hud.draw(self.screen)         
-        pygame.display.update()
+        if self.player_B.ai_fallbacks:
+            print("Stati stimati dall'AI nella partita (assenti dalle policy):",
+                  self.player_B.ai_fallbacks)
+        self._draw_scoreboard(self.winner)
         await asyncio.sleep(8)
-        await self.menu()
+        return SCENE_MENU
 
 
 # Classi opzioni di menu
@@ -939,34 +1260,33 @@ class OpzioneMenu(pygame.sprite.Sprite):
     - gioco orso
     - posizione del pannello di sfondo
     '''
-    PANNELLO_UNO_IMG = scale_img(get_img('img/buttonLong.png')) #panel
+    PANNELLO_UNO_IMG = ImageAsset('img/buttonLong.png', group=ASSETS_MENU) #panel
     def __init__(self, opzioni: dict, default_value: object, game: OrsoPyGame, position: tuple):
         super().__init__()
         self.game = game
-        self.LOBSTER_30 = pygame.font.Font('LobsterTwo-Regular.otf',25)
+        self.LOBSTER_30 = get_font(25)
         # Iniziano i cacciatori è il default
         self.value = default_value
         self.opzioni = opzioni
         self.position = position
-        self._text = self.LOBSTER_30.render(
+        self._render()
+
+    def _render(self):
+        '''Rende la voce del valore corrente'''
+        self._shown = self.value
+        self._text = render_text(
+            self.LOBSTER_30,
             self.opzioni[self.value], 
             1, 
             BLACK)
-        self.rect = self._text.get_rect()
-        self.rect.x = self.position[0]+20
-        self.rect.y = self.position[1]+25
+        self.rect = self._text.get_rect(topleft=LAYOUT.point((self.position[0]+20, self.position[1]+25)))
         self.image = self._text
 
     def update(self):
-        self.game.screen.blit(OpzioneMenu.PANNELLO_UNO_IMG, self.position)
-        self._text = self.LOBSTER_30.render(
-            self.opzioni[self.value], 
-            1, 
-            BLACK)
-        self.rect = self._text.get_rect()
-        self.rect.x = self.position[0]+20
-        self.rect.y = self.position[1]+25        
-        self.image = self._text
+        self.game.screen.blit(OpzioneMenu.PANNELLO_UNO_IMG, LAYOUT.point(self.position))
+        # Nuovo testo solo se il valore è cambiato
+        if self.value != self._shown:
+            self._render()
 
     def action(self):
         raise NotImplementedError("Action must be implemented by child class")
@@ -986,6 +1306,12 @@ class OpzioneMenuFirstMancheAsBear(OpzioneMenu):
     async def action(self):
         self.value = not(self.value)        
 
+
+class OpzioneMenuDifficolta(OpzioneMenu):
+    async def action(self):
+        self.value = not(self.value)
+
+
 class OpzioneMenuPlayerType(OpzioneMenu):
     async def action(self):
         self.value += 10
@@ -1005,20 +1331,18 @@ class OpzioneMenuUscita(pygame.sprite.Sprite):
     def __init__(self, game: OrsoPyGame):
         super().__init__()
         self.game = game
-        self.ESCI_GIOCO = scale_img(get_img('img/buttonLong.png'))
-        self.LOBSTER_45 = pygame.font.Font('LobsterTwo-Regular.otf',37)
-        self._esci_str = self.LOBSTER_45.render("Esci dal gioco", 1, BLACK)
-        self.rect = self._esci_str.get_rect()
-        self.rect.x = 142
-        self.rect.y = 575
+        self.ESCI_GIOCO = get_scaled_img('img/buttonLong.png')
+        self.LOBSTER_45 = get_font(37)
+        self._esci_str = render_text(self.LOBSTER_45, "Esci dal gioco", 1, BLACK)
+        self.rect = self._esci_str.get_rect(topleft=LAYOUT.point((142, 575)))
 
     def update(self):
-        self.game.screen.blit(self.ESCI_GIOCO, (83, 567))
+        self.game.screen.blit(self.ESCI_GIOCO, LAYOUT.point((83, 567)))
         self.image = self._esci_str
 
     async def action(self):
         self.game._running = False
-        await self.game.quit()
+        self.game._next_scene = SCENE_QUIT
     
 
 class OpzioneMenuInizioGioco(pygame.sprite.Sprite):
@@ -1026,93 +1350,100 @@ class OpzioneMenuInizioGioco(pygame.sprite.Sprite):
     def __init__(self, game: OrsoPyGame):
         super().__init__()
         self.game = game
-        self.INIZIA = scale_img(get_img('img/buttonLong.png'))
-        self.LOBSTER_45 = pygame.font.Font('LobsterTwo-Regular.otf',37)
-        self._inizia_str = self.LOBSTER_45.render("  Inizia a giocare", 1, BLACK)
-        self.rect = self._inizia_str.get_rect()
-        self.rect.x = 950
-        self.rect.y = 575
+        self.INIZIA = get_scaled_img('img/buttonLong.png')
+        self.LOBSTER_45 = get_font(37)
+        self._inizia_str = render_text(self.LOBSTER_45, "  Inizia a giocare", 1, BLACK)
+        self.rect = self._inizia_str.get_rect(topleft=LAYOUT.point((950, 575)))
 
 
     def update(self):
-        self.game.screen.blit(self.INIZIA, (917, 567))
+        self.game.screen.blit(self.INIZIA, LAYOUT.point((917, 567)))
         self.image = self._inizia_str
 
     async def action(self):
         self.game._running = False
         await asyncio.sleep(0.8)
         # fade out menu music
-        if MUSIC:
-            pygame.mixer.music.fadeout(800)
-        # Richiamo del gioco con i parametri scelti
-        await self.game.game(
+        self.game.audio.fadeout_music(800)
+        # Nuova partita con i parametri scelti
+        self.game.new_game(
             self.game._m_first_manche.value, #Human orso nella prima manche
             self.game._m_pl_mode.value, #Contro computer
-            self.game._m_pos_iniziali.value #Disposizione iniziale classica
+            self.game._m_pos_iniziali.value, #Disposizione iniziale classica
+            self.game._m_difficolta.value #Computer di livello esperto
         )
+        self.game._next_scene = SCENE_INTRO
   
 
 # Classi HUD di gioco
-class HudTurno(pygame.sprite.Sprite):
-    '''HUD: pannello per il turno'''
-    ORSO_IDLE_IMG = scale_img(get_img('img/little-bear-idle.png'))
-    TRE_CACCIATORI_IMG = scale_img(get_img('img/TreCacciatoriTurno.png'))
+class HudTurno(pygame.sprite.DirtySprite):
+    '''HUD: pannello per il turno, ridisegnato solo al cambio di turno'''
+    ORSO_IDLE_IMG = ImageAsset('img/little-bear-idle.png', sprite=True)
+    TRE_CACCIATORI_IMG = ImageAsset('img/TreCacciatoriTurno.png')
     
-    PANNELLO_DUE_IMG = scale_img(get_img('img/panel.png')) #panel_due
+    PANNELLO_DUE_IMG = ImageAsset('img/panel.png') #panel_due
  
     def __init__(self, game: OrsoPyGame):
         super().__init__()
         self.game = game
-        self.LOBSTER_45 = pygame.font.Font('LobsterTwo-Regular.otf',37)
-        self._turno_str = self.LOBSTER_45.render("Turno", 1, BLACK)
+        self.LOBSTER_45 = get_font(37)
+        self._turno_str = render_text(self.LOBSTER_45, "Turno", 1, BLACK)
+        self._shown = None
+        self.update()
 
     def update(self): 
-        # Inizializzazione Pannello turno, parte fissa
-        self.game.screen.blit(HudTurno.PANNELLO_DUE_IMG, (1042, 67))        
-        self.game.screen.blit(self._turno_str, (1083, 75))          
-        if self.game.una_manche._is_hunter_turn:
-            self.rect = HudTurno.TRE_CACCIATORI_IMG.get_rect()
-            self.rect.x = 1054
-            self.rect.y = 133
-            self.image = HudTurno.TRE_CACCIATORI_IMG
+        if self.game.una_manche._is_hunter_turn == self._shown:
+            return
+        self._shown = self.game.una_manche._is_hunter_turn
+        # Pannello turno: parte fissa più il giocatore di turno
+        if self._shown:
+            turno = (HudTurno.TRE_CACCIATORI_IMG, (1054, 133))
         else:
-            self.rect = HudTurno.ORSO_IDLE_IMG.get_rect()
-            self.rect.x = 1100
-            self.rect.y = 133
-            self.image = HudTurno.ORSO_IDLE_IMG
+            turno = (HudTurno.ORSO_IDLE_IMG, (1100, 133))
+        self.image, self.rect = compose_layers([
+            (HudTurno.PANNELLO_DUE_IMG, (1042, 67)),
+            (self._turno_str, (1083, 75)),
+            turno])
+        self.dirty = 1
 
 
 
-class HudMosseOrso(pygame.sprite.Sprite):
-    '''HUD: pannello per il contatore mosse orso'''
-    PANNELLO_DUE_IMG = scale_img(get_img('img/panel.png')) #panel_due
+class HudMosseOrso(pygame.sprite.DirtySprite):
+    '''HUD: pannello per il contatore mosse orso, ridisegnato solo quando l'orso muove'''
+    PANNELLO_DUE_IMG = ImageAsset('img/panel.png') #panel_due
 
     def __init__(self, game: OrsoPyGame):
         super().__init__()
         self.game = game
-        self.LOBSTER_45 = pygame.font.Font('LobsterTwo-Regular.otf',37)
-        self.LOBSTER_90 = pygame.font.Font('LobsterTwo-Regular.otf',75)
+        self.LOBSTER_45 = get_font(37)
+        self.LOBSTER_90 = get_font(75)
         # Pannello mosse orso
-        self._mosse_str = self.LOBSTER_45.render("Mosse orso", 1, BLACK)     
+        self._mosse_str = render_text(self.LOBSTER_45, "Mosse orso", 1, BLACK)     
+        self._shown = None
+        self.update()
             
     def update(self):
-        self._mosse = self.LOBSTER_90.render(str(self.game.una_manche.get_bear_moves()), 1, BLACK)       
-        self.game.screen.blit(HudMosseOrso.PANNELLO_DUE_IMG, (67, 67))  
-        self.game.screen.blit(self._mosse_str, (75, 75))  
-        self.rect = self._mosse.get_rect()
-        self.rect.x = 121
-        self.rect.y = 117
-        self.image = self._mosse
+        # Nuovo numero solo quando l'orso ha mosso
+        bear_moves = self.game.una_manche.get_bear_moves()
+        if bear_moves == self._shown:
+            return
+        self._shown = bear_moves
+        self._mosse = render_text(self.LOBSTER_90, str(bear_moves), 1, BLACK)       
+        self.image, self.rect = compose_layers([
+            (HudMosseOrso.PANNELLO_DUE_IMG, (67, 67)),
+            (self._mosse_str, (75, 75)),
+            (self._mosse, (121, 117))])
+        self.dirty = 1
 
 
 
 #########################################
 class HudTurnoMancheGiocatore(pygame.sprite.Sprite):
     '''HUD: pannello per il turno del giocatore'''
-    ORSO_IMG = scale_img(get_img('img/little-bear-sel.png'))
-    TRE_CACCIATORI_IMG = scale_img(get_img('img/TreCacciatoriTurno.png'))
+    ORSO_IMG = ImageAsset('img/little-bear-sel.png', sprite=True)
+    TRE_CACCIATORI_IMG = ImageAsset('img/TreCacciatoriTurno.png')
     
-    PANNELLO_DUE_IMG = scale_img(get_img('img/panel.png')) #panel_due
+    PANNELLO_DUE_IMG = ImageAsset('img/panel.png') #panel_due
  
     def __init__(self, x, y, screen, giocatore: GamePlayer):
         super().__init__()
@@ -1120,28 +1451,30 @@ class HudTurnoMancheGiocatore(pygame.sprite.Sprite):
         self.y = y
         self.screen = screen
         self.giocatore = giocatore
-        self.LOBSTER_45 = pygame.font.Font('LobsterTwo-Regular.otf',37)
+        self.LOBSTER_45 = get_font(37)
 
-        self._turno_str = self.LOBSTER_45.render(f"{self.giocatore.name}", 1, BLACK)
+        self._turno_str = render_text(self.LOBSTER_45, f"{self.giocatore.name}", 1, BLACK)
+        self._shown = None
 
     def update(self): 
         # Inizializzazione Pannello turno, parte fissa
-        self.screen.blit(HudTurnoMancheGiocatore.PANNELLO_DUE_IMG, (self.x, self.y))        
-        self.screen.blit(self._turno_str, (self.x + 10, self.y + 10))          
-        if self.giocatore.is_hunter:
-            self.rect = HudTurnoMancheGiocatore.TRE_CACCIATORI_IMG.get_rect()
-            self.rect.x = self.x + 15
-            self.rect.y = self.y + 80
+        self.screen.blit(HudTurnoMancheGiocatore.PANNELLO_DUE_IMG, LAYOUT.point((self.x, self.y)))
+        self.screen.blit(self._turno_str, LAYOUT.point((self.x + 10, self.y + 10)))
+        if self.giocatore.is_hunter == self._shown:
+            return
+        self._shown = self.giocatore.is_hunter
+        if self._shown:
+            self.rect = HudTurnoMancheGiocatore.TRE_CACCIATORI_IMG.get_rect(
+                topleft=LAYOUT.point((self.x + 15, self.y + 80)))
             self.image = HudTurnoMancheGiocatore.TRE_CACCIATORI_IMG
         else:
-            self.rect = HudTurnoMancheGiocatore.ORSO_IMG.get_rect()
-            self.rect.x = self.x + 70
-            self.rect.y = self.y + 80
+            self.rect = HudTurnoMancheGiocatore.ORSO_IMG.get_rect(
+                topleft=LAYOUT.point((self.x + 70, self.y + 80)))
             self.image = HudTurnoMancheGiocatore.ORSO_IMG
 
 class HudMosseOrsoMancheGiocatore(pygame.sprite.Sprite):
     '''HUD: pannello per il numero mosse orso del giocatore'''
-    PANNELLO_DUE_IMG = scale_img(get_img('img/panel.png')) #panel_due
+    PANNELLO_DUE_IMG = ImageAsset('img/panel.png') #panel_due
 
     def __init__(self, x, y, screen, giocatore: GamePlayer):
         super().__init__()
@@ -1149,187 +1482,138 @@ class HudMosseOrsoMancheGiocatore(pygame.sprite.Sprite):
         self.y = y
         self.screen = screen
         self.giocatore = giocatore        
-        self.LOBSTER_45 = pygame.font.Font('LobsterTwo-Regular.otf',37)
-        self.LOBSTER_90 = pygame.font.Font('LobsterTwo-Regular.otf',75)
+        self.LOBSTER_45 = get_font(37)
+        self.LOBSTER_90 = get_font(75)
         # Pannello mosse orso
-        self._mosse_str = self.LOBSTER_45.render("Mosse orso", 1, BLACK)     
+        self._mosse_str = render_text(self.LOBSTER_45, "Mosse orso", 1, BLACK)     
+        self._shown = None
             
     def update(self):
+        self.screen.blit(HudMosseOrsoMancheGiocatore.PANNELLO_DUE_IMG, LAYOUT.point((self.x, self.y)))
+        self.screen.blit(self._mosse_str, LAYOUT.point((self.x + 10, self.y + 10)))
+        if self.giocatore.bear_moves == self._shown:
+            return
+        self._shown = self.giocatore.bear_moves
         # Se non ha ancora giocato come orso
         mosse = " - "
         colore = BLACK
         if self.giocatore.bear_moves > 0:
             mosse = str(self.giocatore.bear_moves)
             colore = RED
-        self._mosse = self.LOBSTER_90.render(mosse, 1, colore)
-        self.screen.blit(HudMosseOrsoMancheGiocatore.PANNELLO_DUE_IMG, (self.x, self.y))  
-        self.screen.blit(self._mosse_str, (self.x + 10, self.y + 10))  
-        self.rect = self._mosse.get_rect()
-        self.rect.x = self.x + 65
-        self.rect.y = self.y + 60
+        self._mosse = render_text(self.LOBSTER_90, mosse, 1, colore)
+        self.rect = self._mosse.get_rect(topleft=LAYOUT.point((self.x + 65, self.y + 60)))
         self.image = self._mosse
  
 
 class HudGioco(pygame.sprite.Sprite):
     '''HUD: pannello per i messaggi'''    
-    PANNELLO_UNO_IMG = scale_img(get_img('img/buttonLong.png')) #panel
+    PANNELLO_UNO_IMG = ImageAsset('img/buttonLong.png') #panel
 
     def __init__(self, screen, msg):
         super().__init__()
         self.screen = screen
         self.msg = msg
-        self.LOBSTER_45 = pygame.font.Font('LobsterTwo-Regular.otf',37)
+        self.LOBSTER_45 = get_font(37)
+        self._shown = None
 
     def update(self):
-        self._text = self.LOBSTER_45.render(self.msg, 1, BLACK)
-        self.screen.blit(HudGioco.PANNELLO_UNO_IMG, (483,125))
-        self.rect = self._text.get_rect()
-        self.rect.x = 492
-        self.rect.y = 133
+        self.screen.blit(HudGioco.PANNELLO_UNO_IMG, LAYOUT.point((483,125)))
+        if self.msg == self._shown:
+            return
+        self._shown = self.msg
+        self._text = render_text(self.LOBSTER_45, self.msg, 1, BLACK)
+        self.rect = self._text.get_rect(topleft=LAYOUT.point((492, 133)))
         self.image = self._text
 
 #########################################
-class HudMessaggi(pygame.sprite.Sprite):
-    '''HUD: pannello per i messaggi'''    
-    PANNELLO_UNO_IMG = scale_img(get_img('img/buttonLong.png')) #panel
+class HudMessaggi(pygame.sprite.DirtySprite):
+    '''HUD: pannello per i messaggi, ridisegnato solo quando il messaggio cambia'''    
+    PANNELLO_UNO_IMG = ImageAsset('img/buttonLong.png') #panel
 
     def __init__(self, game: OrsoPyGame):
         super().__init__()
         self.game = game
-        self.LOBSTER_30 = pygame.font.Font('LobsterTwo-Regular.otf',25)
+        self.LOBSTER_30 = get_font(25)
+        self._shown = None
+        self.update()
 
     def update(self):
-        self._text = self.LOBSTER_30.render(self.game._msg, 1, BLACK)
-        self.game.screen.blit(self.PANNELLO_UNO_IMG, (33, 567))
-        self.rect = self._text.get_rect()
-        self.rect.x = 42
-        self.rect.y = 587
-        self.image = self._text
-
-
-class CasellaGiocoOrso(pygame.sprite.Sprite):
+        # Nuovo testo solo quando il messaggio cambia
+        if self.game._msg == self._shown:
+            return
+        self._shown = self.game._msg
+        self._text = render_text(self.LOBSTER_30, self.game._msg, 1, BLACK)
+        self.image, self.rect = compose_layers([
+            (self.PANNELLO_UNO_IMG, (33, 567)),
+            (self._text, (42, 587))])
+        self.dirty = 1
+
+
+class CasellaGiocoOrso(pygame.sprite.DirtySprite):
     '''
     Oggetto casella del gioco
-    Gestisce la visualizzazione di personaggi e orme
+    Gestisce la visualizzazione di personaggi e orme;
+    è ridisegnata solo quando cambia la sua immagine
     '''
     # Static resources
-    TRASPARENTE = pygame.Surface((80,80), pygame.SRCALPHA)
+    TRASPARENTE = BlankAsset((OrsoPyGame.DIM_CASELLA, OrsoPyGame.DIM_CASELLA))
 
-    ORSO_IMG = scale_img(get_img('img/little-bear.png'))
-    ORSO_IDLE_IMG = scale_img(get_img('img/little-bear-idle.png'))
-    ORSO_SEL_IMG = scale_img(get_img('img/little-bear-sel.png'))
+    ORSO_IMG = ImageAsset('img/little-bear.png', sprite=True)
+    ORSO_IDLE_IMG = ImageAsset('img/little-bear-idle.png', sprite=True)
+    ORSO_SEL_IMG = ImageAsset('img/little-bear-sel.png', sprite=True)
 
-    CACCIATORE_UNO_IMG = scale_img(get_img('img/little-hunter1.png'))
-    CACCIATORE_UNO_IDLE_IMG = scale_img(get_img('img/little-hunter1-idle.png'))
-    CACCIATORE_UNO_SEL_IMG = scale_img(get_img('img/little-hunter1-sel.png'))
+    CACCIATORE_UNO_IMG = ImageAsset('img/little-hunter1.png', sprite=True)
+    CACCIATORE_UNO_IDLE_IMG = ImageAsset('img/little-hunter1-idle.png', sprite=True)
+    CACCIATORE_UNO_SEL_IMG = ImageAsset('img/little-hunter1-sel.png', sprite=True)
 
-    CACCIATORE_DUE_IMG = scale_img(get_img('img/little-hunter2.png'))
-    CACCIATORE_DUE_IDLE_IMG = scale_img(get_img('img/little-hunter2-idle.png'))
-    CACCIATORE_DUE_SEL_IMG = scale_img(get_img('img/little-hunter2-sel.png'))
+    CACCIATORE_DUE_IMG = ImageAsset('img/little-hunter2.png', sprite=True)
+    CACCIATORE_DUE_IDLE_IMG = ImageAsset('img/little-hunter2-idle.png', sprite=True)
+    CACCIATORE_DUE_SEL_IMG = ImageAsset('img/little-hunter2-sel.png', sprite=True)
 
-    CACCIATORE_TRE_IMG = scale_img(get_img('img/little-hunter3.png'))
-    CACCIATORE_TRE_IDLE_IMG = scale_img(get_img('img/little-hunter3-idle.png'))
-    CACCIATORE_TRE_SEL_IMG = scale_img(get_img('img/little-hunter3-sel.png'))
+    CACCIATORE_TRE_IMG = ImageAsset('img/little-hunter3.png', sprite=True)
+    CACCIATORE_TRE_IDLE_IMG = ImageAsset('img/little-hunter3-idle.png', sprite=True)
+    CACCIATORE_TRE_SEL_IMG = ImageAsset('img/little-hunter3-sel.png', sprite=True)
         
     # Orme
-    ORMA_ORSO_IMG = scale_img(get_img('img/impronta_orso.png'))
-    ORMA_CACCIATORE_IMG = scale_img(get_img('img/impronta_cacciatore.png'))
+    ORMA_ORSO_IMG = ImageAsset('img/impronta_orso.png', sprite=True)
+    ORMA_CACCIATORE_IMG = ImageAsset('img/impronta_cacciatore.png', sprite=True)
+
+    # Immagine per ogni chiave (simbolo, variante) della vista della manche;
+    # le caselle vuote usano TRASPARENTE
+    IMMAGINI = {
+        (BOARD_BEAR, CELL_FOOTPRINT): ORMA_ORSO_IMG,
+        (BOARD_HUNTER_POLICY, CELL_FOOTPRINT): ORMA_CACCIATORE_IMG,
+        (BOARD_BEAR, CELL_BASE): ORSO_IMG,
+        (BOARD_BEAR, CELL_SELECTED): ORSO_SEL_IMG,
+        (BOARD_HUNTER_1, CELL_BASE): CACCIATORE_UNO_IMG,
+        (BOARD_HUNTER_1, CELL_IDLE): CACCIATORE_UNO_IDLE_IMG,
+        (BOARD_HUNTER_1, CELL_SELECTED): CACCIATORE_UNO_SEL_IMG,
+        (BOARD_HUNTER_2, CELL_BASE): CACCIATORE_DUE_IMG,
+        (BOARD_HUNTER_2, CELL_IDLE): CACCIATORE_DUE_IDLE_IMG,
+        (BOARD_HUNTER_2, CELL_SELECTED): CACCIATORE_DUE_SEL_IMG,
+        (BOARD_HUNTER_3, CELL_BASE): CACCIATORE_TRE_IMG,
+        (BOARD_HUNTER_3, CELL_IDLE): CACCIATORE_TRE_IDLE_IMG,
+        (BOARD_HUNTER_3, CELL_SELECTED): CACCIATORE_TRE_SEL_IMG,
+    }
 
     def __init__(self, position: int, game: OrsoPyGame):
         super().__init__()
         self.position = position
         self.game = game
+        self.image = CasellaGiocoOrso.TRASPARENTE
+        self._chiave = None
 
     def update(self):
-        '''Valorizza l'attributo image dello sprite'''
-        # Disegna la pedine ottenendo la board dall'oggetto gioco
-        bb = self.game.una_manche
-        if bb.get_board_position(self.position) == BOARD_EMPTY:
-            # Controllo se è orma
-            is_orma, tipo_orma  = bb.is_footprint_and_type(self.position)            
-            if is_orma:
-                if tipo_orma == 'HUNTER':
-                    self.image = CasellaGiocoOrso.ORMA_CACCIATORE_IMG
-                else:
-                    self.image = CasellaGiocoOrso.ORMA_ORSO_IMG                    
-            else:
-                self.image = CasellaGiocoOrso.TRASPARENTE
-        # Verifica se è orso
-        elif bb.get_board_position(self.position) == BOARD_BEAR:            
-            if not bb.is_hunter_turn():
-                self.image = CasellaGiocoOrso.ORSO_SEL_IMG
-            else:
-                self.image = CasellaGiocoOrso.ORSO_IMG
-        # Verifica se è uno dei cacciatori
-        elif bb.get_board_position(self.position) == BOARD_HUNTER_1:
-            if (bb.get_hunter_starting_pos() == self.position):
-                self.image = CasellaGiocoOrso.CACCIATORE_UNO_SEL_IMG
-            else:
-                if bb.is_hunter_turn():
-                    self.image = CasellaGiocoOrso.CACCIATORE_UNO_IMG
-                else:
-                    self.image = CasellaGiocoOrso.CACCIATORE_UNO_IDLE_IMG
-        elif bb.get_board_position(self.position) == BOARD_HUNTER_2:
-            if (bb.get_hunter_starting_pos() == self.position):
-                self.image = CasellaGiocoOrso.CACCIATORE_DUE_SEL_IMG
-            else:
-                if bb.is_hunter_turn():
-                    self.image = CasellaGiocoOrso.CACCIATORE_DUE_IMG
-                else:
-                    self.image = CasellaGiocoOrso.CACCIATORE_DUE_IDLE_IMG
-        elif bb.get_board_position(self.position) == BOARD_HUNTER_3:
-            if (bb.get_hunter_starting_pos() == self.position):
-                self.image = CasellaGiocoOrso.CACCIATORE_TRE_SEL_IMG
-            else:
-                if bb.is_hunter_turn():
-                    self.image = CasellaGiocoOrso.CACCIATORE_TRE_IMG
-                else:
-                    self.image = CasellaGiocoOrso.CACCIATORE_TRE_IDLE_IMG
-
-
-class Player:
-    def __init__(self, name):
-        self.name = name
-        self.states_value = {}  # state -> value
-
-    def get_action(self, actions, current_board: BearGameManche) -> tuple[int, int]:
-        '''Return the action to take as tuple (startpos, endpos)
-        Now the ai player can choose randomically from all best moves
         '''
-        value_max = -INFINITY
-        best_actions = []
-        for act in actions:
-            current_board.move_player(act[0], act[1])
-            state_value = self.states_value.get(current_board.get_hash())
-            if (state_value is None):
-                value = 0
-            else:
-                value = state_value
-
-            if value > value_max:
-                value_max = value
-                best_actions = [act]
-            elif value == value_max:
-                best_actions.append(act)                
-
-            current_board.undo_move()
-        return random.choice(best_actions)
-
-    def print_value(self, board) -> None:
-        print(
-            f"{self.name}: {board.get_hash()} -> "
-            f"{self.states_value.get(board.get_hash())}"
-        )
-
-    def load_policy(self, file) -> None:
-        '''Load file with policy for reinforcement learning'''
-        with open(file, 'rb') as file_read:
-            data = pickle.load(file_read)
-        # Policies are in states_value key
-        self.states_value = (
-            data if 'states_value' not in data else  # data legacy support
-            data['states_value']
-        )
+        Valorizza l'attributo image dello sprite dalla vista della manche,
+        segnandolo come sporco solo se la chiave dell'immagine è cambiata
+        '''
+        chiave = self.game.una_manche.get_view()[1][self.position]
+        if chiave != self._chiave:
+            self._chiave = chiave
+            immagine = CasellaGiocoOrso.IMMAGINI.get(chiave)
+            self.image = CasellaGiocoOrso.TRASPARENTE if immagine is None else immagine.get()
+            self.dirty = 1
 
 
 async def main():
@@ -1338,7 +1622,16 @@ async def main():
     Il gioco è richiamato da menu
     '''
     opg = OrsoPyGame()
-    await opg.menu()
+    # Policy, immagini della manche e audio vengono caricati in background
+    # mentre il menu è visibile
+    opg.run_in_background(preload_policies(), "policy")
+    opg.run_in_background(prefetch_image_assets(ASSETS_GAME), "immagini")
+    opg.run_in_background(opg.audio.preload(), "audio")
+    # Ciclo delle scene: lo stack non cresce partita dopo partita
+    scene = SCENE_MENU
+    while scene != SCENE_QUIT:
+        scene = await opg.play_scene(scene)
     await opg.quit()
 
-asyncio.run(main())
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,334 @@
+'''
+Gestione delle policy AI del Gioco dell'Orso.
+Questo modulo è indipendente da PyGame e si occupa di:
+- cache di processo delle policy (ogni file è caricato una sola volta)
+- formato binario compatto delle policy, letto tramite mmap/memoryview
+- conversione dei vecchi file pickle nel formato binario
+- chiavi canoniche rispetto alle simmetrie della scacchiera (vedi symmetry.py)
+
+Formato binario (little endian):
+    header 16 byte: magic b'ORSOPOL1', numero di stati (uint32),
+                    typecode dei valori ('i' int32 o 'd' float64),
+                    flag (uint8, FLAG_CANONICAL), 2 byte liberi
+    chiavi:         numero di stati x uint32, ordinate in modo crescente
+    (padding a 8 byte)
+    valori:         numero di stati x int32/float64, nello stesso ordine
+
+La chiave di uno stato è un intero: bit 0-20 = caselle occupate dai
+cacciatori, bit 21-25 = posizione dell'orso. Con FLAG_CANONICAL il file
+contiene solo le chiavi canoniche (una per classe di stati equivalenti per
+simmetria) e le ricerche canonicalizzano la chiave richiesta; i file
+senza flag (il byte era libero, quindi vale 0) si leggono come prima.
+
+I pickle originali stanno in assets-src/, fuori dai file distribuiti con
+il gioco: sono solo l'ingresso del convertitore, che è l'unico a scrivere
+i file binari letti dal gioco. Conversione da riga di comando:
+    python policy.py assets-src/bear.policy assets-src/hunter.policy
+'''
+
+from __future__ import annotations
+from bisect import bisect_left
+from collections.abc import Mapping
+import array
+import asyncio
+import os
+import pickle
+import struct
+import sys
+
+try:
+    import mmap
+except ImportError:  # pragma: no cover - non tutte le piattaforme lo hanno
+    mmap = None
+
+# Rileva se l'esecuzione avviene in ambiente WebASM (browser)
+IS_WEB = sys.platform == "emscripten"
+
+# ========== FILE DELLE POLICY AI ==========
+POLICY_BASE_PATH = "."
+BEAR_POLICY_FILE = os.path.join(POLICY_BASE_PATH, "bear.policy")
+HUNTER_POLICY_FILE = os.path.join(POLICY_BASE_PATH, "hunter.policy")
+# Pickle da cui sono generati i file binari (non distribuiti con il gioco)
+POLICY_SOURCE_PATH = "assets-src"
+BEAR_POLICY_SOURCE = os.path.join(POLICY_SOURCE_PATH, "bear.policy")
+HUNTER_POLICY_SOURCE = os.path.join(POLICY_SOURCE_PATH, "hunter.policy")
+# Policy ottime generate da solver.py
+BEAR_SOLVED_POLICY_FILE = os.path.join(POLICY_BASE_PATH, "bear_solved.policy.bin")
+HUNTER_SOLVED_POLICY_FILE = os.path.join(POLICY_BASE_PATH, "hunter_solved.policy.bin")
+# Estensione del file binario affiancato al pickle (bear.policy.bin)
+PACKED_EXT = ".bin"
+
+# ========== FORMATO BINARIO ==========
+PACKED_MAGIC = b'ORSOPOL1'
+_HEADER = struct.Struct('<8sIcB2x')
+# Flag dell'header: chiavi canoniche rispetto alle simmetrie della scacchiera
+FLAG_CANONICAL = 1
+
+# Disposizione dei bit nella chiave di stato
+BEAR_SHIFT = 21
+HUNTERS_MASK = (1 << BEAR_SHIFT) - 1
+
+# Scala dei valori: le policy distribuite contano le semimosse residue, con
+# r mosse residue dell'orso la policy dell'orso vale circa 2r+1 e quella
+# dei cacciatori 42-2r
+BEAR_POLICY_OFFSET = 1
+HUNTER_POLICY_OFFSET = 42
+
+# Simboli delle chiavi legacy (stringhe prodotte da BearGameManche.get_hash)
+HASH_BEAR = '2'
+HASH_EMPTY = '_'
+
+
+def pack_hash(board_hash: str) -> int:
+    '''
+    Converte una chiave legacy ('121_1____...') nella chiave intera compatta.
+    Ogni simbolo diverso da orso e casella vuota è un cacciatore.
+    '''
+    key = 0
+    for i, symbol in enumerate(board_hash):
+        if symbol == HASH_BEAR:
+            key |= i << BEAR_SHIFT
+        elif symbol != HASH_EMPTY:
+            key |= 1 << i
+    return key
+
+
+def unpack_key(key: int, positions: int = 21) -> str:
+    '''Operazione inversa di pack_hash: ricostruisce la chiave legacy.'''
+    bear = key >> BEAR_SHIFT
+    return ''.join(
+        HASH_BEAR if i == bear else
+        '1' if key >> i & 1 else
+        HASH_EMPTY
+        for i in range(positions)
+    )
+
+
+class PackedPolicy(Mapping):
+    '''
+    Policy in sola lettura sopra un buffer nel formato binario.
+    Le chiavi sono ordinate, la ricerca è binaria sul memoryview del buffer:
+    nessun dizionario viene costruito in memoria.
+    Se la policy è canonica, get accetta qualsiasi chiave e la riporta alla
+    chiave canonica; iterazione e len riguardano le sole chiavi canoniche.
+    '''
+
+    def __init__(self, buffer) -> None:
+        self._buffer = buffer  # mantiene vivo l'eventuale mmap
+        view = memoryview(buffer)
+        magic, count, typecode, flags = _HEADER.unpack_from(view)
+        if magic != PACKED_MAGIC:
+            raise ValueError("File di policy non riconosciuto")
+        self.canonical = bool(flags & FLAG_CANONICAL)
+        self._canonical_key = None
+        if self.canonical:
+            from symmetry import canonical_key
+            self._canonical_key = canonical_key
+        typecode = typecode.decode('ascii')
+        keys_start = _HEADER.size
+        values_start = _values_offset(count)
+        keys = view[keys_start:keys_start + 4 * count]
+        values = view[values_start:values_start + struct.calcsize(typecode) * count]
+        if sys.byteorder == 'little':
+            self._keys = keys.cast('I')
+            self._values = values.cast(typecode)
+        else:  # pragma: no cover - copia con inversione dei byte
+            self._keys = array.array('I', keys.tobytes())
+            self._keys.byteswap()
+            self._values = array.array(typecode, values.tobytes())
+            self._values.byteswap()
+        self._count = count
+        self._arrays = None
+
+    def get(self, key, default=None):
+        if self._canonical_key is not None:
+            key = self._canonical_key(key)
+        keys = self._keys
+        i = bisect_left(keys, key)
+        if i < self._count and keys[i] == key:
+            return self._values[i]
+        return default
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key) -> bool:
+        return self.get(key) is not None
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def keys_view(self) -> memoryview:
+        '''Vista diretta sull'array ordinato delle chiavi.'''
+        return self._keys
+
+    def values_view(self) -> memoryview:
+        '''Vista diretta sull'array dei valori.'''
+        return self._values
+
+    def arrays(self):
+        '''
+        Chiavi e valori come array NumPy, senza copia del buffer.
+        Richiede numpy, importato solo qui perché il gioco non ne ha bisogno.
+        '''
+        if self._arrays is None:
+            import numpy
+            self._arrays = (
+                numpy.frombuffer(self._keys, dtype=numpy.uint32),
+                numpy.frombuffer(self._values, dtype=self._values.format),
+            )
+        return self._arrays
+
+
+def _values_offset(count: int) -> int:
+    '''Offset dei valori: dopo header e chiavi, allineato a 8 byte.'''
+    end = _HEADER.size + 4 * count
+    return (end + 7) & ~7
+
+
+def pack_policy(states_value, canonical: bool = False) -> bytes:
+    '''
+    Serializza una tabella stato -> valore nel formato binario.
+    Accetta sia chiavi legacy (stringhe) sia chiavi intere.
+    I valori interi restano interi, così le decisioni dell'AI non cambiano.
+    Con canonical=True salva solo le chiavi canoniche (symmetry.canonicalize).
+    '''
+    states_value = {
+        pack_hash(k) if isinstance(k, str) else k: v
+        for k, v in states_value.items()
+    }
+    flags = 0
+    if canonical:
+        from symmetry import canonicalize
+        states_value = canonicalize(states_value)
+        flags |= FLAG_CANONICAL
+    items = sorted(states_value.items())
+    typecode = 'i' if all(isinstance(v, int) for _, v in items) else 'd'
+    keys = array.array('I', (k for k, _ in items))
+    values = array.array(typecode, (v for _, v in items))
+    if sys.byteorder != 'little':  # pragma: no cover
+        keys.byteswap()
+        values.byteswap()
+    header = _HEADER.pack(PACKED_MAGIC, len(items), typecode.encode('ascii'), flags)
+    padding = b'\0' * (_values_offset(len(items)) - _HEADER.size - 4 * len(items))
+    return header + keys.tobytes() + padding + values.tobytes()
+
+
+def load_packed(path: str) -> PackedPolicy:
+    '''
+    Apre un file di policy binario.
+    Su desktop il file è mappato in memoria, sul web è letto in un buffer.
+    '''
+    with open(path, 'rb') as file_read:
+        if IS_WEB or mmap is None:
+            buffer = file_read.read()
+        else:
+            buffer = mmap.mmap(file_read.fileno(), 0, access=mmap.ACCESS_READ)
+    return PackedPolicy(buffer)
+
+
+def load_pickle(path: str) -> dict:
+    '''Carica la tabella states_value da un file pickle.'''
+    with open(path, 'rb') as file_read:
+        data = pickle.load(file_read)
+    # Policies are in states_value key
+    return (
+        data if 'states_value' not in data else  # data legacy support
+        data['states_value']
+    )
+
+
+def convert_policy(path: str, out_path: str = None, canonical: bool = True) -> str:
+    '''Converte un file pickle nel formato binario e restituisce il percorso scritto.'''
+    if out_path is None:
+        out_path = path + PACKED_EXT
+    with open(out_path, 'wb') as file_write:
+        file_write.write(pack_policy(load_pickle(path), canonical))
+    return out_path
+
+
+# ========== CACHE DI PROCESSO ==========
+
+# (percorso assoluto, mtime) -> policy
+_POLICY_CACHE = {}
+
+
+def _resolve_policy_file(path: str) -> str:
+    '''
+    Preferisce sempre il file binario affiancato, se esiste: le date dei
+    file dopo un checkout o nel pacchetto web non dicono quale sia il più
+    recente, ed è il convertitore a rigenerare il binario.
+    Il ripiego sul pickle (lento da caricare) viene segnalato.
+    '''
+    if path.endswith(PACKED_EXT):
+        return path
+    packed = path + PACKED_EXT
+    if os.path.exists(packed):
+        return packed
+    print(f"Policy binaria {packed} assente, carico il pickle {path} "
+          f"(rigenerabile con: python policy.py)")
+    return path
+
+
+def get_policy(path: str) -> PackedPolicy:
+    '''
+    Restituisce la policy contenuta nel file indicato.
+    Ogni file viene caricato una sola volta per processo: la chiave di cache
+    è il percorso assoluto più la data di modifica, quindi un file
+    aggiornato su disco viene ricaricato.
+    La policy è condivisa tra tutte le manches ed è in sola lettura;
+    i pickle vengono convertiti in memoria nel formato binario canonico.
+    '''
+    path = os.path.abspath(_resolve_policy_file(path))
+    key = (path, os.path.getmtime(path))
+    policy = _POLICY_CACHE.get(key)
+    if policy is None:
+        if path.endswith(PACKED_EXT):
+            policy = load_packed(path)
+        else:
+            policy = PackedPolicy(pack_policy(load_pickle(path), canonical=True))
+        # Scarta eventuali versioni precedenti dello stesso file
+        for old_key in [k for k in _POLICY_CACHE if k[0] == path]:
+            del _POLICY_CACHE[old_key]
+        _POLICY_CACHE[key] = policy
+    return policy
+
+
+async def preload_policies(paths=(BEAR_POLICY_FILE, HUNTER_POLICY_FILE)) -> None:
+    '''
+    Carica in anticipo le policy nella cache di processo.
+    Pensata per essere lanciata come task mentre il menu è visibile:
+    cede il controllo prima di ogni file per non ritardare il primo frame.
+    '''
+    for path in paths:
+        await asyncio.sleep(0)
+        get_policy(path)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Converte le policy pickle nel formato binario compatto")
+    parser.add_argument("files", nargs="*",
+                        default=[BEAR_POLICY_SOURCE, HUNTER_POLICY_SOURCE])
+    parser.add_argument("--out-dir", default=POLICY_BASE_PATH,
+                        help="cartella dei file binari (default: quella del gioco)")
+    parser.add_argument("--no-canonical", action="store_true",
+                        help="salva tutte le chiavi, senza ridurle per simmetria")
+    args = parser.parse_args()
+    for policy_file in args.files:
+        out_path = os.path.join(args.out_dir, os.path.basename(policy_file) + PACKED_EXT)
+        written = convert_policy(policy_file, out_path, canonical=not args.no_canonical)
+        source = load_pickle(policy_file)
+        packed = load_packed(written)
+        # Verifica che ogni stato abbia lo stesso valore
+        assert all(packed.get(pack_hash(k)) == v for k, v in source.items())
+        print(f"{policy_file} -> {written}: {len(packed)} stati, "
+              f"{os.path.getsize(policy_file)} -> {os.path.getsize(written)} byte")
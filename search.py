@@ -0,0 +1,277 @@
+'''
+Giocatore AI a ricerca per il livello "esperto".
+
+Al posto della scelta a un solo livello di Player.get_action esplora
+l'albero delle mosse con negamax e potatura alfa-beta, ad approfondimento
+iterativo entro un tempo massimo per mossa, così da restare reattivo anche
+nel browser. Il punteggio è il numero di mosse che l'orso riuscirà a fare
+(l'orso massimizza, i cacciatori minimizzano).
+
+- tabella di trasposizione indicizzata dalla chiave di stato della manche
+  più contatore delle mosse dell'orso e turno
+- ordinamento delle mosse: prima la migliore della tabella di
+  trasposizione, poi secondo i valori delle policy esistenti
+- valutazione delle foglie: mosse fatte più le mosse residue stimate
+  dalle policy; per gli stati assenti dalle policy, la stessa stima di
+  Player (engine.fallback_value)
+
+Usa solo move_player/undo_move di BearGameManche, quindi è indipendente
+da PyGame. Sul web (senza thread) get_action_async divide la ricerca in
+fette di tempo brevi, cedendo il controllo al ciclo dei frame tra una fetta
+e l'altra: una profondità interrotta riparte dalla fetta successiva,
+sfruttando quanto già salvato nella tabella di trasposizione.
+'''
+
+from __future__ import annotations
+from copy import copy
+from time import perf_counter
+import asyncio
+
+from engine import INFINITY, BearGameManche, fallback_value
+from policy import (
+    BEAR_POLICY_FILE, BEAR_POLICY_OFFSET, HUNTER_POLICY_FILE,
+    HUNTER_POLICY_OFFSET, get_policy
+)
+
+# Tempo massimo di ricerca per mossa, in secondi
+DEFAULT_TIME_BUDGET = 0.5
+# Profondità massima in semimosse
+MAX_DEPTH = 2 * BearGameManche.MAX_BEAR_MOVES
+# Ogni quanti nodi controllare il tempo
+CHECK_EVERY = 64
+# Durata di una fetta di ricerca cooperativa: il ciclo dei frame cede il
+# controllo un paio di volte per frame, quindi due fette stanno in un frame
+# a 60 FPS insieme al disegno
+FRAME_SLICE = 0.004
+# Oltre questa dimensione la tabella di trasposizione viene svuotata
+MAX_TABLE_SIZE = 1_000_000
+
+# Tipi di valore salvati nella tabella di trasposizione
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class _SearchTimeout(Exception):
+    '''Tempo di ricerca esaurito.'''
+
+
+class SearchPlayer:
+    '''
+    Giocatore AI basato su ricerca alfa-beta.
+    Offre la stessa get_action di Player, quindi si può passare a
+    BearGameManche.set_ai_players.
+    '''
+
+    def __init__(self, name,
+                 time_budget: float = DEFAULT_TIME_BUDGET,
+                 max_depth: int = MAX_DEPTH,
+                 bear_policy_file: str = BEAR_POLICY_FILE,
+                 hunter_policy_file: str = HUNTER_POLICY_FILE):
+        self.name = name
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        # Policy usate per ordinare le mosse e per valutare le foglie
+        self._policies = (get_policy(bear_policy_file), get_policy(hunter_policy_file))
+        self._table = {}
+        self._deadline = INFINITY
+        self._stopped = False
+        self._nodes = 0
+        # Foglie assenti dalle policy, valutate con fallback_value
+        # (vedi BearGameManche.get_ai_fallbacks)
+        self.fallbacks = 0
+        # Statistiche dell'ultima ricerca
+        self.last_depth = 0
+        self.last_value = None
+        self.last_nodes = 0
+
+    def fork(self) -> SearchPlayer:
+        '''
+        Copia per il calcolo di una sola mossa (vedi think_ai_action).
+        La tabella di trasposizione passa alla copia e torna indietro con
+        join: se il calcolo viene annullato la si perde, ma nessuna ricerca
+        orfana può più modificare quella del giocatore.
+        '''
+        worker = copy(self)
+        self._table = {}
+        worker.fallbacks = 0
+        worker._stopped = False
+        return worker
+
+    def join(self, worker: SearchPlayer) -> None:
+        '''Riprende tabella e statistiche di un calcolo concluso.'''
+        self._table = worker._table
+        self.fallbacks += worker.fallbacks
+        self.last_depth = worker.last_depth
+        self.last_value = worker.last_value
+        self.last_nodes = worker.last_nodes
+
+    def stop(self) -> None:
+        '''Interrompe la ricerca in corso, anche da un altro thread.'''
+        self._stopped = True
+
+    def get_action(self, actions, current_board: BearGameManche) -> tuple[int, int]:
+        '''Return the action to take as tuple (startpos, endpos)'''
+        return self.search(current_board, actions)
+
+    async def get_action_async(self, actions, current_board: BearGameManche) -> tuple[int, int]:
+        '''
+        Come get_action, ma cede il controllo all'event loop dopo ogni
+        fetta di FRAME_SLICE secondi (per il web, dove non ci sono thread).
+        '''
+        steps = self._search_slices(current_board, actions, FRAME_SLICE)
+        while True:
+            try:
+                next(steps)
+            except StopIteration as stop:
+                return stop.value
+            await asyncio.sleep(0)
+
+    def search(self, board: BearGameManche, actions=None) -> tuple[int, int]:
+        '''
+        Approfondimento iterativo: ricerca completa a profondità crescenti
+        finché c'è tempo; restituisce la migliore mossa dell'ultima
+        profondità completata.
+        '''
+        steps = self._search_slices(board, actions, self.time_budget)
+        while True:
+            try:
+                next(steps)
+            except StopIteration as stop:
+                return stop.value
+
+    def _search_slices(self, board: BearGameManche, actions, slice_time: float):
+        '''
+        Generatore della ricerca: si sospende (yield) ogni volta che una
+        fetta di slice_time secondi si esaurisce prima del tempo totale,
+        e restituisce la mossa scelta come valore di StopIteration.
+        '''
+        if actions is None:
+            actions = self._actions(board)
+        actions = self._order(board, list(actions), None)
+        best_action = actions[0]
+        deadline = perf_counter() + self.time_budget
+        self._nodes = 0
+        self.last_depth = 0
+        self.last_value = None
+        if len(self._table) > MAX_TABLE_SIZE:
+            self._table.clear()
+        # Semimosse che restano al massimo prima del limite di mosse dell'orso
+        remaining = 2 * (board.MAX_BEAR_MOVES - board.get_bear_moves())
+        depth = 1
+        while depth <= min(self.max_depth, remaining) and not self._stopped:
+            self._deadline = min(deadline, perf_counter() + slice_time)
+            try:
+                value, action = self._root(board, actions, depth)
+            except _SearchTimeout:
+                if self._stopped or self._deadline >= deadline:
+                    break
+                # Fetta esaurita: la stessa profondità riprende alla prossima
+                yield
+                continue
+            best_action = action
+            self.last_depth, self.last_value = depth, value
+            # La migliore mossa trovata va valutata per prima
+            actions.remove(action)
+            actions.insert(0, action)
+            depth += 1
+        self.last_nodes = self._nodes
+        return best_action
+
+    def _root(self, board: BearGameManche, actions, depth: int):
+        alpha, beta = -INFINITY, INFINITY
+        best_value, best_action = -INFINITY, actions[0]
+        for action in actions:
+            board.move_player(action[0], action[1])
+            try:
+                value = -self._negamax(board, depth - 1, -beta, -alpha)
+            finally:
+                board.undo_move()
+            if value > best_value:
+                best_value, best_action = value, action
+            alpha = max(alpha, value)
+        return best_value, best_action
+
+    def _negamax(self, board: BearGameManche, depth: int, alpha: float, beta: float) -> float:
+        '''Valore dello stato dal punto di vista di chi deve muovere.'''
+        self._nodes += 1
+        if not self._nodes % CHECK_EVERY and (self._stopped or perf_counter() > self._deadline):
+            raise _SearchTimeout()
+        sign = -1 if board.is_hunter_turn() else 1
+        if board.is_over():
+            return sign * board.get_bear_moves()
+        if depth == 0:
+            return sign * self.evaluate(board)
+
+        key = ((board.get_state_key() << 7 | board.get_bear_moves()) << 1
+               | board.is_hunter_turn())
+        entry = self._table.get(key)
+        tt_action = None
+        if entry is not None:
+            entry_depth, entry_value, entry_flag, tt_action = entry
+            if entry_depth >= depth:
+                if entry_flag == EXACT:
+                    return entry_value
+                if entry_flag == LOWER:
+                    alpha = max(alpha, entry_value)
+                else:
+                    beta = min(beta, entry_value)
+                if alpha >= beta:
+                    return entry_value
+
+        alpha_start = alpha
+        best_value, best_action = -INFINITY, None
+        for action in self._order(board, self._actions(board), tt_action):
+            board.move_player(action[0], action[1])
+            try:
+                value = -self._negamax(board, depth - 1, -beta, -alpha)
+            finally:
+                board.undo_move()
+            if value > best_value:
+                best_value, best_action = value, action
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+
+        if best_value <= alpha_start:
+            flag = UPPER
+        elif best_value >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self._table[key] = (depth, best_value, flag, best_action)
+        return best_value
+
+    @staticmethod
+    def _actions(board: BearGameManche):
+        if board.is_hunter_turn():
+            return board.get_hunter_actions()
+        return board.get_bear_actions()
+
+    def _order(self, board: BearGameManche, actions, first):
+        '''Ordina le azioni secondo la policy di chi muove, `first` in testa.'''
+        hunter_turn = board.is_hunter_turn()
+        lookup = self._policies[hunter_turn].get
+        key = board.get_state_key()
+        deltas = BearGameManche.MOVE_DELTAS[hunter_turn]
+        actions.sort(key=lambda act: lookup(key ^ deltas[act[0]][act[1]], 0), reverse=True)
+        if first is not None and first in actions:
+            actions.remove(first)
+            actions.insert(0, first)
+        return actions
+
+    def evaluate(self, board: BearGameManche) -> float:
+        '''
+        Stima delle mosse finali dell'orso in uno stato non terminale:
+        mosse già fatte più le mosse residue lette dalla policy adatta
+        al turno (quella di chi ha appena mosso). Gli stati assenti dalla
+        policy sono stimati con fallback_value, come fa Player.
+        '''
+        key = board.get_state_key()
+        moved_hunter = not board.is_hunter_turn()
+        value = self._policies[moved_hunter].get(key)
+        if value is None:
+            self.fallbacks += 1
+            value = fallback_value(key, moved_hunter)
+        if moved_hunter:
+            return board.get_bear_moves() + (HUNTER_POLICY_OFFSET - value) / 2
+        return board.get_bear_moves() + (value - BEAR_POLICY_OFFSET) / 2
@@ -0,0 +1,132 @@
+'''
+Simulazione senza grafica di partite AI orso contro AI cacciatori.
+Non importa PyGame e non attende tra una mossa e l'altra: serve per
+valutare le policy su molte partite, distribuite su più processi.
+
+Esempio:
+    python simulate.py --games 100000 --workers 8
+
+Con --vectorized ogni worker gioca il proprio blocco di partite in
+parallelo con NumPy (vedi batch.py), per arrivare a milioni di partite.
+'''
+
+from __future__ import annotations
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import os
+import random
+import time
+
+from engine import BearGameManche
+
+# Nomi delle due disposizioni iniziali di BearGameManche.reset
+STARTING_POSITIONS = {True: "classica", False: "centrale"}
+
+
+def play_game(classic_initial_position: bool) -> int:
+    '''
+    Gioca una manche completa AI contro AI.
+
+    Returns:
+        Numero di mosse fatte dall'orso
+    '''
+    manche = BearGameManche(True, True, classic_initial_position)
+    while not manche.game_over():
+        start, end = manche.choose_ai_action()
+        manche.move_player(start, end)
+    return manche.get_bear_moves()
+
+
+def _play_batch(task: tuple[bool, int, int, bool]) -> tuple[bool, Counter]:
+    '''Gioca un blocco di partite in un processo worker.'''
+    classic_initial_position, games, seed, vectorized = task
+    if vectorized:
+        from batch import play_games
+        moves = play_games(games, classic_initial_position, seed=seed)
+        return classic_initial_position, Counter(moves.tolist())
+    random.seed(seed)
+    bear_moves = Counter(play_game(classic_initial_position) for _ in range(games))
+    return classic_initial_position, bear_moves
+
+
+def simulate(games: int,
+             classic_positions=(True, False),
+             workers: int = None,
+             batch_size: int = 500,
+             seed: int = None,
+             vectorized: bool = False) -> dict:
+    '''
+    Gioca `games` partite per ogni disposizione iniziale richiesta,
+    distribuendole su un ProcessPoolExecutor.
+    Con vectorized=True ogni blocco è giocato con NumPy (batch.play_games).
+
+    Returns:
+        Dizionario con il tempo impiegato, le partite al secondo e, per
+        ogni disposizione, la distribuzione delle mosse dell'orso
+    '''
+    if seed is None:
+        seed = random.randrange(1 << 30)
+    tasks = []
+    for classic in classic_positions:
+        for start in range(0, games, batch_size):
+            tasks.append((classic, min(batch_size, games - start),
+                          seed + len(tasks), vectorized))
+
+    results = {classic: Counter() for classic in classic_positions}
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for classic, bear_moves in executor.map(_play_batch, tasks):
+            results[classic].update(bear_moves)
+    elapsed = time.perf_counter() - started
+
+    total = games * len(classic_positions)
+    return {
+        'games': total,
+        'elapsed': elapsed,
+        'games_per_sec': total / elapsed if elapsed else float('inf'),
+        'seed': seed,
+        'bear_moves': results,
+    }
+
+
+def print_report(report: dict) -> None:
+    '''Stampa throughput e distribuzione delle mosse dell'orso.'''
+    print(f"{report['games']} partite in {report['elapsed']:.2f}s "
+          f"({report['games_per_sec']:.0f} partite/s, seed {report['seed']})")
+    for classic, bear_moves in report['bear_moves'].items():
+        games = sum(bear_moves.values())
+        escaped = sum(n for moves, n in bear_moves.items()
+                      if moves >= BearGameManche.MAX_BEAR_MOVES)
+        mean = sum(moves * n for moves, n in bear_moves.items()) / games
+        print(f"\nPosizione iniziale {STARTING_POSITIONS[classic]}: "
+              f"media {mean:.2f} mosse, orso scappa {100 * escaped / games:.1f}%")
+        peak = max(bear_moves.values())
+        for moves in sorted(bear_moves):
+            n = bear_moves[moves]
+            print(f"  {moves:3d} {n:8d} {'#' * max(1, 50 * n // peak)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Simula partite AI orso contro AI cacciatori senza grafica")
+    parser.add_argument("-n", "--games", type=int, default=10000,
+                        help="partite per ogni disposizione iniziale")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="partite per blocco (default 500, 100000 con --vectorized)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--position", choices=["classica", "centrale", "entrambe"],
+                        default="entrambe")
+    parser.add_argument("--vectorized", action="store_true",
+                        help="gioca i blocchi in parallelo con NumPy")
+    args = parser.parse_args()
+    if args.batch_size is None:
+        args.batch_size = 100000 if args.vectorized else 500
+    positions = {
+        "classica": (True,),
+        "centrale": (False,),
+        "entrambe": (True, False),
+    }[args.position]
+    print_report(simulate(args.games, positions, args.workers,
+                          args.batch_size, args.seed, args.vectorized))
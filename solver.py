@@ -0,0 +1,159 @@
+'''
+Analisi retrograda esaustiva del Gioco dell'Orso.
+
+Le disposizioni possibili sono 21 x C(20, 3) = 23940 (tre cacciatori
+indistinguibili e un orso), ciascuna con l'orso o i cacciatori al tratto.
+Per ogni stato il solver calcola il valore esatto con gioco perfetto:
+il numero di mosse che l'orso riesce ancora a fare prima di essere
+catturato (l'orso massimizza, i cacciatori minimizzano).
+Gli stati da cui i cacciatori non possono mai catturare l'orso restano
+senza valore (fuga).
+
+Il contatore delle mosse dell'orso non serve come dimensione aggiuntiva:
+il limite MAX_BEAR_MOVES si applica a posteriori, perché con c mosse già
+fatte l'orso scappa se e solo se il valore dello stato è almeno
+MAX_BEAR_MOVES - c (il minimo con una costante commuta con max e min).
+
+Il risultato è scritto come coppia di policy binarie a chiavi canoniche
+(vedi policy.py e symmetry.py) che Player può caricare al posto di
+bear.policy/hunter.policy:
+    python solver.py
+'''
+
+from __future__ import annotations
+import argparse
+import time
+
+from engine import BearGameManche, iter_bits
+from policy import (
+    BEAR_SHIFT, BEAR_SOLVED_POLICY_FILE, HUNTER_SOLVED_POLICY_FILE, pack_policy
+)
+
+ADJACENT_POSITIONS = BearGameManche.ADJACENT_POSITIONS
+ADJACENT_MASKS = BearGameManche.ADJACENT_MASKS
+BOARD_POSITIONS = BearGameManche.BOARD_POSITIONS
+
+# Valore assegnato nelle policy agli stati da cui l'orso fugge per sempre
+ESCAPE_VALUE = 1000
+
+
+def solve() -> tuple[dict[int, int], dict[int, int]]:
+    '''
+    Risolve il gioco con una visita all'indietro per livelli a partire
+    dalle catture. Un livello contiene gli stati con lo stesso valore:
+    - uno stato con i cacciatori al tratto prende il valore del primo
+      successore risolto (il minimo, visto che i livelli sono crescenti)
+    - uno stato con l'orso al tratto si risolve quando tutti i successori
+      sono risolti e vale uno più dell'ultimo (il massimo)
+
+    Returns:
+        Due dizionari chiave di stato -> mosse residue dell'orso, per gli
+        stati con l'orso al tratto e per quelli con i cacciatori al tratto.
+        Gli stati di fuga non compaiono.
+    '''
+    bear_to_move = {}
+    hunters_to_move = {}
+    # Successori non ancora risolti degli stati con l'orso al tratto
+    pending = {}
+    level = []
+    for bear, hunters in BearGameManche.placements():
+        key = (bear << BEAR_SHIFT) | hunters
+        free = ADJACENT_MASKS[bear] & ~hunters
+        if free:
+            pending[key] = free.bit_count()
+        else:
+            # Orso catturato: la partita finisce chiunque sia al tratto
+            bear_to_move[key] = 0
+            hunters_to_move[key] = 0
+            level.append((True, bear, hunters))
+            level.append((False, bear, hunters))
+
+    depth = 0
+    while level:
+        next_level = []
+        i = 0
+        # Il livello cresce mentre lo si visita (stati dei cacciatori)
+        while i < len(level):
+            bear_side, bear, hunters = level[i]
+            i += 1
+            occupied = hunters | (1 << bear)
+            if bear_side:
+                # Predecessori: un cacciatore è arrivato in h da q
+                for h in iter_bits(hunters):
+                    for q in ADJACENT_POSITIONS[h]:
+                        if occupied >> q & 1:
+                            continue
+                        previous = hunters ^ (1 << h) ^ (1 << q)
+                        key = (bear << BEAR_SHIFT) | previous
+                        if key not in hunters_to_move:
+                            hunters_to_move[key] = depth
+                            level.append((False, bear, previous))
+            else:
+                # Predecessori: l'orso è arrivato in bear da p
+                for p in ADJACENT_POSITIONS[bear]:
+                    if occupied >> p & 1:
+                        continue
+                    key = (p << BEAR_SHIFT) | hunters
+                    if key in bear_to_move:
+                        continue
+                    pending[key] -= 1
+                    if not pending[key]:
+                        bear_to_move[key] = depth + 1
+                        next_level.append((True, p, hunters))
+        level = next_level
+        depth += 1
+    return bear_to_move, hunters_to_move
+
+
+def solved_policies(bear_to_move: dict[int, int],
+                    hunters_to_move: dict[int, int]) -> tuple[dict[int, int], dict[int, int]]:
+    '''
+    Converte i valori del solver nelle tabelle lette da Player.get_action,
+    che valuta lo stato raggiunto dopo la propria mossa e sceglie il massimo:
+    - orso: stati con i cacciatori al tratto, valore = mosse residue
+    - cacciatori: stati con l'orso al tratto, valore = -mosse residue
+    '''
+    bear_policy = {}
+    hunter_policy = {}
+    for bear, hunters in BearGameManche.placements():
+        key = (bear << BEAR_SHIFT) | hunters
+        bear_policy[key] = hunters_to_move.get(key, ESCAPE_VALUE)
+        hunter_policy[key] = -bear_to_move.get(key, ESCAPE_VALUE)
+    return bear_policy, hunter_policy
+
+
+def start_value(bear_to_move: dict[int, int],
+                hunters_to_move: dict[int, int],
+                classic_initial_position: bool) -> int:
+    '''Valore della disposizione iniziale con gioco perfetto (None = fuga).'''
+    manche = BearGameManche.__new__(BearGameManche)
+    manche.reset(True, classic_initial_position)
+    table = hunters_to_move if manche.is_hunter_turn() else bear_to_move
+    return table.get(manche.get_state_key())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Risolve il gioco e scrive le policy ottime")
+    parser.add_argument("--bear-out", default=BEAR_SOLVED_POLICY_FILE)
+    parser.add_argument("--hunter-out", default=HUNTER_SOLVED_POLICY_FILE)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    bear_to_move, hunters_to_move = solve()
+    elapsed = time.perf_counter() - started
+    states = 2 * sum(1 for _ in BearGameManche.placements())
+    solved = len(bear_to_move) + len(hunters_to_move)
+    print(f"{states} stati risolti in {elapsed:.2f}s, "
+          f"{states - solved} di fuga per l'orso")
+    for classic, name in ((True, "classica"), (False, "centrale")):
+        value = start_value(bear_to_move, hunters_to_move, classic)
+        print(f"Posizione iniziale {name}: "
+              f"{'fuga' if value is None else f'{value} mosse'} dell'orso")
+
+    bear_policy, hunter_policy = solved_policies(bear_to_move, hunters_to_move)
+    for path, table in ((args.bear_out, bear_policy),
+                        (args.hunter_out, hunter_policy)):
+        with open(path, 'wb') as file_write:
+            file_write.write(pack_policy(table, canonical=True))
+        print(f"Scritto {path}")
@@ -0,0 +1,127 @@
+'''
+Simmetrie della scacchiera del Gioco dell'Orso.
+
+Le regole dipendono solo dal grafo delle adiacenze: una permutazione delle
+caselle che conserva i collegamenti (automorfismo) porta ogni stato in uno
+stato equivalente, con lo stesso valore per orso e cacciatori.
+Il gruppo degli automorfismi è calcolato da ADJACENT_POSITIONS e ha 8
+elementi: oltre allo specchio sinistra/destra (1<->2, 4<->6, 7<->13, 8<->12,
+9<->11, 14<->16, 18<->19) e alto/basso, le permutazioni che scambiano tra
+loro le quattro estremità 0, 7, 13 e 20.
+
+La chiave canonica di uno stato è la minima tra le chiavi delle sue
+immagini: le policy salvate con chiavi canoniche (vedi policy.py) hanno
+una riga per classe di stati equivalenti invece di fino a 8.
+Modulo indipendente da PyGame.
+'''
+
+from __future__ import annotations
+
+from engine import BearGameManche
+from policy import BEAR_SHIFT, HUNTERS_MASK
+
+# Bit della maschera dei cacciatori permutati insieme con una tabella
+CHUNK_BITS = 7
+
+
+def automorphisms(adjacent_positions) -> list[tuple[int, ...]]:
+    '''
+    Tutte le permutazioni p delle caselle tali che i e j sono adiacenti se e
+    solo se lo sono p[i] e p[j] (ricerca con backtracking, la prima è l'identità).
+    '''
+    adjacent = [set(adj) for adj in adjacent_positions]
+    positions = len(adjacent)
+    found = []
+    image = []
+
+    def extend():
+        i = len(image)
+        if i == positions:
+            found.append(tuple(image))
+            return
+        for candidate in range(positions):
+            if candidate in image or len(adjacent[candidate]) != len(adjacent[i]):
+                continue
+            # Le adiacenze con le caselle già assegnate devono corrispondere
+            if all((image[j] in adjacent[candidate]) == (j in adjacent[i]) for j in range(i)):
+                image.append(candidate)
+                extend()
+                image.pop()
+
+    extend()
+    return found
+
+
+def _chunk_tables(permutation: tuple[int, ...]) -> list[list[int]]:
+    '''
+    Per ogni blocco di CHUNK_BITS caselle, maschera permutata di ciascuno
+    dei valori possibili del blocco.
+    '''
+    tables = []
+    for start in range(0, len(permutation), CHUNK_BITS):
+        table = []
+        for chunk in range(1 << CHUNK_BITS):
+            mask = 0
+            for bit in range(CHUNK_BITS):
+                if chunk >> bit & 1:
+                    mask |= 1 << permutation[start + bit]
+            table.append(mask)
+        tables.append(table)
+    return tables
+
+
+AUTOMORPHISMS = automorphisms(BearGameManche.ADJACENT_POSITIONS)
+# Tabelle precalcolate per automorfismo: (permutazione delle caselle, tabelle dei blocchi)
+_PERMUTATIONS = [(permutation, _chunk_tables(permutation)) for permutation in AUTOMORPHISMS]
+_CHUNK_MASK = (1 << CHUNK_BITS) - 1
+# chiave di stato -> chiave canonica, riempita al primo uso di ogni chiave
+_CANONICAL = {}
+
+
+def permute_key(key: int, permutation: tuple[int, ...], tables: list[list[int]]) -> int:
+    '''Chiave dello stato ottenuto applicando la permutazione alle caselle.'''
+    hunters = key & HUNTERS_MASK
+    mask = 0
+    for table in tables:
+        mask |= table[hunters & _CHUNK_MASK]
+        hunters >>= CHUNK_BITS
+    return (permutation[key >> BEAR_SHIFT] << BEAR_SHIFT) | mask
+
+
+def symmetric_keys(key: int) -> set[int]:
+    '''Chiavi di tutti gli stati equivalenti (compreso lo stato stesso).'''
+    return {permute_key(key, permutation, tables) for permutation, tables in _PERMUTATIONS}
+
+
+def canonical_key(key: int) -> int:
+    '''Chiave canonica: la minima tra quelle degli stati equivalenti.'''
+    canonical = _CANONICAL.get(key)
+    if canonical is None:
+        if key >> BEAR_SHIFT >= BearGameManche.BOARD_POSITIONS:
+            # Non è la chiave di uno stato: nessuna simmetria
+            return key
+        canonical = _CANONICAL[key] = min(symmetric_keys(key))
+    return canonical
+
+
+def canonicalize(states_value) -> dict:
+    '''
+    Riduce una tabella chiave intera -> valore alle sole chiavi canoniche.
+    Gli stati equivalenti hanno lo stesso valore; se la tabella non è
+    coerente si tiene la media, e uno stato visto anche in una sola delle
+    forme equivalenti vale per tutte.
+    '''
+    classes = {}
+    for key, value in states_value.items():
+        classes.setdefault(canonical_key(key), []).append(value)
+    return {
+        key: values[0] if all(v == values[0] for v in values) else sum(values) / len(values)
+        for key, values in classes.items()
+    }
+
+
+def expand(states_value) -> dict:
+    '''Operazione inversa di canonicalize: ripete ogni valore su tutti gli stati equivalenti.'''
+    return {symmetric: value
+            for key, value in states_value.items()
+            for symmetric in symmetric_keys(key)}
@@ -0,0 +1,109 @@
+'''
+Stati assenti dalle policy: Player e SearchPlayer usano la stessa stima
+(engine.fallback_value) e contano i ripieghi in `fallbacks`.
+'''
+
+import os
+
+import pytest
+
+from engine import BearGameManche, Player, estimate_bear_moves
+from policy import (
+    BEAR_POLICY_FILE, HUNTER_POLICY_FILE, PackedPolicy, get_policy, pack_policy
+)
+from search import SearchPlayer
+from symmetry import canonical_key
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BEAR_POLICY = os.path.join(ROOT, BEAR_POLICY_FILE)
+HUNTER_POLICY = os.path.join(ROOT, HUNTER_POLICY_FILE)
+
+
+def _next_keys(manche: BearGameManche) -> list[int]:
+    '''Chiavi degli stati raggiunti con ogni mossa del giocatore di turno'''
+    hunter_turn = manche.is_hunter_turn()
+    deltas = BearGameManche.MOVE_DELTAS[hunter_turn]
+    key = manche.get_state_key()
+    return [key ^ deltas[s][e] for s, e in _actions(manche)]
+
+
+def _actions(manche: BearGameManche):
+    if manche.is_hunter_turn():
+        return manche.get_hunter_actions()
+    return manche.get_bear_actions()
+
+
+def _without(path: str, keys) -> PackedPolicy:
+    '''Policy distribuita senza gli stati indicati (e i loro simmetrici)'''
+    table = dict(get_policy(path))
+    for key in keys:
+        table.pop(canonical_key(key), None)
+    return PackedPolicy(pack_policy(table, canonical=True))
+
+
+@pytest.fixture(params=[True, False], ids=["classica", "centrale"])
+def manche(request):
+    manche = BearGameManche(True, True, request.param, load_ai=False)
+    # Una mossa per parte, così ci sono stati da entrambi i lati
+    for _ in range(2):
+        manche.move_player(*_actions(manche)[0])
+    return manche
+
+
+def _holey_policies(manche: BearGameManche) -> tuple[PackedPolicy, PackedPolicy]:
+    '''Policy di orso e cacciatori senza gli stati dopo le mosse di turno'''
+    missing = _next_keys(manche)
+    if manche.is_hunter_turn():
+        return get_policy(BEAR_POLICY), _without(HUNTER_POLICY, missing)
+    return _without(BEAR_POLICY, missing), get_policy(HUNTER_POLICY)
+
+
+def _players(manche: BearGameManche, bear, hunter):
+    '''Installa i giocatori e restituisce quello di turno'''
+    manche.set_ai_players(bear, hunter)
+    return hunter if manche.is_hunter_turn() else bear
+
+
+def test_player_fallback(manche):
+    bear_table, hunter_table = _holey_policies(manche)
+    bear, hunter = Player("orso"), Player("cacciatore")
+    bear.states_value, hunter.states_value = bear_table, hunter_table
+    player = _players(manche, bear, hunter)
+
+    action = manche.choose_ai_action()
+
+    assert action in _actions(manche)
+    assert player.fallbacks == len(_actions(manche))
+    assert manche.get_ai_fallbacks() == player.fallbacks
+
+
+def test_search_player_fallback(manche):
+    bear, hunter = (SearchPlayer(name, time_budget=float("inf"), max_depth=1,
+                                 bear_policy_file=BEAR_POLICY,
+                                 hunter_policy_file=HUNTER_POLICY)
+                    for name in ("orso", "cacciatore"))
+    holey = _holey_policies(manche)
+    bear._policies = hunter._policies = holey
+    player = _players(manche, bear, hunter)
+
+    action = manche.choose_ai_action()
+
+    assert action in _actions(manche)
+    assert player.fallbacks == len(_actions(manche))
+    assert manche.get_ai_fallbacks() == player.fallbacks
+
+
+def test_search_player_uses_engine_estimate(manche):
+    '''La stima delle foglie mancanti è quella di engine, in mosse dell'orso'''
+    player = SearchPlayer("orso", bear_policy_file=BEAR_POLICY,
+                          hunter_policy_file=HUNTER_POLICY)
+    player._policies = _holey_policies(manche)
+    for action in _actions(manche):
+        manche.move_player(*action)
+        try:
+            expected = manche.get_bear_moves() + estimate_bear_moves(
+                manche.get_state_key(), manche.is_hunter_turn())
+            assert player.evaluate(manche) == pytest.approx(expected)
+        finally:
+            manche.undo_move()
+    assert player.fallbacks == len(_actions(manche))
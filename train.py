@@ -0,0 +1,347 @@
+'''
+Addestramento delle policy AI con apprendimento per rinforzo in self-play.
+
+Orso e cacciatori giocano l'uno contro l'altro sulla BearGameManche senza
+grafica e imparano il valore degli stati dopo la propria mossa
+(afterstate) con il TD(0) di Q-learning: il valore di uno stato è stimato
+come numero di mosse che l'orso farà ancora prima della cattura. Entrambe
+le tabelle stimano la stessa quantità, quindi il bersaglio di ogni stato
+visitato è la migliore risposta dell'avversario letta dalla sua tabella
+(minimo per i cacciatori; massimo per l'orso, più la sua mossa).
+Le scelte sono epsilon-greedy; la fuga dell'orso per limite di mosse è un
+troncamento, quindi l'ultimo stato non viene aggiornato.
+Le tabelle usano le chiavi canoniche di symmetry.py: ogni partita aggiorna
+insieme tutti gli stati equivalenti per simmetria.
+
+L'addestramento procede a turni: a ogni turno più processi worker
+giocano ciascuno un blocco di partite partendo dalle stesse tabelle, poi
+i valori degli stati visitati vengono fusi (media pesata sulle visite).
+Dopo ogni turno le tabelle sono salvate in un checkpoint, da cui si può
+riprendere con --resume.
+
+Le policy sono scritte nello stesso formato pickle {'states_value': ...}
+di bear.policy/hunter.policy (più il file binario affiancato, vedi
+policy.py, con le sole chiavi canoniche), sulla stessa scala delle
+policy distribuite: 2r+1 per l'orso
+e 42-2r per i cacciatori, con r le mosse residue dell'orso.
+
+Esempi:
+    python train.py --games 200000 --workers 8
+    python train.py --warm-start --games 100000
+    python train.py --resume train.checkpoint --games 100000
+    python train.py --out-bear assets-src/bear.policy --out-hunter assets-src/hunter.policy
+
+Per sostituire le policy del gioco si scrivono i pickle in assets-src/ e
+si rigenerano i file binari con python policy.py.
+'''
+
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import os
+import pickle
+import random
+import time
+
+from engine import BearGameManche, Player
+from policy import (
+    BEAR_POLICY_FILE, BEAR_POLICY_OFFSET, HUNTER_POLICY_FILE, HUNTER_POLICY_OFFSET,
+    PACKED_EXT, PackedPolicy, convert_policy, get_policy, pack_policy
+)
+from simulate import STARTING_POSITIONS
+from symmetry import canonical_key, canonicalize, expand
+
+# File prodotti (per sostituire le policy del gioco: --out-bear assets-src/bear.policy ...)
+BEAR_TRAINED_POLICY_FILE = "bear_trained.policy"
+HUNTER_TRAINED_POLICY_FILE = "hunter_trained.policy"
+CHECKPOINT_FILE = "train.checkpoint"
+# Policy distribuite (per --warm-start e per la valutazione finale), accanto
+# a questo file: lo script può essere lanciato da qualsiasi cartella
+SHIPPED_DIR = os.path.dirname(os.path.abspath(__file__))
+SHIPPED_BEAR_POLICY_FILE = os.path.normpath(os.path.join(SHIPPED_DIR, BEAR_POLICY_FILE))
+SHIPPED_HUNTER_POLICY_FILE = os.path.normpath(os.path.join(SHIPPED_DIR, HUNTER_POLICY_FILE))
+
+# Parametri dell'apprendimento: la partita non ha caso, quindi i bersagli
+# sono deterministici e il valore può essere sostituito per intero
+LEARNING_RATE = 1.0
+EPSILON = 0.2
+# Le mosse residue sono limitate al massimo di una manche
+MAX_REMAINING = BearGameManche.MAX_BEAR_MOVES
+# Partite per worker tra una fusione delle tabelle e la successiva
+GAMES_PER_ROUND = 2000
+# Partite giocate in modo greedy per la valutazione finale
+EVALUATION_GAMES = 2000
+
+BEAR_DELTAS, HUNTER_DELTAS = BearGameManche.MOVE_DELTAS
+
+
+# ========== SELF-PLAY ==========
+
+def _choose(values, actions, rng: random.Random, epsilon: float, best: float):
+    '''Azione epsilon-greedy: a caso con probabilità epsilon, altrimenti una delle migliori'''
+    if rng.random() < epsilon:
+        return rng.choice(actions)
+    return rng.choice([act for act, value in zip(actions, values) if value == best])
+
+
+def play_training_game(bear_values: dict, hunter_values: dict,
+                       bear_visits: dict, hunter_visits: dict,
+                       classic_initial_position: bool, rng: random.Random,
+                       learning_rate: float = LEARNING_RATE,
+                       epsilon: float = EPSILON) -> int:
+    '''
+    Gioca una manche in self-play aggiornando le due tabelle
+    afterstate canonico -> mosse residue dell'orso (gli stati mai visti valgono 0).
+
+    Returns:
+        Numero di mosse fatte dall'orso
+    '''
+    # Le mosse sono scelte dalle tabelle in addestramento: niente policy
+    manche = BearGameManche(True, True, classic_initial_position, load_ai=False)
+    while True:
+        key = manche.get_state_key()
+        if manche.is_hunter_turn():
+            # Lo stato corrente è l'afterstate dell'orso: vale la migliore
+            # mossa dei cacciatori (il minimo delle loro mosse residue)
+            actions = manche.get_hunter_actions()
+            values = [hunter_values.get(canonical_key(key ^ HUNTER_DELTAS[s][e]), 0.0)
+                      for s, e in actions]
+            best = min(values)
+            _update(bear_values, bear_visits, canonical_key(key), best, learning_rate)
+        else:
+            # Afterstate dei cacciatori: una mossa dell'orso in più della
+            # sua migliore, zero se l'orso è catturato
+            actions = manche.get_bear_actions()
+            if not actions:
+                _update(hunter_values, hunter_visits, canonical_key(key), 0.0, learning_rate)
+                return manche.get_bear_moves()
+            values = [bear_values.get(canonical_key(key ^ BEAR_DELTAS[s][e]), 0.0)
+                      for s, e in actions]
+            best = max(values)
+            _update(hunter_values, hunter_visits, canonical_key(key), 1 + best, learning_rate)
+        start, end = _choose(values, actions, rng, epsilon, best)
+        manche.move_player(start, end)
+        if manche.get_bear_moves() >= manche.MAX_BEAR_MOVES:
+            # Fuga per limite di mosse: troncamento, l'ultimo stato non
+            # viene aggiornato
+            return manche.get_bear_moves()
+
+
+def _update(values: dict, visits: dict, key: int, target: float, learning_rate: float) -> None:
+    value = values.get(key, 0.0)
+    values[key] = value + learning_rate * (min(target, MAX_REMAINING) - value)
+    visits[key] = visits.get(key, 0) + 1
+
+
+def _train_block(task: tuple) -> tuple[dict, dict, dict, dict, int]:
+    '''
+    Gioca un blocco di partite in un processo worker.
+
+    Returns:
+        Valori e visite dei soli stati visitati, per orso e cacciatori,
+        e il totale delle mosse dell'orso
+    '''
+    bear_values, hunter_values, games, seed, learning_rate, epsilon = task
+    rng = random.Random(seed)
+    bear_visits, hunter_visits = {}, {}
+    bear_moves = 0
+    for i in range(games):
+        bear_moves += play_training_game(
+            bear_values, hunter_values, bear_visits, hunter_visits,
+            i % 2 == 0, rng, learning_rate, epsilon)
+    return ({key: bear_values[key] for key in bear_visits}, bear_visits,
+            {key: hunter_values[key] for key in hunter_visits}, hunter_visits,
+            bear_moves)
+
+
+def merge(values: dict, updates: list[tuple[dict, dict]]) -> None:
+    '''
+    Fonde nella tabella i valori dei worker: per ogni stato visitato,
+    media dei valori pesata sul numero di visite di ciascun worker.
+    '''
+    totals = {}
+    for worker_values, worker_visits in updates:
+        for key, count in worker_visits.items():
+            total = totals.get(key)
+            if total is None:
+                totals[key] = [worker_values[key] * count, count]
+            else:
+                total[0] += worker_values[key] * count
+                total[1] += count
+    for key, (weighted, count) in totals.items():
+        values[key] = weighted / count
+
+
+# ========== CHECKPOINT E POLICY ==========
+
+def new_state(seed: int = None) -> dict:
+    '''Stato iniziale dell'addestramento (tabelle vuote)'''
+    return {
+        'bear': {},
+        'hunter': {},
+        'games': 0,
+        'rounds': 0,
+        'seed': random.randrange(1 << 30) if seed is None else seed,
+    }
+
+
+def warm_start(state: dict,
+               bear_file: str = SHIPPED_BEAR_POLICY_FILE,
+               hunter_file: str = SHIPPED_HUNTER_POLICY_FILE) -> None:
+    '''Inizializza le tabelle dalle policy esistenti, riportate in mosse residue'''
+    for key, value in canonicalize(get_policy(bear_file)).items():
+        state['bear'][key] = (value - BEAR_POLICY_OFFSET) / 2
+    for key, value in canonicalize(get_policy(hunter_file)).items():
+        state['hunter'][key] = (HUNTER_POLICY_OFFSET - value) / 2
+
+
+def save_checkpoint(state: dict, path: str = CHECKPOINT_FILE) -> None:
+    '''Scrive il checkpoint in modo atomico (file temporaneo e rinomina)'''
+    temp = path + ".tmp"
+    with open(temp, 'wb') as file_write:
+        pickle.dump(state, file_write, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp, path)
+
+
+def load_checkpoint(path: str = CHECKPOINT_FILE) -> dict:
+    with open(path, 'rb') as file_read:
+        return pickle.load(file_read)
+
+
+def policy_tables(state: dict) -> tuple[dict, dict]:
+    '''Tabelle chiave canonica -> valore sulla scala delle policy distribuite'''
+    bear = {key: 2 * value + BEAR_POLICY_OFFSET for key, value in state['bear'].items()}
+    hunter = {key: HUNTER_POLICY_OFFSET - 2 * value for key, value in state['hunter'].items()}
+    return bear, hunter
+
+
+def save_policies(state: dict,
+                  bear_file: str = BEAR_TRAINED_POLICY_FILE,
+                  hunter_file: str = HUNTER_TRAINED_POLICY_FILE) -> None:
+    '''
+    Scrive le policy come pickle {'states_value': ...}, con tutte le chiavi
+    come bear.policy, e nel formato binario con le sole chiavi canoniche
+    '''
+    for path, table in zip((bear_file, hunter_file), policy_tables(state)):
+        with open(path, 'wb') as file_write:
+            pickle.dump({'states_value': expand(table)}, file_write)
+        if not path.endswith(PACKED_EXT):
+            convert_policy(path)
+
+
+# ========== ADDESTRAMENTO ==========
+
+def train(state: dict,
+          games: int,
+          workers: int = None,
+          games_per_round: int = GAMES_PER_ROUND,
+          learning_rate: float = LEARNING_RATE,
+          epsilon: float = EPSILON,
+          checkpoint: str = CHECKPOINT_FILE) -> dict:
+    '''
+    Gioca `games` partite di self-play a turni su un ProcessPoolExecutor,
+    fondendo le tabelle e salvando il checkpoint dopo ogni turno.
+    '''
+    workers = workers or os.cpu_count()
+    target = state['games'] + games
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while state['games'] < target:
+            per_worker = min(games_per_round, -(-(target - state['games']) // workers))
+            tasks = [(state['bear'], state['hunter'], per_worker,
+                      state['seed'] + state['rounds'] * workers + i,
+                      learning_rate, epsilon)
+                     for i in range(workers)]
+            results = list(executor.map(_train_block, tasks))
+            merge(state['bear'], [(r[0], r[1]) for r in results])
+            merge(state['hunter'], [(r[2], r[3]) for r in results])
+            played = per_worker * workers
+            state['games'] += played
+            state['rounds'] += 1
+            if checkpoint:
+                save_checkpoint(state, checkpoint)
+            mean = sum(r[4] for r in results) / played
+            elapsed = time.perf_counter() - started
+            print(f"turno {state['rounds']}: {state['games']} partite, "
+                  f"stati {len(state['bear'])}/{len(state['hunter'])}, "
+                  f"media mosse orso {mean:.2f}, {elapsed:.0f}s")
+    return state
+
+
+def evaluate(bear_player: Player, hunter_player: Player,
+             games: int = EVALUATION_GAMES, seed: int = 0) -> dict:
+    '''Media delle mosse dell'orso in partite greedy, per disposizione iniziale'''
+    random.seed(seed)
+    results = {}
+    for classic in (True, False):
+        total = 0
+        for _ in range(games):
+            manche = BearGameManche(True, True, classic, load_ai=False)
+            manche.set_ai_players(bear_player, hunter_player)
+            while not manche.is_over():
+                manche.move_player(*manche.choose_ai_action())
+            total += manche.get_bear_moves()
+        results[STARTING_POSITIONS[classic]] = total / games
+    return results
+
+
+def _player(name: str, table) -> Player:
+    player = Player(name)
+    if not isinstance(table, PackedPolicy):
+        # Tabella a chiavi canoniche: serve la ricerca canonica di PackedPolicy
+        table = PackedPolicy(pack_policy(table, canonical=True))
+    player.states_value = table
+    return player
+
+
+def print_evaluation(state: dict, games: int = EVALUATION_GAMES) -> None:
+    '''Confronta le policy addestrate con quelle distribuite, ruolo per ruolo'''
+    bear, hunter = policy_tables(state)
+    shipped_bear = _player("orso", get_policy(SHIPPED_BEAR_POLICY_FILE))
+    shipped_hunter = _player("cacciatore", get_policy(SHIPPED_HUNTER_POLICY_FILE))
+    matches = {
+        "orso distribuito / cacciatori distribuiti": (shipped_bear, shipped_hunter),
+        "orso addestrato / cacciatori distribuiti": (_player("orso", bear), shipped_hunter),
+        "orso distribuito / cacciatori addestrati": (shipped_bear, _player("cacciatore", hunter)),
+    }
+    print(f"\nMedia mosse orso ({games} partite greedy per disposizione):")
+    for name, (bear_player, hunter_player) in matches.items():
+        results = evaluate(bear_player, hunter_player, games)
+        print(f"  {name:42} " + "  ".join(f"{pos} {mean:5.2f}" for pos, mean in results.items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Addestra le policy di orso e cacciatori in self-play (TD/Q-learning)")
+    parser.add_argument("-n", "--games", type=int, default=200000,
+                        help="partite di self-play da giocare (in aggiunta al checkpoint)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--games-per-round", type=int, default=GAMES_PER_ROUND,
+                        help="partite per worker tra due fusioni delle tabelle")
+    parser.add_argument("--learning-rate", type=float, default=LEARNING_RATE)
+    parser.add_argument("--epsilon", type=float, default=EPSILON)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--warm-start", action="store_true",
+                        help="parte dai valori di bear.policy/hunter.policy")
+    parser.add_argument("--resume", metavar="CHECKPOINT",
+                        help="riprende da un checkpoint salvato")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE)
+    parser.add_argument("--out-bear", default=BEAR_TRAINED_POLICY_FILE)
+    parser.add_argument("--out-hunter", default=HUNTER_TRAINED_POLICY_FILE)
+    parser.add_argument("--eval-games", type=int, default=EVALUATION_GAMES,
+                        help="partite di valutazione finale (0 = nessuna)")
+    args = parser.parse_args()
+
+    if args.resume:
+        state = load_checkpoint(args.resume)
+        print(f"Ripreso da {args.resume}: {state['games']} partite, {state['rounds']} turni")
+    else:
+        state = new_state(args.seed)
+        if args.warm_start:
+            warm_start(state)
+    train(state, args.games, args.workers, args.games_per_round,
+          args.learning_rate, args.epsilon, args.checkpoint)
+    save_policies(state, args.out_bear, args.out_hunter)
+    print(f"Policy scritte in {args.out_bear} e {args.out_hunter}")
+    if args.eval_games:
+        print_evaluation(state, args.eval_games)